@@ -0,0 +1,110 @@
+"""
+Mede a coleta de ponta a ponta (login, download, leitura e mapeamento) contra o Canaimé simulado.
+
+Informa a vazão (registros por segundo) e a latência das execuções e das páginas de chamada
+(mediana, p95, p99 e máxima), e grava os resultados em JSON.
+
+Uso:
+    python -m benchmarks.bench_end_to_end --units PAMC CPBV --inmates 5000 --runs 5 --engine http
+    python -m benchmarks.bench_end_to_end --latency 0.1 --slow-rate 0.05 --truncate-rate 0.02 --workers 4
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+
+from benchmarks.mock_canaime import MockOptions, start_mock_server
+from benchmarks.synthetic import BASE_DIR
+
+RESULTS_DIR = os.path.join(BASE_DIR, 'data', 'processed', 'benchmarks')
+
+
+def percentile(values, fraction):
+    """Percentil pelo método do posto mais próximo."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+
+def summarize(values):
+    return {
+        "count": len(values),
+        "p50": percentile(values, 0.50),
+        "p95": percentile(values, 0.95),
+        "p99": percentile(values, 0.99),
+        "max": max(values) if values else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de ponta a ponta contra o Canaimé simulado.")
+    parser.add_argument('--units', nargs='+', default=['PAMC'], help="Unidades coletadas.")
+    parser.add_argument('--runs', type=int, default=3, help="Número de coletas completas.")
+    parser.add_argument('--engine', default='playwright', choices=('playwright', 'http'))
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--headed', action='store_true', help="Mostra o navegador.")
+    parser.add_argument('--inmates', type=int, default=1000, help="Presos por unidade.")
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--slow-rate', type=float, default=0.0)
+    parser.add_argument('--slow-latency', type=float, default=5.0)
+    parser.add_argument('--truncate-rate', type=float, default=0.0)
+    parser.add_argument('--session-requests', type=int)
+    parser.add_argument('--label', default='')
+    parser.add_argument('--output', help="Arquivo JSON de saída.")
+    args = parser.parse_args(argv)
+
+    server = start_mock_server(MockOptions(inmates=args.inmates, latency=args.latency, slow_rate=args.slow_rate,
+                                           slow_latency=args.slow_latency, truncate_rate=args.truncate_rate,
+                                           session_requests=args.session_requests))
+    os.environ['CANAIME_BASE_URL'] = server.base_url
+
+    from services.playwright_service import execute_playwright_task
+
+    run_seconds = []
+    run_records = []
+    try:
+        for run in range(args.runs):
+            start = time.perf_counter()
+            all_units_data = execute_playwright_task(not args.headed, 'usuario', 'senha', args.units,
+                                                     engine=args.engine, workers=args.workers)
+            run_seconds.append(time.perf_counter() - start)
+            run_records.append(sum(len(unit_data) for unit_data in all_units_data.values()))
+            print(f"Execução {run + 1}: {run_seconds[-1]:.3f}s, {run_records[-1]} registros")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    page_seconds = [seconds for kind, _, _, seconds, _ in server.stats if kind in ('roll_call', 'truncated')]
+    requests_by_kind = {}
+    for kind, _, _, _, _ in server.stats:
+        requests_by_kind[kind] = requests_by_kind.get(kind, 0) + 1
+
+    total_seconds = sum(run_seconds)
+    results = {
+        "label": args.label,
+        "timestamp": datetime.now().isoformat(timespec='seconds'),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "options": {key: value for key, value in vars(args).items() if key not in ('label', 'output')},
+        "records_per_second": sum(run_records) / total_seconds if total_seconds else None,
+        "run_seconds": summarize(run_seconds),
+        "run_records": run_records,
+        "roll_call_seconds": summarize(page_seconds),
+        "requests": requests_by_kind,
+    }
+    print(f"Vazão: {results['records_per_second'] or 0:.0f} registros/s")
+    print(f"Páginas de chamada: {results['roll_call_seconds']}")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"end-to-end-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as file:
+        json.dump(results, file, indent=2, ensure_ascii=False)
+    print(f"Resultados salvos em {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Compara a extração por entrada (duas chamadas ao navegador por preso) com a extração em lote
+(uma única avaliação na página) de `UnitProcessor.extract_entries`.
+
+Uso:
+    python -m benchmarks.bench_extraction 500 2000 5000
+"""
+import sys
+import time
+
+from playwright.sync_api import sync_playwright
+
+from benchmarks.synthetic import generate_inmates, generate_roll_call_html, load_units_config
+from data.data_processor import UnitProcessor
+
+
+def time_extraction(processor, repeat=3):
+    best = None
+    entries = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        entries = processor.extract_entries()
+        parsed = [processor.parse_entry(entry_text, inmate_text) for entry_text, inmate_text in entries]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, parsed
+
+
+def main(sizes):
+    unit_config = load_units_config()["PAMC"]
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        context = browser.new_context(java_script_enabled=False)
+        page = context.new_page()
+
+        print(f"{'presos':>8} {'por entrada (s)':>16} {'em lote (s)':>12} {'ganho':>8}")
+        for size in sizes:
+            page.set_content(generate_roll_call_html(generate_inmates(size, unit_config)))
+
+            per_entry_time, per_entry_data = time_extraction(UnitProcessor(page, bulk_extraction=False))
+            bulk_time, bulk_data = time_extraction(UnitProcessor(page, bulk_extraction=True))
+
+            if per_entry_data != bulk_data:
+                raise AssertionError("Os dois modos de extração retornaram dados diferentes.")
+
+            print(f"{size:>8} {per_entry_time:>16.3f} {bulk_time:>12.3f} {per_entry_time / bulk_time:>7.1f}x")
+
+        browser.close()
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [500, 2000, 5000])
@@ -0,0 +1,58 @@
+"""
+Compara o mapeamento por busca sequencial na configuração (implementação anterior de
+`UnitProcessor.map_prisoner_data`) com o índice (ala, cela) -> bloco compilado.
+
+Uso:
+    python -m benchmarks.bench_mapping 10000 50000 100000
+"""
+import sys
+import time
+
+from benchmarks.synthetic import generate_inmates, load_units_config
+from data.data_processor import UnitProcessor
+
+
+def map_prisoner_data_sequential(unit_config, wing, cell, code, inmate):
+    """Implementação anterior: percorre blocos e listas de celas a cada registro."""
+    for block_key, block_data in unit_config.get("blocks", {}).items():
+        if wing in block_data["alas"]:
+            if "celas" in block_data["alas"][wing]:
+                celas_list = block_data["alas"][wing]["celas"]
+                if not celas_list or cell in celas_list:
+                    return {"Bloco": block_key, "Ala": wing, "Cela": cell, "Código": code, "Preso": inmate}
+    return None
+
+
+def best_of(func, repeat=3):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main(sizes):
+    units_config = load_units_config()
+    unit_config = units_config["PAMC"]
+    processor = UnitProcessor(None)
+
+    print(f"{'presos':>8} {'sequencial (s)':>15} {'índice (s)':>11} {'ganho':>8}")
+    for size in sizes:
+        records = generate_inmates(size, unit_config)
+
+        sequential_time, sequential = best_of(lambda: [
+            data for data in (map_prisoner_data_sequential(unit_config, wing, cell, code, inmate)
+                              for code, wing, cell, inmate in records) if data])
+        indexed_time, indexed = best_of(lambda: list(processor.iter_mapped_records("PAMC", records)))
+
+        if sequential != indexed:
+            raise AssertionError("O índice produziu um mapeamento diferente da busca sequencial.")
+
+        print(f"{size:>8} {sequential_time:>15.3f} {indexed_time:>11.3f} {sequential_time / indexed_time:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [10000, 50000, 100000])
@@ -0,0 +1,158 @@
+"""
+Mede separadamente cada etapa do processamento, de texto da página de chamada até o arquivo Excel salvo,
+com dados sintéticos de 1 mil, 10 mil e 100 mil presos.
+
+Os tempos (melhor de `--repeat` execuções, em segundos) são gravados em JSON para comparação entre versões.
+
+Uso:
+    python -m benchmarks.bench_phases
+    python -m benchmarks.bench_phases 1000 10000 --repeat 5 --label v0.1.0 --output resultado.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from openpyxl import Workbook
+
+from benchmarks.synthetic import BASE_DIR, generate_inmates, generate_roll_call_html, load_units_config
+from config.excel_config_control import generate_unit_control_sheet
+from config.excel_config_sei import generate_unit_sei_sheet
+from data.data_processor import UnitProcessor
+from data.roll_call_parser import iter_roll_call_records
+from data.template_store import create_unit_sheet
+from services.report_service import calculate_data, fill_control_sheet, fill_sei_sheet
+
+UNIT = "PAMC"
+DEFAULT_SIZES = [1000, 10000, 100000]
+CHUNK_SIZE = 64 * 1024
+RESULTS_DIR = os.path.join(BASE_DIR, 'data', 'processed', 'benchmarks')
+
+
+def best_of(func, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def iter_chunks(data, chunk_size=CHUNK_SIZE):
+    """Divide o documento em pedaços, como chegam da rede."""
+    for start in range(0, len(data), chunk_size):
+        yield data[start:start + chunk_size]
+
+
+def build_workbook(calculated_data):
+    """Gera as abas de controle e SEI e as preenche, como em `create_excel_report`."""
+    wb = Workbook()
+    control_ws = create_unit_sheet(wb, UNIT, "CONTROLE")
+    sei_ws = create_unit_sheet(wb, UNIT, "SEI")
+    fill_control_sheet(control_ws, calculated_data)
+    fill_sei_sheet(sei_ws, control_ws)
+    wb.remove(wb["Sheet"])
+    return wb
+
+
+def run_size(size, repeat, unit_processor, unit_config, temp_dir):
+    """
+    Mede todas as etapas para uma quantidade de presos.
+
+    Returns
+    -------
+    dict
+        Dicionário {etapa: segundos}.
+    """
+    html = generate_roll_call_html(generate_inmates(size, unit_config)).encode('utf-8')
+    timings = {}
+
+    # Texto da página -> tuplas (código, ala, cela, preso)
+    timings["parse"], records = best_of(lambda: list(iter_roll_call_records(iter_chunks(html))), repeat)
+
+    # Tuplas -> registros da unidade, chamando map_prisoner_data por preso
+    timings["map_prisoner_data"], mapped = best_of(lambda: [
+        data for data in (unit_processor.map_prisoner_data(unit_config, wing, cell, code, inmate)
+                          for code, wing, cell, inmate in records) if data], repeat)
+
+    # Mesmo mapeamento pelo caminho usado na coleta (índice consultado em laço único)
+    timings["iter_mapped_records"], _ = best_of(lambda: list(unit_processor.iter_mapped_records(UNIT, records)),
+                                                repeat)
+
+    # Contagem por bloco, ala e cela
+    timings["calculate_data"], calculated_data = best_of(lambda: calculate_data(mapped, unit_config), repeat)
+
+    def build_sheets():
+        wb = Workbook()
+        return wb, generate_unit_control_sheet(wb, UNIT), generate_unit_sei_sheet(wb, UNIT)
+
+    def generate_sheets():
+        wb = Workbook()
+        return wb, create_unit_sheet(wb, UNIT, "CONTROLE"), create_unit_sheet(wb, UNIT, "SEI")
+
+    # Geração completa do layout (o que o modelo em cache evita) e cópia do modelo, usada no relatório
+    timings["build_sheets"], _ = best_of(build_sheets, repeat)
+    timings["generate_sheets"], _ = best_of(generate_sheets, repeat)
+
+    def fill_sheets():
+        wb, control_ws, sei_ws = generate_sheets()
+        start = time.perf_counter()
+        fill_control_sheet(control_ws, calculated_data)
+        fill_sei_sheet(sei_ws, control_ws)
+        return time.perf_counter() - start
+
+    # Apenas o preenchimento: a geração das abas fica fora da medida
+    timings["fill_sheets"] = min(fill_sheets() for _ in range(repeat))
+
+    wb = build_workbook(calculated_data)
+    file_path = os.path.join(temp_dir, f"bench-{size}.xlsx")
+    timings["save"], _ = best_of(lambda: wb.save(file_path), repeat)
+
+    timings["total"] = sum(timings[phase] for phase in
+                           ("parse", "iter_mapped_records", "calculate_data", "generate_sheets", "fill_sheets",
+                            "save"))
+    return {"records": len(mapped), "html_bytes": len(html), "seconds": timings}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark das etapas de processamento com dados sintéticos.")
+    parser.add_argument('sizes', nargs='*', type=int, default=DEFAULT_SIZES, help="Quantidades de presos.")
+    parser.add_argument('--repeat', type=int, default=3, help="Execuções por etapa (vale a mais rápida).")
+    parser.add_argument('--label', default='', help="Identificação da versão medida.")
+    parser.add_argument('--output', help="Arquivo JSON de saída.")
+    args = parser.parse_args(argv)
+
+    unit_config = load_units_config()[UNIT]
+    unit_processor = UnitProcessor(None)
+    results = {
+        "label": args.label,
+        "timestamp": datetime.now().isoformat(timespec='seconds'),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "unit": UNIT,
+        "sizes": {},
+    }
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for size in args.sizes:
+            result = run_size(size, args.repeat, unit_processor, unit_config, temp_dir)
+            results["sizes"][str(size)] = result
+            phases = ' '.join(f"{phase}={seconds:.3f}" for phase, seconds in result["seconds"].items())
+            print(f"{size:>7} presos: {phases}")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"phases-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as file:
+        json.dump(results, file, indent=2, ensure_ascii=False)
+    print(f"Resultados salvos em {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+"""
+Mede a geração do relatório Excel com várias unidades: criação das abas CONTROLE e SEI (pelos geradores e pelo
+modelo em cache), preenchimento, gravação, tamanho do arquivo e quantidade de estilos gravados.
+
+Como `config/units_config.json` pode ter uma única unidade, as abas dessa unidade são repetidas no mesmo
+workbook, renomeadas como unidades distintas.
+
+Uso:
+    python -m benchmarks.bench_report
+    python -m benchmarks.bench_report 1 5 10 --repeat 5 --label antes --output resultado.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from openpyxl import Workbook
+
+from benchmarks.synthetic import BASE_DIR, generate_inmates, load_units_config
+from config.excel_config_control import generate_unit_control_sheet
+from config.excel_config_sei import generate_unit_sei_sheet
+from data.data_processor import UnitProcessor
+from data.template_store import create_unit_sheet
+from services.report_service import calculate_data, fill_control_sheet, fill_sei_sheet
+
+UNIT = "PAMC"
+DEFAULT_UNITS = [1, 5, 10]
+INMATES_PER_UNIT = 1500
+RESULTS_DIR = os.path.join(BASE_DIR, 'data', 'processed', 'benchmarks')
+
+
+def build_sheets(wb, index):
+    """Abas geradas do zero pelos geradores de layout."""
+    control_ws = generate_unit_control_sheet(wb, UNIT)
+    sei_ws = generate_unit_sei_sheet(wb, UNIT)
+    control_ws.title, sei_ws.title = f"{UNIT}{index} CONTROLE", f"{UNIT}{index} SEI"
+    return control_ws, sei_ws
+
+
+def template_sheets(wb, index):
+    """Abas copiadas do modelo em cache, como em `create_excel_report`."""
+    control_ws = create_unit_sheet(wb, UNIT, "CONTROLE")
+    sei_ws = create_unit_sheet(wb, UNIT, "SEI")
+    control_ws.title, sei_ws.title = f"{UNIT}{index} CONTROLE", f"{UNIT}{index} SEI"
+    return control_ws, sei_ws
+
+
+def run_workbook(units, calculated_data, create_sheets, file_path):
+    """
+    Gera, preenche e grava um workbook com `units` unidades.
+
+    Returns
+    -------
+    dict
+        Segundos de cada etapa, tamanho do arquivo e quantidade de estilos do workbook.
+    """
+    start = time.perf_counter()
+    wb = Workbook()
+    sheets = [create_sheets(wb, index) for index in range(1, units + 1)]
+    wb.remove(wb["Sheet"])
+    generate = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for control_ws, sei_ws in sheets:
+        fill_control_sheet(control_ws, calculated_data)
+        fill_sei_sheet(sei_ws, control_ws)
+    fill = time.perf_counter() - start
+
+    start = time.perf_counter()
+    wb.save(file_path)
+    save = time.perf_counter() - start
+
+    return {
+        "generate": generate,
+        "fill": fill,
+        "save": save,
+        "total": generate + fill + save,
+        "file_bytes": os.path.getsize(file_path),
+        "cell_styles": len(wb._cell_styles),
+        "named_styles": len(wb.named_styles),
+    }
+
+
+def best_run(repeat, func):
+    """Executa `func` `repeat` vezes e mantém, para cada etapa, o menor tempo."""
+    best = None
+    for _ in range(repeat):
+        result = func()
+        if best is None:
+            best = result
+        else:
+            best.update({key: min(best[key], value) for key, value in result.items()
+                         if key in ("generate", "fill", "save", "total")})
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark da geração do relatório Excel com várias unidades.")
+    parser.add_argument('units', nargs='*', type=int, default=DEFAULT_UNITS, help="Quantidades de unidades.")
+    parser.add_argument('--repeat', type=int, default=3, help="Execuções por medida (vale a mais rápida).")
+    parser.add_argument('--label', default='', help="Identificação da versão medida.")
+    parser.add_argument('--output', help="Arquivo JSON de saída.")
+    args = parser.parse_args(argv)
+
+    unit_config = load_units_config()[UNIT]
+    unit_processor = UnitProcessor(None)
+    records = list(unit_processor.iter_mapped_records(UNIT, generate_inmates(INMATES_PER_UNIT, unit_config)))
+    calculated_data = calculate_data(records, unit_config)
+
+    results = {
+        "label": args.label,
+        "timestamp": datetime.now().isoformat(timespec='seconds'),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "inmates_per_unit": INMATES_PER_UNIT,
+        "units": {},
+    }
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for units in args.units:
+            file_path = os.path.join(temp_dir, f"bench-{units}.xlsx")
+            result = {
+                "build": best_run(args.repeat,
+                                  lambda: run_workbook(units, calculated_data, build_sheets, file_path)),
+                "template": best_run(args.repeat,
+                                     lambda: run_workbook(units, calculated_data, template_sheets, file_path)),
+            }
+            results["units"][str(units)] = result
+            for mode, values in result.items():
+                print(f"{units:>3} unidades ({mode:>8}): gerar={values['generate']:.3f}s "
+                      f"preencher={values['fill']:.3f}s gravar={values['save']:.3f}s total={values['total']:.3f}s "
+                      f"arquivo={values['file_bytes'] / 1024:.1f} KiB estilos={values['cell_styles']}")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"report-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as file:
+        json.dump(results, file, indent=2, ensure_ascii=False)
+    print(f"Resultados salvos em {output}")
+
+
+if __name__ == '__main__':
+    main()
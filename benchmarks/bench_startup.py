@@ -0,0 +1,164 @@
+"""
+Mede o tempo de importação da aplicação em processos novos (`python -X importtime`), como acontece a cada
+abertura e na criação do processo de trabalho.
+
+Para cada alvo informa a mediana do tempo de importação e quais módulos pesados (Playwright, openpyxl,
+requests, ...) foram carregados, e grava os resultados em JSON.
+
+Com `--browser`, mede também o tempo até uma página pronta no navegador: lançando o Chromium a frio e
+conectando-se ao servidor de navegador aquecido (`services/browser_server.py`), cuja meta é ficar bem abaixo
+de um segundo. Requer o Chromium do Playwright instalado.
+
+Uso:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --runs 10 --label v0.1.0 --output resultado.json
+    python -m benchmarks.bench_startup --browser
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+from benchmarks.synthetic import BASE_DIR
+
+RESULTS_DIR = os.path.join(BASE_DIR, 'data', 'processed', 'benchmarks')
+
+# Módulos importados por cada etapa: abertura da janela de login e processo de trabalho
+TARGETS = {
+    "main": ["main"],
+    "login_window": ["main", "gui.login.login_canaime", "gui.selectors.unit_selector", "services.prefetch_service"],
+    "worker": ["main", "services.playwright_service", "services.report_service", "data.snapshot_store",
+               "data.movement_tracker"],
+}
+HEAVY_MODULES = ("playwright", "openpyxl", "requests", "urllib3", "packaging", "pandas", "numpy")
+WARM_BROWSER_GOAL_MS = 1000  # Meta da conexão ao navegador aquecido
+
+
+def measure(modules):
+    """
+    Importa `modules` em um interpretador novo e retorna (milissegundos, módulos pesados carregados).
+    """
+    code = (f"import sys\n" + ''.join(f"import {module}\n" for module in modules) +
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=BASE_DIR,
+                            capture_output=True, text=True, check=True)
+
+    # Cada linha de importtime: "import time: <próprio> | <acumulado> | <módulo>", em microssegundos;
+    # soma-se o acumulado dos módulos de primeiro nível (sem recuo)
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not name[1:].startswith(' '):
+            total += int(cumulative)
+    heavy = [module for module in result.stdout.strip().split(',') if module]
+    return total / 1000, heavy
+
+
+def open_page(browser):
+    """Abre um contexto e uma página, como a coleta faz, e retorna o navegador."""
+    browser.new_context().new_page()
+    return browser
+
+
+def measure_browser(runs):
+    """
+    Mede, em milissegundos, o tempo até uma página pronta lançando o Chromium a frio e conectando-se ao
+    servidor de navegador aquecido.
+
+    Returns
+    -------
+    tuple
+        Listas (tempos a frio, tempos com o servidor aquecido).
+    """
+    from playwright.sync_api import sync_playwright
+
+    from services import browser_server
+
+    # Um servidor já em execução é aproveitado e mantido; um iniciado aqui é encerrado ao final
+    state = browser_server.read_state()
+    started = not browser_server.is_ready(state)
+    if started:
+        state = browser_server.start_server()
+    if not state:
+        raise RuntimeError("O servidor de navegador não respondeu.")
+
+    cold, warm = [], []
+    try:
+        with sync_playwright() as p:
+            for _ in range(runs):
+                start = time.perf_counter()
+                browser = open_page(p.chromium.launch(headless=True))
+                cold.append((time.perf_counter() - start) * 1000)
+                browser.close()
+
+                start = time.perf_counter()
+                browser = open_page(p.chromium.connect_over_cdp(browser_server.browser_endpoint(state)))
+                warm.append((time.perf_counter() - start) * 1000)
+                browser.close()
+    finally:
+        if started:
+            browser_server.stop_server()
+    return cold, warm
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark do tempo de importação na inicialização.")
+    parser.add_argument('--runs', type=int, default=5, help="Processos medidos por alvo (vale a mediana).")
+    parser.add_argument('--label', default='', help="Identificação da versão medida.")
+    parser.add_argument('--output', help="Arquivo JSON de saída.")
+    parser.add_argument('--browser', action='store_true',
+                        help="Mede também o navegador a frio e o servidor de navegador aquecido.")
+    args = parser.parse_args(argv)
+
+    results = {
+        "label": args.label,
+        "timestamp": datetime.now().isoformat(timespec='seconds'),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "runs": args.runs,
+        "targets": {},
+    }
+    for target, modules in TARGETS.items():
+        timings = []
+        heavy = []
+        for _ in range(args.runs):
+            milliseconds, heavy = measure(modules)
+            timings.append(milliseconds)
+        results["targets"][target] = {
+            "modules": modules,
+            "median_ms": round(statistics.median(timings), 1),
+            "min_ms": round(min(timings), 1),
+            "heavy_modules": heavy,
+        }
+        print(f"{target:>13}: {statistics.median(timings):8.1f} ms  pesados: {', '.join(heavy) or '-'}")
+
+    if args.browser:
+        cold, warm = measure_browser(args.runs)
+        results["browser"] = {
+            "cold_median_ms": round(statistics.median(cold), 1),
+            "warm_median_ms": round(statistics.median(warm), 1),
+            "warm_max_ms": round(max(warm), 1),
+            "warm_goal_ms": WARM_BROWSER_GOAL_MS,
+            "warm_within_goal": max(warm) < WARM_BROWSER_GOAL_MS,
+        }
+        browser_results = results["browser"]
+        print(f"{'navegador':>13}: a frio {browser_results['cold_median_ms']:8.1f} ms  "
+              f"aquecido {browser_results['warm_median_ms']:8.1f} ms "
+              f"(máx. {browser_results['warm_max_ms']:.1f} ms, meta < {WARM_BROWSER_GOAL_MS} ms)")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"startup-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as file:
+        json.dump(results, file, indent=2, ensure_ascii=False)
+    print(f"Resultados salvos em {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,268 @@
+"""
+Servidor que simula o Canaimé localmente: página de login, cookie de sessão e páginas de chamada com fotos
+sintéticas para cada `id_und_prisional`.
+
+Permite medir a coleta de ponta a ponta sem acesso ao sistema real e injetar falhas: respostas lentas,
+páginas truncadas e expiração da sessão. Para apontar a aplicação para o servidor, use o endereço base
+impresso na inicialização em `base_url` (config/app_settings.json) ou na variável CANAIME_BASE_URL.
+
+Uso:
+    python -m benchmarks.mock_canaime --port 8765 --inmates 2000 --latency 0.2 --slow-rate 0.1
+"""
+import argparse
+import random
+import secrets
+import threading
+import time
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks.synthetic import generate_inmates, generate_roll_call_html, load_units_config
+from config.app_settings import LOGIN_PATH, ROLL_CALL_PATH
+
+BASE_PATH = '/sgp2rr/'
+HOME_PATH = 'areas/principal.php'
+SESSION_COOKIE = 'PHPSESSID'
+WRITE_CHUNK_SIZE = 64 * 1024
+
+LOGIN_PAGE = """<html><head><meta charset="utf-8"><title>Canaimé - Login</title></head><body>
+<form name="form1" method="post" action="login_principal.php">
+<input type="hidden" name="acao" value="login">
+<input type="text" name="usuario">
+<input type="password" name="senha">
+<input type="submit" name="entrar" value="Entrar">
+</form>
+</body></html>
+"""
+
+# A tela inicial tem pelo menos quatro imagens: é o que o login da aplicação verifica
+HOME_PAGE = """<html><head><meta charset="utf-8"><title>Canaimé</title></head><body>
+<img src="../img/logo.png"><img src="../img/menu1.png"><img src="../img/menu2.png"><img src="../img/menu3.png">
+</body></html>
+"""
+
+
+class MockOptions:
+    """Parâmetros do servidor simulado."""
+
+    def __init__(self, inmates=1000, latency=0.0, slow_rate=0.0, slow_latency=5.0, truncate_rate=0.0,
+                 session_ttl=None, session_requests=None, login=None, password=None, seed=42):
+        self.inmates = inmates  # Presos por unidade
+        self.latency = latency  # Espera, em segundos, antes de cada resposta
+        self.slow_rate = slow_rate  # Fração das páginas de chamada com espera adicional
+        self.slow_latency = slow_latency  # Espera adicional das respostas lentas
+        self.truncate_rate = truncate_rate  # Fração das páginas de chamada interrompidas no meio
+        self.session_ttl = session_ttl  # Segundos até a sessão expirar (None = não expira)
+        self.session_requests = session_requests  # Páginas de chamada por sessão antes de expirar
+        self.login = login  # Credenciais aceitas (None = qualquer uma)
+        self.password = password
+        self.seed = seed
+
+
+class MockCanaimeServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, options):
+        super().__init__(address, MockCanaimeHandler)
+        self.options = options
+        self.units_config = load_units_config()
+        self.rng = random.Random(options.seed)
+        self.lock = threading.Lock()
+        self.sessions = {}  # token -> [criação, páginas de chamada servidas]
+        self.pages = {}  # unidade -> HTML já gerado
+        self.stats = []  # Um registro por requisição: (tipo, unidade, status, segundos, bytes)
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{BASE_PATH.rstrip('/')}"
+
+    def roll_call_page(self, unit):
+        with self.lock:
+            if unit not in self.pages:
+                unit_config = self.units_config.get(unit)
+                inmates = generate_inmates(self.options.inmates, unit_config, self.options.seed) if unit_config else []
+                self.pages[unit] = generate_roll_call_html(inmates).encode('utf-8')
+            return self.pages[unit]
+
+    def new_session(self):
+        token = secrets.token_hex(16)
+        with self.lock:
+            self.sessions[token] = [time.monotonic(), 0]
+        return token
+
+    def use_session(self, token, roll_call=False):
+        """Retorna True se a sessão é válida, contando as páginas de chamada servidas por ela."""
+        with self.lock:
+            session = self.sessions.get(token)
+            if session is None:
+                return False
+            ttl = self.options.session_ttl
+            limit = self.options.session_requests
+            if (ttl is not None and time.monotonic() - session[0] > ttl) or (limit is not None and session[1] >= limit):
+                del self.sessions[token]
+                return False
+            if roll_call:
+                session[1] += 1
+            return True
+
+    def chance(self, rate):
+        with self.lock:
+            return rate > 0 and self.rng.random() < rate
+
+    def record(self, kind, unit, status, seconds, size):
+        with self.lock:
+            self.stats.append((kind, unit, status, seconds, size))
+
+
+class MockCanaimeHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass  # Sem uma linha no console por requisição
+
+    def session_token(self):
+        cookie = SimpleCookie(self.headers.get('Cookie', ''))
+        return cookie[SESSION_COOKIE].value if SESSION_COOKIE in cookie else None
+
+    def route(self):
+        path = urlsplit(self.path).path
+        if not path.startswith(BASE_PATH):
+            return None
+        return path[len(BASE_PATH):]
+
+    def send_page(self, body, status=200, headers=None, truncate=False):
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if truncate:
+            self.send_header('Connection', 'close')
+            self.close_connection = True
+        self.end_headers()
+        if self.command == 'HEAD':
+            return 0
+
+        # Página truncada: o corpo termina antes do Content-Length anunciado
+        end = len(body) // 2 if truncate else len(body)
+        for start in range(0, end, WRITE_CHUNK_SIZE):
+            self.wfile.write(body[start:min(start + WRITE_CHUNK_SIZE, end)])
+        return end
+
+    def do_GET(self):
+        start = time.perf_counter()
+        options = self.server.options
+        if options.latency:
+            time.sleep(options.latency)
+
+        route = self.route()
+        unit = None
+        truncate = False
+        if route == LOGIN_PATH:
+            kind, status, body = 'login', 200, LOGIN_PAGE.encode('utf-8')
+        elif route == HOME_PATH:
+            valid = self.server.use_session(self.session_token())
+            kind, status, body = 'home', 200, (HOME_PAGE if valid else LOGIN_PAGE).encode('utf-8')
+        elif route == ROLL_CALL_PATH:
+            unit = parse_qs(urlsplit(self.path).query).get('id_und_prisional', [''])[0]
+            if self.server.use_session(self.session_token(), roll_call=True):
+                kind, status, body = 'roll_call', 200, self.server.roll_call_page(unit)
+                if self.server.chance(options.slow_rate):
+                    time.sleep(options.slow_latency)
+                truncate = self.server.chance(options.truncate_rate)
+            else:
+                kind, status, body = 'expired', 200, LOGIN_PAGE.encode('utf-8')
+        else:
+            kind, status, body = 'not_found', 404, b'Not Found'
+
+        try:
+            size = self.send_page(body, status, truncate=truncate)
+        except (BrokenPipeError, ConnectionResetError):
+            size = 0
+            kind = f'{kind}_aborted'
+        self.server.record('truncated' if truncate else kind, unit, status, time.perf_counter() - start, size)
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_POST(self):
+        start = time.perf_counter()
+        options = self.server.options
+        if options.latency:
+            time.sleep(options.latency)
+        if self.route() != LOGIN_PATH:
+            self.send_page(b'Not Found', 404)
+            return
+
+        length = int(self.headers.get('Content-Length', 0))
+        fields = {key: values[0] for key, values in parse_qs(self.rfile.read(length).decode('utf-8')).items()}
+        accepted = ((options.login is None or fields.get('usuario') == options.login) and
+                    (options.password is None or fields.get('senha') == options.password) and
+                    fields.get('usuario') and fields.get('senha'))
+        if accepted:
+            token = self.server.new_session()
+            self.send_page(b'', 302, {'Location': f"{BASE_PATH}{HOME_PATH}",
+                                      'Set-Cookie': f"{SESSION_COOKIE}={token}; Path=/"})
+        else:
+            self.send_page(LOGIN_PAGE.encode('utf-8'))
+        self.server.record('login_post', None, 302 if accepted else 200, time.perf_counter() - start, 0)
+
+
+def start_mock_server(options=None, host='127.0.0.1', port=0):
+    """
+    Inicia o servidor simulado em uma thread e o retorna.
+
+    Parameters
+    ----------
+    options : MockOptions, optional
+        Parâmetros do servidor. Usa os valores padrão se não informado.
+    host : str
+        Endereço de escuta.
+    port : int
+        Porta de escuta (0 = porta livre escolhida pelo sistema).
+
+    Returns
+    -------
+    MockCanaimeServer
+        Servidor em execução; `base_url` traz o endereço para a aplicação e `shutdown()` o encerra.
+    """
+    server = MockCanaimeServer((host, port), options or MockOptions())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor local que simula o Canaimé.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--inmates', type=int, default=1000, help="Presos por unidade.")
+    parser.add_argument('--latency', type=float, default=0.0, help="Espera antes de cada resposta (s).")
+    parser.add_argument('--slow-rate', type=float, default=0.0, help="Fração de páginas de chamada lentas.")
+    parser.add_argument('--slow-latency', type=float, default=5.0, help="Espera adicional das páginas lentas (s).")
+    parser.add_argument('--truncate-rate', type=float, default=0.0, help="Fração de páginas truncadas.")
+    parser.add_argument('--session-ttl', type=float, help="Segundos até a sessão expirar.")
+    parser.add_argument('--session-requests', type=int, help="Páginas de chamada por sessão antes de expirar.")
+    parser.add_argument('--login', help="Usuário aceito (padrão: qualquer um).")
+    parser.add_argument('--password', help="Senha aceita (padrão: qualquer uma).")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    options = MockOptions(inmates=args.inmates, latency=args.latency, slow_rate=args.slow_rate,
+                          slow_latency=args.slow_latency, truncate_rate=args.truncate_rate,
+                          session_ttl=args.session_ttl, session_requests=args.session_requests,
+                          login=args.login, password=args.password, seed=args.seed)
+    server = MockCanaimeServer((args.host, args.port), options)
+    print(f"Canaimé simulado em {server.base_url}")
+    print(f"Use: CANAIME_BASE_URL={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Gerador de dados sintéticos no formato da página de chamada com fotos (UND_ChamadaFOTOS_todos2.php).
+
+Usado pelos benchmarks para medir a coleta e o processamento sem acesso ao sistema Canaimé.
+"""
+import json
+import os
+import random
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Celas usadas para alas sem lista de celas na configuração (HGR, TRATOX, TRIAGEM, ...)
+WILDCARD_CELLS = {
+    "REMIÇÃO01": ["1"],
+    "REMIÇÃO02": ["2"],
+}
+DEFAULT_WILDCARD_CELLS = ["1", "2", "3"]
+
+FIRST_NAMES = ("JOSE", "JOAO", "ANTONIO", "FRANCISCO", "CARLOS", "PAULO", "PEDRO", "LUCAS", "MARCOS", "RAIMUNDO")
+LAST_NAMES = ("SILVA", "SANTOS", "OLIVEIRA", "SOUZA", "LIMA", "PEREIRA", "COSTA", "RODRIGUES", "ALMEIDA", "MACUXI")
+
+
+def load_units_config():
+    # Carregar configurações do arquivo JSON
+    config_path = os.path.join(BASE_DIR, 'config', 'units_config.json')
+    with open(config_path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def unit_locations(unit_config):
+    """
+    Lista todas as combinações (ala, cela) válidas de uma unidade.
+
+    Parameters
+    ----------
+    unit_config : dict
+        Configuração da unidade no formato de `units_config.json`.
+
+    Returns
+    -------
+    list
+        Lista de tuplas (ala, cela).
+    """
+    locations = []
+    for block_data in unit_config.get("blocks", {}).values():
+        for wing, wing_data in block_data["alas"].items():
+            cells = wing_data.get("celas") or WILDCARD_CELLS.get(wing, DEFAULT_WILDCARD_CELLS)
+            locations.extend((wing, cell) for cell in cells)
+    return locations
+
+
+def generate_inmates(count, unit_config, seed=42):
+    """
+    Gera presos sintéticos distribuídos pelas alas e celas da unidade.
+
+    Parameters
+    ----------
+    count : int
+        Quantidade de presos.
+    unit_config : dict
+        Configuração da unidade.
+    seed : int
+        Semente do gerador aleatório, para resultados reprodutíveis.
+
+    Returns
+    -------
+    list
+        Lista de tuplas (código, ala, cela, preso).
+    """
+    rng = random.Random(seed)
+    locations = unit_locations(unit_config)
+    inmates = []
+    for i in range(count):
+        wing, cell = rng.choice(locations)
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}"
+        inmates.append((str(100000 + i), wing, cell, name))
+    return inmates
+
+
+def render_entry(code, wing, cell, name):
+    """Renderiza uma entrada `.titulobkSingCAPS` como na página de chamada."""
+    return (
+        f'<td class="titulobkSingCAPS">ID{code}\n'
+        f'<span class="titulo12bk">{name}</span>\n'
+        f'MÃE: NAO INFORMADO\n'
+        f'REGIME: FECHADO\n'
+        f'ALA: {wing} / {cell}</td>\n'
+    )
+
+
+def generate_roll_call_html(inmates):
+    """
+    Gera o HTML completo de uma página de chamada com as entradas informadas.
+
+    Parameters
+    ----------
+    inmates : list
+        Lista de tuplas (código, ala, cela, preso).
+
+    Returns
+    -------
+    str
+        Documento HTML.
+    """
+    rows = []
+    for i in range(0, len(inmates), 4):
+        cells = ''.join(render_entry(*inmate) for inmate in inmates[i:i + 4])
+        rows.append(f'<tr>\n{cells}</tr>\n')
+    return (
+        '<html><head><meta charset="utf-8"><title>Chamada</title></head><body>\n'
+        '<table>\n' + ''.join(rows) + '</table>\n</body></html>\n'
+    )
@@ -0,0 +1,112 @@
+import json
+import os
+from datetime import timedelta
+
+# Define o diretório base relativo à localização do arquivo atual
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Páginas do Canaimé, relativas ao endereço base (`base_url`)
+LOGIN_PATH = 'login/login_principal.php'
+ROLL_CALL_PATH = 'areas/impressoes/UND_ChamadaFOTOS_todos2.php'
+
+# Valores padrão usados quando a chave não existe em app_settings.json
+DEFAULT_SETTINGS = {
+    # Endereço base do Canaimé (pode ser trocado por um servidor simulado; ver benchmarks/mock_canaime.py).
+    # A variável de ambiente CANAIME_BASE_URL tem precedência.
+    "base_url": "https://canaime.com.br/sgp2rr",
+    # Motor de coleta: "playwright" (navegador Chromium) ou "http" (sessão HTTP, sem navegador)
+    "engine": "playwright",
+    # Número de unidades coletadas simultaneamente (1 = uma unidade por vez)
+    "workers": 1,
+    # Abre o navegador durante o login e pré-coleta as unidades ativas enquanto o usuário as seleciona
+    "prefetch": True,
+    # Navegador mantido aberto entre execuções (desligado após `idle_timeout` segundos sem uso)
+    "browser_server": {
+        "enabled": False,
+        "idle_timeout": 1800,
+    },
+    # Atualizações: versão conhecida confiável por `check_ttl` segundos antes de consultar o servidor.
+    # `mode`: "background" baixa a nova versão em segundo plano e a aplica na próxima abertura;
+    # "prompt" pergunta ao usuário, baixa e reinicia na hora.
+    "updates": {
+        "check_ttl": 21600,
+        "mode": "background",
+    },
+    # Cópia comprimida do HTML de cada unidade coletada, para reprocessamento (python main.py --replay PASTA)
+    "capture": {
+        "enabled": False,
+        "dir": "data/processed/captures",
+    },
+    # Coleta automática a cada troca de plantão (python main.py --daemon)
+    "daemon": {
+        "login": "",  # Também pode ser informado pela variável de ambiente CANAIME_LOGIN
+        "password": "",  # Também pode ser informado pela variável de ambiente CANAIME_PASSWORD
+        "units": ["PAMC"],
+        "output_dir": "relatorios",
+        "shift_change_time": "07:00",
+        "run_on_start": False,
+    },
+}
+
+
+def load_app_settings():
+    """
+    Carrega as configurações da aplicação, completando com os valores padrão.
+
+    Returns
+    -------
+    dict
+        Dicionário com as configurações da aplicação.
+    """
+    settings = dict(DEFAULT_SETTINGS)
+    config_path = os.path.join(BASE_DIR, 'app_settings.json')
+    if os.path.exists(config_path):
+        with open(config_path, 'r', encoding='utf-8') as file:
+            for key, value in json.load(file).items():
+                # Seções aninhadas são completadas chave a chave
+                if isinstance(value, dict) and isinstance(settings.get(key), dict):
+                    settings[key] = {**settings[key], **value}
+                else:
+                    settings[key] = value
+    return settings
+
+
+def canaime_url(path):
+    """
+    Monta o endereço de uma página do Canaimé a partir do endereço base configurado.
+
+    Parameters
+    ----------
+    path : str
+        Caminho da página relativo ao endereço base (por exemplo, `LOGIN_PATH`).
+
+    Returns
+    -------
+    str
+        Endereço completo da página.
+    """
+    base_url = os.environ.get('CANAIME_BASE_URL') or load_app_settings()["base_url"]
+    return f"{base_url.rstrip('/')}/{path}"
+
+
+def next_shift_change(now, shift_change_time):
+    """
+    Calcula o próximo horário de troca de plantão.
+
+    Parameters
+    ----------
+    now : datetime
+        Momento atual.
+    shift_change_time : str
+        Horário da troca de plantão, no formato "HH:MM".
+
+    Returns
+    -------
+    datetime
+        Próxima troca de plantão estritamente após `now`.
+    """
+    hour, minute = (int(part) for part in shift_change_time.split(':'))
+    change = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if change <= now:
+        change += timedelta(days=1)
+    return change
@@ -1,9 +1,10 @@
 from openpyxl import Workbook
-from openpyxl.styles import PatternFill, Alignment, Font, Border, Side
 from datetime import datetime
 import json
 import os
 
+from config.excel_styles import SheetStyles
+
 # Define o diretório base relativo à localização do arquivo atual
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -26,52 +27,38 @@ def calculate_shift(date):
     return shifts[shift_index]
 
 
+def fill_control_header(sheet, date=None):
+    """Preenche o cabeçalho de Data (A1) e Plantão (A2) da aba de controle."""
+    current_date = date or datetime.today()
+    sheet['A1'] = current_date.strftime("%d/%m/%Y")
+    sheet['A2'] = calculate_shift(current_date)
+
+
 def generate_unit_control_sheet(workbook, unit_name):
     units_config = load_units_config()
     pamc_config = units_config[unit_name]["blocks"]
 
     # Cria a aba com o nome da unidade e "CONTROLE"
     sheet = workbook.create_sheet(title=f"{unit_name} CONTROLE")
-    gray_fill = PatternFill(start_color="C0C0C0", end_color="C0C0C0", fill_type="solid")
-    blue_fill = PatternFill(start_color="00B0F0", end_color="00B0F0", fill_type="solid")
-    yellow_fill = PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid")
-    purple_fill = PatternFill(start_color="D9D9F3", end_color="D9D9F3", fill_type="solid")
-    center_alignment = Alignment(horizontal='center', vertical='center')
-    bold_font = Font(bold=True)
-    thin_border = Border(left=Side(style='thin'),
-                         right=Side(style='thin'),
-                         top=Side(style='thin'),
-                         bottom=Side(style='thin'))
+    # Estilos das células, atribuídos ao final como estilos nomeados compartilhados (ver excel_styles.py)
+    styles = SheetStyles(sheet)
 
     # Adicionando bordas de A1 até B33
-    for row in sheet['A1:B33']:
-        for cell in row:
-            cell.border = thin_border
+    styles.add('A1:B33', 'borda')
 
     # Adicionar bordas para B35, B36, O13 e O14
-    sheet['B35'].border = thin_border
-    sheet['B36'].border = thin_border
-    sheet['O13'].border = thin_border
-    sheet['O14'].border = thin_border
-
-    # Cabeçalho de Data e Plantão
-    current_date = datetime.today()
-    shift_name = calculate_shift(current_date)
+    styles.add('B35', 'borda')
+    styles.add('B36', 'borda')
+    styles.add('O13', 'borda')
+    styles.add('O14', 'borda')
 
     # Mesclar e preencher células para Data e Plantão
     sheet.merge_cells('A1:B1')
-    sheet['A1'] = current_date.strftime("%d/%m/%Y")
-    sheet['A1'].fill = purple_fill
-    sheet['A1'].alignment = center_alignment
-    sheet['A1'].font = bold_font
-    sheet['A1'].border = thin_border
+    styles.add('A1', 'lilas', 'centro', 'negrito', 'borda')
 
     sheet.merge_cells('A2:B2')
-    sheet['A2'] = shift_name
-    sheet['A2'].fill = purple_fill
-    sheet['A2'].alignment = center_alignment
-    sheet['A2'].font = bold_font
-    sheet['A2'].border = thin_border
+    styles.add('A2', 'lilas', 'centro', 'negrito', 'borda')
+    fill_control_header(sheet)
 
     # Preencher a coluna A com as entradas especificadas
     entries = [
@@ -90,28 +77,28 @@ def generate_unit_control_sheet(workbook, unit_name):
             continue
 
         sheet[f'A{current_row}'] = entry
-        sheet[f'A{current_row}'].alignment = center_alignment
 
         # Definir cor de fundo e bordas conforme a entrada
         if "Total" in entry or entry in ["SAÍDAS DO EXTERNO", "TOTAL AO RECEBER", "ENTRADAS", "SAÍDAS"]:
-            sheet[f'A{current_row}'].fill = purple_fill if "Total" not in entry else yellow_fill
+            fill = 'lilas' if "Total" not in entry else 'amarelo'
         else:
-            sheet[f'A{current_row}'].fill = blue_fill
+            fill = 'azul'
 
-        sheet[f'A{current_row}'].border = thin_border
+        styles.add(f'A{current_row}', 'centro', fill, 'borda')
         current_row += 1
 
+    # Totais e fórmulas da coluna B, preenchidos a cada execução
+    styles.add('B3:B36', 'centro')
+
     # Mesclar células para os blocos e alas, e preencher com os dados de celas
     col_start = 3
     col_end = 4
 
     for block_key, block_name in [("A", "BLOCO A"), ("B", "BLOCO B")]:
-        block_range_end = 'AA' if block_key == "B" else 'W'  # Ajuste para extensão do bloco B até a coluna AA
         sheet.merge_cells(start_row=1, start_column=col_start, end_row=1, end_column=col_end + 8)
         sheet.merge_cells(start_row=1, start_column=14, end_row=1, end_column=27)
-        sheet.cell(row=1, column=col_start, value=block_name).fill = gray_fill
-        sheet.cell(row=1, column=col_start).alignment = center_alignment
-        sheet.cell(row=1, column=col_start).font = bold_font
+        sheet.cell(row=1, column=col_start, value=block_name)
+        styles.add((1, col_start), 'cinza', 'centro', 'negrito')
 
         for ala_key, ala_data in pamc_config[block_key]["alas"].items():
             # Verifica se a ala é "REMIÇÃO 01" ou "REMIÇÃO 02" e as ignora
@@ -120,29 +107,34 @@ def generate_unit_control_sheet(workbook, unit_name):
 
             # Mescla para o nome da Ala
             sheet.merge_cells(start_row=2, start_column=col_start, end_row=2, end_column=col_end)
-            sheet.cell(row=2, column=col_start, value=ala_data["name"]).alignment = center_alignment
-            sheet.cell(row=2, column=col_start).font = bold_font
+            sheet.cell(row=2, column=col_start, value=ala_data["name"])
+            styles.add((2, col_start), 'centro', 'negrito')
 
             # Preencher descrição
             sheet.merge_cells(start_row=3, start_column=col_start, end_row=3, end_column=col_end)
-            sheet.cell(row=3, column=col_start, value=ala_data["description"]).alignment = center_alignment
+            sheet.cell(row=3, column=col_start, value=ala_data["description"])
+            styles.add((3, col_start), 'centro')
 
             # Preencher cabeçalho de celas e quantidade
-            sheet.cell(row=4, column=col_start, value="CELA").alignment = center_alignment
-            sheet.cell(row=4, column=col_end, value="QTD").alignment = center_alignment
+            sheet.cell(row=4, column=col_start, value="CELA")
+            sheet.cell(row=4, column=col_end, value="QTD")
+            styles.add((4, col_start), 'centro')
+            styles.add((4, col_end), 'centro')
 
-            # Preencher celas
+            # Preencher celas; a quantidade de cada cela é escrita centralizada a cada execução
             start_cela_row = 5
             for i, cela in enumerate(ala_data["celas"], start=start_cela_row):
-                sheet.cell(row=i, column=col_start, value=cela).fill = blue_fill
-                sheet.cell(row=i, column=col_end).border = thin_border
+                sheet.cell(row=i, column=col_start, value=cela)
+                styles.add((i, col_start), 'azul')
+                styles.add((i, col_end), 'borda', 'centro')
 
             # Inserir REMIÇÃO 1 e REMIÇÃO 2 na Ala 01 (Bloco B)
             if block_key == "B" and ala_key == "01":
-                sheet.cell(row=start_cela_row + len(ala_data["celas"]) + 2, column=col_start,
-                           value="REM.1").fill = blue_fill
-                sheet.cell(row=start_cela_row + len(ala_data["celas"]) + 3, column=col_start,
-                           value="REM.2").fill = blue_fill
+                for offset, value in ((2, "REM.1"), (3, "REM.2")):
+                    row = start_cela_row + len(ala_data["celas"]) + offset
+                    sheet.cell(row=row, column=col_start, value=value)
+                    styles.add((row, col_start), 'azul')
+                    styles.add((row, col_end), 'centro')
 
             # Ajustar colunas para próxima ala
             col_start += 2
@@ -152,9 +144,11 @@ def generate_unit_control_sheet(workbook, unit_name):
         col_start += 1
         col_end += 1
 
-    # Pintar de amarelo as células da linha 33 onde estiver "QTD"
+    # Pintar de amarelo as células da linha 33 onde estiver "QTD" (somatório de cada ala)
     for col in ['D', 'F', 'H', 'J', 'L', 'O', 'Q', 'S', 'U', 'W', 'Y', 'AA']:
-        sheet[f'{col}33'].fill = yellow_fill
+        styles.add(f'{col}33', 'amarelo', 'centro')
+
+    styles.apply()
 
     # Ajustar largura das colunas automaticamente
     sheet.column_dimensions['A'].width = 20  # Ajuste de exemplo; pode ser refinado
@@ -0,0 +1,35 @@
+from openpyxl import Workbook
+import os
+
+from config.excel_styles import SheetStyles
+
+# Cabeçalho da aba de movimentações
+HEADERS = ["MOVIMENTAÇÃO", "CÓDIGO", "PRESO", "ALA ANTERIOR", "CELA ANTERIOR", "ALA ATUAL", "CELA ATUAL"]
+COLUMN_WIDTHS = [16, 12, 45, 14, 14, 14, 14]
+
+
+def generate_unit_movement_sheet(workbook, unit_name):
+    # Cria a aba com o nome da unidade e "MOVIMENTAÇÃO"
+    sheet = workbook.create_sheet(title=f"{unit_name} MOVIMENTAÇÃO")
+    styles = SheetStyles(sheet)
+
+    for col, (header, width) in enumerate(zip(HEADERS, COLUMN_WIDTHS), start=1):
+        cell = sheet.cell(row=1, column=col, value=header)
+        styles.add((1, col), 'lilas', 'centro', 'negrito', 'borda')
+        sheet.column_dimensions[cell.column_letter].width = width
+    styles.apply()
+
+    # Mantém o cabeçalho visível ao rolar a lista
+    sheet.freeze_panes = 'A2'
+
+    return sheet
+
+
+if __name__ == "__main__":
+    workbook = Workbook()
+    unit_name = "PAMC"
+    movement_sheet = generate_unit_movement_sheet(workbook, unit_name)
+
+    # Transformar o caminho do arquivo em absoluto
+    output_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Modelo_Movimentacao.xlsx')
+    workbook.save(output_file)
@@ -0,0 +1,145 @@
+"""
+Estilos compartilhados das abas do relatório.
+
+Cada componente (fonte, preenchimento, borda e alinhamento) é criado uma única vez neste módulo. As combinações
+usadas nas células são estilos nomeados (`NamedStyle`), registrados uma vez por workbook e referenciados pelas
+células pelo nome, em vez de novos objetos de estilo atribuídos célula a célula.
+
+Uso nos geradores de abas:
+    styles = SheetStyles(sheet)
+    styles.add('A1:B33', 'borda')
+    styles.add('A1', 'lilas', 'centro', 'negrito')
+    ...
+    styles.apply()
+"""
+from copy import copy
+from weakref import WeakKeyDictionary
+
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.styles.fonts import DEFAULT_FONT
+from openpyxl.utils.cell import range_boundaries
+
+
+def solid_fill(color):
+    return PatternFill(start_color=color, end_color=color, fill_type="solid")
+
+
+THIN_SIDE = Side(style='thin')
+
+# Componentes, por categoria; os nomes são únicos entre as categorias
+FONTS = {
+    "negrito": Font(bold=True),
+    "arial": Font(name='Arial', size=10),
+    "arial_negrito": Font(name='Arial', size=10, bold=True),
+}
+FILLS = {
+    "cinza": solid_fill("C0C0C0"),
+    "azul": solid_fill("00B0F0"),
+    "amarelo": solid_fill("FFFF00"),
+    "lilas": solid_fill("D9D9F3"),
+}
+BORDERS = {
+    "borda": Border(left=THIN_SIDE, right=THIN_SIDE, top=THIN_SIDE, bottom=THIN_SIDE),
+}
+ALIGNMENTS = {
+    "centro": Alignment(horizontal='center', vertical='center'),
+}
+
+# Ordem das categorias no nome do estilo e atributo correspondente do NamedStyle
+CATEGORIES = (("font", FONTS), ("fill", FILLS), ("border", BORDERS), ("alignment", ALIGNMENTS))
+CATEGORY_COMPONENTS = dict(CATEGORIES)
+COMPONENT_CATEGORY = {key: attribute for attribute, components in CATEGORIES for key in components}
+STYLE_SEPARATOR = ' + '
+
+
+def style_name(components):
+    """
+    Nome do estilo nomeado para os componentes informados (por exemplo, "arial + azul + borda + centro").
+
+    Parameters
+    ----------
+    components : dict
+        Dicionário {categoria: componente}, com as categorias "font", "fill", "border" e "alignment".
+    """
+    return STYLE_SEPARATOR.join(components[attribute] for attribute, _ in CATEGORIES if attribute in components)
+
+
+def build_named_style(name):
+    """Cria o `NamedStyle` a partir do nome; as categorias ausentes usam o padrão do Excel."""
+    values = {"font": copy(DEFAULT_FONT)}
+    for key in name.split(STYLE_SEPARATOR):
+        attribute = COMPONENT_CATEGORY[key]
+        values[attribute] = copy(CATEGORY_COMPONENTS[attribute][key])
+    return NamedStyle(name=name, **values)
+
+
+class StyleRegistry:
+    """
+    Estilos nomeados de um workbook: cada estilo é criado e registrado na primeira vez em que é usado.
+
+    Obtida com `registry_for(workbook)`, para que todas as abas do workbook compartilhem os mesmos estilos.
+    """
+
+    def __init__(self, workbook):
+        self.workbook = workbook
+        self.registered = set(workbook.named_styles)
+
+    def register(self, name):
+        if name not in self.registered:
+            self.workbook.add_named_style(build_named_style(name))
+            self.registered.add(name)
+        return name
+
+
+_registries = WeakKeyDictionary()  # Workbook -> StyleRegistry
+
+
+def registry_for(workbook):
+    registry = _registries.get(workbook)
+    if registry is None:
+        registry = _registries[workbook] = StyleRegistry(workbook)
+    return registry
+
+
+class SheetStyles:
+    """
+    Estilos planejados para as células de uma aba.
+
+    `add` combina componentes por célula (um componente substitui o anterior da mesma categoria, como na
+    atribuição direta de `cell.fill`, `cell.font`, ...); `apply` atribui a cada célula o estilo nomeado
+    da sua combinação final, registrando no workbook apenas as combinações distintas.
+    """
+
+    def __init__(self, sheet):
+        self.sheet = sheet
+        self.cells = {}  # (linha, coluna) -> {categoria: componente}
+
+    def add(self, cells, *components):
+        """
+        Acrescenta componentes a uma célula ou intervalo.
+
+        Parameters
+        ----------
+        cells : str or tuple
+            Coordenada ("A1"), intervalo ("A1:B33") ou (linha, coluna).
+        components : str
+            Nomes dos componentes (chaves de FONTS, FILLS, BORDERS ou ALIGNMENTS).
+        """
+        if isinstance(cells, tuple):
+            min_row, min_col = max_row, max_col = cells
+        else:
+            min_col, min_row, max_col, max_row = range_boundaries(cells)
+        updates = {COMPONENT_CATEGORY[component]: component for component in components}
+        for row in range(min_row, max_row + 1):
+            for column in range(min_col, max_col + 1):
+                self.cells.setdefault((row, column), {}).update(updates)
+
+    def apply(self):
+        registry = registry_for(self.sheet.parent)
+        names = {}
+        for (row, column), components in self.cells.items():
+            key = tuple(sorted(components.items()))
+            name = names.get(key)
+            if name is None:
+                name = names[key] = registry.register(style_name(components))
+            self.sheet.cell(row=row, column=column).style = name
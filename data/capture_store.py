@@ -0,0 +1,176 @@
+"""
+Cópias comprimidas das páginas de chamada coletadas, para reprocessar um relatório exatamente com
+o HTML recebido (modo replay) e para servir de amostra realista em testes de desempenho.
+
+Cada execução grava em uma pasta própria (`AAAAMMDD-HHMMSS`) um arquivo `<unidade>.html.gz` por
+unidade, sempre em UTF-8, e ao lado dele `<unidade>.meta.json` com o motor que produziu a página
+("playwright": o DOM serializado pelo navegador; "http": a resposta recebida) e o momento da captura.
+"""
+import codecs
+import gzip
+import json
+import os
+from datetime import datetime
+
+from utils.resource_manager import get_app_dir
+
+CAPTURE_SUFFIX = '.html.gz'
+CAPTURE_DIR_FORMAT = '%Y%m%d-%H%M%S'  # Nome da pasta de cada execução: o momento da coleta
+META_SUFFIX = '.meta.json'
+META_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+READ_CHUNK_SIZE = 64 * 1024
+
+
+def resolve_capture_base(capture_base):
+    """Converte a pasta configurada em caminho absoluto, relativo à raiz do projeto (ou à pasta do executável)."""
+    return capture_base if os.path.isabs(capture_base) else os.path.join(get_app_dir(), capture_base)
+
+
+def new_capture_dir(capture_base):
+    """
+    Cria a pasta de capturas de uma nova execução.
+
+    Parameters
+    ----------
+    capture_base : str
+        Pasta onde as execuções são guardadas.
+
+    Returns
+    -------
+    str
+        Caminho da pasta criada.
+    """
+    capture_dir = os.path.join(resolve_capture_base(capture_base), datetime.now().strftime(CAPTURE_DIR_FORMAT))
+    os.makedirs(capture_dir, exist_ok=True)
+    return capture_dir
+
+
+def capture_time(capture_dir):
+    """
+    Momento da coleta de uma execução capturada.
+
+    Lido dos metadados (a captura mais antiga) ou, para capturas sem metadados, do nome da pasta
+    (`AAAAMMDD-HHMMSS`); se a pasta foi renomeada, usa a data de modificação da captura mais antiga.
+
+    Returns
+    -------
+    datetime or None
+        Momento da coleta, ou None se não houver capturas na pasta.
+    """
+    captures = list_captures(capture_dir)
+    captured = [load_capture_meta(capture_dir, unit).get("captured_at") for unit, _ in captures]
+    captured = [value for value in captured if value]
+    if captured:
+        return datetime.strptime(min(captured), META_TIME_FORMAT)
+    try:
+        return datetime.strptime(os.path.basename(os.path.normpath(capture_dir)), CAPTURE_DIR_FORMAT)
+    except ValueError:
+        pass
+    if not captures:
+        return None
+    return datetime.fromtimestamp(min(os.path.getmtime(path) for _, path in captures))
+
+
+def capture_path(capture_dir, unit):
+    return os.path.join(capture_dir, f"{unit}{CAPTURE_SUFFIX}")
+
+
+def capture_meta_path(capture_dir, unit):
+    return os.path.join(capture_dir, f"{unit}{META_SUFFIX}")
+
+
+def save_capture_meta(capture_dir, unit, engine):
+    """Grava os metadados da captura da unidade: o motor que a produziu e o momento da captura."""
+    temp_path = f"{capture_meta_path(capture_dir, unit)}.part"
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        json.dump({"engine": engine, "captured_at": datetime.now().strftime(META_TIME_FORMAT)}, file)
+    os.replace(temp_path, capture_meta_path(capture_dir, unit))
+
+
+def load_capture_meta(capture_dir, unit):
+    """
+    Lê os metadados da captura da unidade.
+
+    Returns
+    -------
+    dict
+        Dicionário com "engine" e "captured_at", ou vazio para capturas sem metadados.
+    """
+    try:
+        with open(capture_meta_path(capture_dir, unit), 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_capture(capture_dir, unit, html, engine='playwright'):
+    """Grava, comprimida, a página de chamada completa de uma unidade e os metadados da captura."""
+    temp_path = f"{capture_path(capture_dir, unit)}.part"
+    with gzip.open(temp_path, 'wt', encoding='utf-8') as file:
+        file.write(html)
+    os.replace(temp_path, capture_path(capture_dir, unit))
+    save_capture_meta(capture_dir, unit, engine)
+
+
+def tee_capture(capture_dir, unit, chunks, encoding='utf-8', engine='http'):
+    """
+    Grava a página enquanto ela é lida, repassando os pedaços já decodificados.
+
+    Parameters
+    ----------
+    capture_dir : str
+        Pasta de capturas da execução.
+    unit : str
+        Código da unidade prisional.
+    chunks : iterable
+        Pedaços da resposta, em `bytes` (decodificados com `encoding`) ou `str`.
+    encoding : str
+        Codificação da resposta.
+    engine : str
+        Motor que produziu a página, gravado nos metadados.
+
+    Yields
+    ------
+    str
+        Os mesmos pedaços, decodificados.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    temp_path = f"{capture_path(capture_dir, unit)}.part"
+    with gzip.open(temp_path, 'wt', encoding='utf-8') as file:
+        for chunk in chunks:
+            if isinstance(chunk, bytes):
+                chunk = decoder.decode(chunk)
+            file.write(chunk)
+            yield chunk
+        tail = decoder.decode(b'', final=True)
+        if tail:
+            file.write(tail)
+            yield tail
+    os.replace(temp_path, capture_path(capture_dir, unit))
+    save_capture_meta(capture_dir, unit, engine)
+
+
+def list_captures(capture_dir):
+    """
+    Lista as unidades capturadas em uma execução.
+
+    Returns
+    -------
+    list
+        Lista de tuplas (unidade, caminho do arquivo), em ordem alfabética.
+    """
+    captures = []
+    for file_name in sorted(os.listdir(capture_dir)):
+        if file_name.endswith(CAPTURE_SUFFIX):
+            captures.append((file_name[:-len(CAPTURE_SUFFIX)], os.path.join(capture_dir, file_name)))
+    return captures
+
+
+def iter_capture_chunks(path, chunk_size=READ_CHUNK_SIZE):
+    """Lê uma captura em pedaços de texto, sem carregá-la inteira na memória."""
+    with gzip.open(path, 'rt', encoding='utf-8') as file:
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
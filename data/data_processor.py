@@ -1,15 +1,48 @@
+import asyncio
 import json
-from playwright.sync_api import Page
+from collections import deque
+from typing import TYPE_CHECKING
+from config.app_settings import ROLL_CALL_PATH, canaime_url
+from data.capture_store import save_capture
+from data.roll_call_parser import parse_entry
+from utils.metrics import RunMetrics
 from utils.resource_manager import resource_path
 import logging
 
+if TYPE_CHECKING:
+    # Apenas para as anotações: a coleta via HTTP e o replay não precisam carregar o Playwright
+    from playwright.async_api import Page as AsyncPage
+    from playwright.sync_api import Page
+
 logger = logging.getLogger(__name__)
 
+# Seletores dos elementos da página de chamada com fotos
+ENTRY_SELECTOR = '.titulobkSingCAPS'
+NAME_SELECTOR = '.titulo12bk'
+LOGIN_FORM_SELECTOR = 'input[name="senha"]'
+
+# Script executado na página para extrair, de uma só vez, o texto de cada entrada e o nome do preso
+BULK_EXTRACTION_SCRIPT = f"""
+entries => entries.map(entry => {{
+    const name = entry.querySelector('{NAME_SELECTOR}');
+    return [entry.textContent, name ? name.textContent : ''];
+}})
+"""
+
+
+class SessionExpiredError(Exception):
+    """A página pedida devolveu o formulário de login: a sessão foi recusada ou expirou."""
+
 
 class UnitProcessor:
-    def __init__(self, page: Page):
+    def __init__(self, page: 'Page', bulk_extraction: bool = True, capture_dir: str = None,
+                 metrics: RunMetrics = None):
         self.page = page
+        self.bulk_extraction = bulk_extraction
+        self.capture_dir = capture_dir  # Pasta onde guardar o HTML bruto de cada unidade (modo replay)
+        self.metrics = metrics or RunMetrics()  # Tempos por etapa e por unidade
         self.units_config = self.load_units_config()
+        self._unit_indexes = {}  # Índices (ala, cela) -> bloco já compilados, por configuração
 
     def load_units_config(self):
         """
@@ -39,6 +72,58 @@ class UnitProcessor:
             logger.error(f"Erro ao decodificar o JSON: {e}")
             return {}
 
+    @staticmethod
+    def build_unit_index(unit_config):
+        """
+        Compila a configuração da unidade em um índice (ala, cela) -> bloco.
+
+        Alas com lista de celas vazia (HGR, TRATOX, TRIAGEM, ...) aceitam qualquer cela e recebem
+        a entrada curinga (ala, None). A ordem dos blocos é respeitada: vale o primeiro bloco que
+        aceitaria a combinação, como na busca sequencial pela configuração.
+
+        Parameters
+        ----------
+        unit_config : dict
+            Configuração da unidade.
+
+        Returns
+        -------
+        dict
+            Dicionário {(ala, cela): bloco}, com cela None para as alas curinga.
+        """
+        index = {}
+        for block_key, block_data in unit_config.get("blocks", {}).items():
+            for wing, wing_data in block_data["alas"].items():
+                if "celas" not in wing_data or (wing, None) in index:
+                    continue
+                if not wing_data["celas"]:
+                    index[(wing, None)] = block_key
+                else:
+                    for cell in wing_data["celas"]:
+                        index.setdefault((wing, cell), block_key)
+        return index
+
+    @staticmethod
+    def lookup_block(index, wing, cell):
+        """
+        Retorna o bloco de (ala, cela) no índice compilado, ou None se a ala ou cela não estiver definida.
+
+        A cela é procurada primeiro; se não existir, vale a entrada curinga (ala, None) das alas sem lista de
+        celas, às quais qualquer cela pode ser adicionada.
+        """
+        block_key = index.get((wing, cell))
+        if block_key is None:
+            block_key = index.get((wing, None))
+        return block_key
+
+    def get_unit_index(self, unit_config):
+        """Retorna o índice compilado da configuração, compilando-o apenas na primeira vez."""
+        cached = self._unit_indexes.get(id(unit_config))
+        if cached is None or cached[0] is not unit_config:
+            cached = (unit_config, self.build_unit_index(unit_config))
+            self._unit_indexes[id(unit_config)] = cached
+        return cached[1]
+
     def map_prisoner_data(self, unit_config, wing, cell, code, inmate):
         """
         Mapeia os dados do preso para a estrutura da unidade conforme definida no JSON de configuração.
@@ -61,21 +146,52 @@ class UnitProcessor:
         dict or None
             Dicionário formatado com os dados do preso, ou None se a ala ou cela não estiver definida.
         """
-        for block_key, block_data in unit_config.get("blocks", {}).items():
-            if wing in block_data["alas"]:
-                # Se a ala for encontrada, verificar se a cela está listada
-                if "celas" in block_data["alas"][wing]:
-                    celas_list = block_data["alas"][wing]["celas"]
-                    # Permitir adicionar celas em alas que possuem lista vazia
-                    if not celas_list or cell in celas_list:
-                        return {
-                            "Bloco": block_key,
-                            "Ala": wing,
-                            "Cela": cell,
-                            "Código": code,
-                            "Preso": inmate
-                        }
-        return None
+        block_key = self.lookup_block(self.get_unit_index(unit_config), wing, cell)
+        if block_key is None:
+            return None
+
+        return {
+            "Bloco": block_key,
+            "Ala": wing,
+            "Cela": cell,
+            "Código": code,
+            "Preso": inmate
+        }
+
+    # Conversão do texto de uma entrada em (código, ala, cela, preso)
+    parse_entry = staticmethod(parse_entry)
+
+    @staticmethod
+    def unit_url(unit: str) -> str:
+        """Retorna o endereço da página de chamada com fotos da unidade."""
+        return f'{canaime_url(ROLL_CALL_PATH)}?id_und_prisional={unit}'
+
+    def extract_entries(self, page: 'Page' = None) -> list:
+        """
+        Extrai o texto bruto de todas as entradas da página atualmente carregada.
+
+        No modo em lote (padrão), todas as entradas são lidas com uma única avaliação na página,
+        evitando duas chamadas ao navegador por preso.
+
+        Parameters
+        ----------
+        page : Page, optional
+            Página de onde extrair as entradas. Usa a página do processador se não informada.
+
+        Returns
+        -------
+        list
+            Lista de pares (texto da entrada, nome do preso).
+        """
+        page = page or self.page
+        all_entries = page.locator(ENTRY_SELECTOR)
+
+        if self.bulk_extraction:
+            return all_entries.evaluate_all(BULK_EXTRACTION_SCRIPT)
+
+        names = page.locator(f'{ENTRY_SELECTOR} {NAME_SELECTOR}')
+        count = all_entries.count()
+        return [(all_entries.nth(i).text_content(), names.nth(i).text_content()) for i in range(count)]
 
     def create_unit_list(self, unit: str) -> dict:
         """
@@ -91,9 +207,6 @@ class UnitProcessor:
         dict
             Dicionário com os dados da unidade.
         """
-        raw_unit_list = []  # Lista antes do mapeamento
-        mapped_unit_list = []  # Lista após o mapeamento
-
         # Carregar a configuração para a unidade específica
         unit_config = self.units_config.get(unit, {})
         if not unit_config:
@@ -103,36 +216,269 @@ class UnitProcessor:
         logger.info(f"Processando a unidade {unit}.")
 
         # Carregar a página e coletar os elementos necessários
-        self.page.goto(
-            f'https://canaime.com.br/sgp2rr/areas/impressoes/UND_ChamadaFOTOS_todos2.php?id_und_prisional={unit}',
-            timeout=0
-        )
-        all_entries = self.page.locator('.titulobkSingCAPS')
-        names = self.page.locator('.titulobkSingCAPS .titulo12bk')
+        with self.metrics.phase('goto', unit):
+            self.page.goto(self.unit_url(unit), timeout=0)
+        self.capture_page(unit, self.page)
+        with self.metrics.phase('extract', unit):
+            entries = self.extract_entries()
+        if not entries:
+            self.check_session(self.page)
+        logger.info(f"Total de entradas encontradas: {len(entries)}")
 
-        count = all_entries.count()
-        logger.info(f"Total de entradas encontradas: {count}")
-
-        for i in range(count):
-            processed_entry = all_entries.nth(i).text_content().replace(" ", "").strip()
-            [code, _, _, _, wing_cell] = processed_entry.split('\n')
-            inmate = names.nth(i).text_content().strip()
-            wing_cell = wing_cell.replace("ALA:", "")
-            split_index = wing_cell.rfind('/')
-            wing = wing_cell[:split_index].strip()
-            cell = wing_cell[split_index + 1:].strip()
-
-            # Adicionar os dados brutos à lista raw
-            raw_unit_list.append({
-                "Wing": wing,
-                "Cell": cell,
-                "Code": code[2:],  # Remover os dois primeiros caracteres do código
-                "Inmate": inmate
-            })
-
-            # Usar a função de mapeamento para formatar os dados corretamente
-            formatted_data = self.map_prisoner_data(unit_config, wing, cell, code[2:], inmate)
-            if formatted_data:
-                mapped_unit_list.append(formatted_data)
-
-        return {unit: mapped_unit_list}
+        return self.build_unit_list(unit, entries)
+
+    def capture_page(self, unit: str, page: 'Page'):
+        """Guarda o HTML da página carregada, se a captura estiver ativa. Falhas só são registradas."""
+        if not self.capture_dir:
+            return
+        try:
+            save_capture(self.capture_dir, unit, page.content(), engine='playwright')
+        except Exception as e:
+            logger.error(f"Erro ao capturar a página da unidade {unit}: {str(e)}")
+
+    @staticmethod
+    def check_session(page: 'Page'):
+        """
+        Verifica se a página carregada é o formulário de login, o que indica sessão recusada.
+
+        Chamado apenas quando a página não trouxe entradas, para não custar uma ida ao navegador
+        a mais no caminho normal.
+
+        Raises
+        ------
+        SessionExpiredError
+            Se a página contiver o formulário de login.
+        """
+        if page.locator(LOGIN_FORM_SELECTOR).count() > 0:
+            raise SessionExpiredError("A sessão do Canaimé foi recusada ou expirou.")
+
+    def collect_units(self, units, workers: int = 1) -> dict:
+        """
+        Coleta várias unidades em paralelo, com até `workers` páginas carregando ao mesmo tempo.
+
+        As páginas são abertas no mesmo contexto da página logada e, portanto, compartilham os cookies
+        da sessão. A navegação é disparada sem aguardar o carregamento completo, de modo que o navegador
+        baixa as páginas simultaneamente enquanto os dados já carregados são extraídos. Uma falha em uma
+        unidade é registrada e não interrompe as demais; a exceção é a sessão recusada
+        (`SessionExpiredError`), que é repassada a quem chamou.
+
+        Parameters
+        ----------
+        units : list
+            Códigos das unidades prisionais.
+        workers : int
+            Número máximo de páginas carregando simultaneamente.
+
+        Returns
+        -------
+        dict
+            Dicionário {unidade: [registros]} com as unidades coletadas com sucesso.
+        """
+        all_units_data = {}
+        context = self.page.context
+        pending = deque()
+        in_flight = deque()
+
+        for unit in units:
+            if unit in self.units_config:
+                pending.append(unit)
+            else:
+                logger.warning(f"Configuração para a unidade {unit} não encontrada.")
+
+        def start_next():
+            unit = pending.popleft()
+            page = None
+            try:
+                page = context.new_page()
+                with self.metrics.phase('goto', unit):
+                    page.goto(self.unit_url(unit), timeout=0, wait_until='commit')
+                in_flight.append((unit, page))
+            except Exception as e:
+                logger.error(f"Erro ao abrir a página da unidade {unit}: {str(e)}")
+                if page:
+                    page.close()
+
+        while pending or in_flight:
+            while pending and len(in_flight) < max(1, workers):
+                start_next()
+            if not in_flight:
+                continue
+
+            unit, page = in_flight.popleft()
+            try:
+                logger.info(f"Processando a unidade {unit}.")
+                with self.metrics.phase('load', unit):
+                    page.wait_for_load_state('load', timeout=0)
+                self.capture_page(unit, page)
+                with self.metrics.phase('extract', unit):
+                    entries = self.extract_entries(page)
+                if not entries:
+                    self.check_session(page)
+                logger.info(f"Total de entradas encontradas em {unit}: {len(entries)}")
+                all_units_data.update(self.build_unit_list(unit, entries))
+            except SessionExpiredError:
+                # Sem sessão válida as demais unidades também falhariam: fecha tudo e avisa quem chamou
+                for _, other_page in in_flight:
+                    other_page.close()
+                raise
+            except Exception as e:
+                logger.error(f"Erro ao processar unidade {unit}: {str(e)}")
+            finally:
+                page.close()
+
+        return all_units_data
+
+    def build_unit_list(self, unit: str, entries) -> dict:
+        """
+        Converte as entradas brutas da página de chamada nos dados mapeados da unidade.
+
+        Parameters
+        ----------
+        unit : str
+            Código da unidade prisional.
+        entries : iterable
+            Pares (texto da entrada, nome do preso), como retornados por `extract_entries`.
+
+        Returns
+        -------
+        dict
+            Dicionário com os dados da unidade.
+        """
+        with self.metrics.phase('map', unit):
+            records = (self.parse_entry(entry_text, inmate_text) for entry_text, inmate_text in entries)
+            unit_list = list(self.iter_mapped_records(unit, records))
+        self.metrics.set_records(unit, len(unit_list))
+        return {unit: unit_list}
+
+    def iter_mapped_records(self, unit: str, records):
+        """
+        Mapeia, um a um, os registros brutos para a estrutura da unidade.
+
+        Os registros podem vir de um gerador (por exemplo, `iter_roll_call_records`), de modo que
+        nenhuma lista intermediária com os dados brutos é criada.
+
+        Parameters
+        ----------
+        unit : str
+            Código da unidade prisional.
+        records : iterable
+            Tuplas (código, ala, cela, preso).
+
+        Yields
+        ------
+        dict
+            Dados do preso mapeados; registros fora da configuração da unidade são descartados.
+        """
+        index = self.get_unit_index(self.units_config.get(unit, {}))
+        lookup_block = self.lookup_block
+        for code, wing, cell, inmate in records:
+            # Índice compilado uma vez por unidade; a entrada curinga cobre as alas sem celas
+            block_key = lookup_block(index, wing, cell)
+            if block_key is not None:
+                yield {"Bloco": block_key, "Ala": wing, "Cela": cell, "Código": code, "Preso": inmate}
+
+
+class AsyncUnitProcessor(UnitProcessor):
+    """
+    Versão assíncrona de `UnitProcessor`, para uso com `playwright.async_api`.
+
+    A navegação e a extração das unidades acontecem em paralelo no laço de eventos, limitadas por um
+    semáforo; o mapeamento dos registros roda em uma thread auxiliar para não bloquear as demais páginas.
+    """
+
+    async def extract_entries(self, page: 'AsyncPage' = None) -> list:
+        page = page or self.page
+        all_entries = page.locator(ENTRY_SELECTOR)
+
+        if self.bulk_extraction:
+            return await all_entries.evaluate_all(BULK_EXTRACTION_SCRIPT)
+
+        names = page.locator(f'{ENTRY_SELECTOR} {NAME_SELECTOR}')
+        count = await all_entries.count()
+        return [(await all_entries.nth(i).text_content(), await names.nth(i).text_content()) for i in range(count)]
+
+    async def create_unit_list(self, unit: str, page: 'AsyncPage' = None) -> dict:
+        """
+        Coleta e mapeia os dados de uma unidade.
+
+        Parameters
+        ----------
+        unit : str
+            Código da unidade prisional.
+        page : AsyncPage, optional
+            Página usada para a navegação. Usa a página do processador se não informada.
+
+        Returns
+        -------
+        dict
+            Dicionário com os dados da unidade.
+        """
+        page = page or self.page
+        if unit not in self.units_config:
+            logger.warning(f"Configuração para a unidade {unit} não encontrada.")
+            return {}
+
+        logger.info(f"Processando a unidade {unit}.")
+        with self.metrics.phase('goto', unit):
+            await page.goto(self.unit_url(unit), timeout=0)
+        if self.capture_dir:
+            try:
+                save_capture(self.capture_dir, unit, await page.content(), engine='playwright')
+            except Exception as e:
+                logger.error(f"Erro ao capturar a página da unidade {unit}: {str(e)}")
+        with self.metrics.phase('extract', unit):
+            entries = await self.extract_entries(page)
+        if not entries and await page.locator(LOGIN_FORM_SELECTOR).count() > 0:
+            raise SessionExpiredError("A sessão do Canaimé foi recusada ou expirou.")
+        logger.info(f"Total de entradas encontradas em {unit}: {len(entries)}")
+
+        if self.metrics.profiler:
+            # O perfilador mede apenas a sua thread: com o perfil ativo, o mapeamento roda no laço de eventos
+            return self.build_unit_list(unit, entries)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.build_unit_list, unit, entries)
+
+    async def collect_units(self, units, workers: int = 1) -> dict:
+        """
+        Coleta várias unidades simultaneamente, uma página por unidade e no máximo `workers` por vez.
+
+        Uma falha em uma unidade é registrada e não cancela as demais; a exceção é a sessão recusada
+        (`SessionExpiredError`), que é repassada a quem chamou depois que todas as páginas terminam.
+
+        Parameters
+        ----------
+        units : list
+            Códigos das unidades prisionais.
+        workers : int
+            Número máximo de unidades processadas ao mesmo tempo.
+
+        Returns
+        -------
+        dict
+            Dicionário {unidade: [registros]} com as unidades coletadas com sucesso.
+        """
+        semaphore = asyncio.Semaphore(max(1, workers))
+        context = self.page.context
+
+        async def collect_unit(unit):
+            async with semaphore:
+                page = await context.new_page()
+                try:
+                    return await self.create_unit_list(unit, page)
+                finally:
+                    await page.close()
+
+        results = await asyncio.gather(*(collect_unit(unit) for unit in units), return_exceptions=True)
+
+        for result in results:
+            if isinstance(result, SessionExpiredError):
+                # Sem sessão válida as demais unidades também falharam: quem chamou refaz o login
+                raise result
+
+        all_units_data = {}
+        for unit, result in zip(units, results):
+            if isinstance(result, Exception):
+                logger.error(f"Erro ao processar unidade {unit}: {str(result)}")
+            else:
+                all_units_data.update(result)
+        return all_units_data
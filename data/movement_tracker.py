@@ -0,0 +1,123 @@
+import sqlite3
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+
+from config.app_settings import load_app_settings, next_shift_change
+from data.snapshot_store import SnapshotStore
+from utils.logger import Logger
+
+logger = Logger.get_logger()
+
+
+def build_snapshot(records):
+    """
+    Indexa os registros da unidade pelo código do preso.
+
+    Parameters
+    ----------
+    records : list
+        Registros mapeados da unidade (chaves Bloco, Ala, Cela, Código e Preso).
+
+    Returns
+    -------
+    dict
+        Dicionário {código: [bloco, ala, cela, preso]}.
+    """
+    return {record["Código"]: [record["Bloco"], record["Ala"], record["Cela"], record["Preso"]] for record in records}
+
+
+def shift_start(moment, shift_change_time=None):
+    """
+    Início do plantão que contém `moment`: a troca de plantão mais recente até ele.
+
+    Parameters
+    ----------
+    moment : datetime
+        Momento dentro do plantão.
+    shift_change_time : str, optional
+        Horário da troca de plantão ("HH:MM"). Usa `daemon.shift_change_time` das configurações se não
+        informado, o mesmo horário em que o modo daemon faz as coletas.
+    """
+    shift_change_time = shift_change_time or load_app_settings()["daemon"]["shift_change_time"]
+    return next_shift_change(moment, shift_change_time) - timedelta(days=1)
+
+
+def diff_snapshots(previous, current):
+    """
+    Compara duas fotografias da unidade por código do preso, em tempo linear.
+
+    Parameters
+    ----------
+    previous : dict
+        Fotografia da coleta de referência ({código: [bloco, ala, cela, preso]}).
+    current : dict
+        Fotografia da execução atual.
+
+    Returns
+    -------
+    dict
+        Dicionário com as listas "entradas" e "saidas" (tuplas código, bloco, ala, cela, preso) e
+        "mudancas" (tuplas código, preso, ala e cela anteriores, ala e cela atuais).
+    """
+    previous_codes = previous.keys()
+    current_codes = current.keys()
+
+    entradas = [(code, *current[code]) for code in current_codes - previous_codes]
+    saidas = [(code, *previous[code]) for code in previous_codes - current_codes]
+    mudancas = []
+    for code in current_codes & previous_codes:
+        _, old_wing, old_cell, _ = previous[code]
+        _, new_wing, new_cell, inmate = current[code]
+        if old_wing != new_wing or old_cell != new_cell:
+            mudancas.append((code, inmate, old_wing, old_cell, new_wing, new_cell))
+
+    return {
+        "entradas": sorted(entradas),
+        "saidas": sorted(saidas),
+        "mudancas": sorted(mudancas),
+    }
+
+
+def track_movements(all_units_data, collected_at=None, store=None, shift_change_time=None):
+    """
+    Calcula as movimentações de cada unidade em relação à última coleta do plantão anterior.
+
+    A referência é lida do histórico (`snapshot_store`): a coleta mais recente da unidade feita antes do
+    início do plantão atual, que começa na troca de plantão configurada (`daemon.shift_change_time`). Assim, várias coletas no mesmo plantão comparam-se com a mesma referência e
+    relatam as mesmas entradas e saídas acumuladas, em vez de zerá-las a cada execução.
+
+    Unidades sem registros (por exemplo, por falha na coleta) são ignoradas, para não registrar todos
+    os presos como saída.
+
+    Parameters
+    ----------
+    all_units_data : dict
+        Dicionário {unidade: [registros]}.
+    collected_at : datetime, optional
+        Momento da coleta atual. Usa o momento atual se não informado.
+    store : SnapshotStore, optional
+        Histórico já aberto. Se não informado, abre o histórico padrão.
+    shift_change_time : str, optional
+        Horário da troca de plantão ("HH:MM"); ver `shift_start`.
+
+    Returns
+    -------
+    dict
+        Dicionário {unidade: movimentações}; unidades sem coleta em plantão anterior ficam de fora.
+    """
+    baseline_end = shift_start(collected_at or datetime.now(), shift_change_time)
+    movements = {}
+    try:
+        with (nullcontext(store) if store is not None else SnapshotStore()) as history:
+            for unit, records in all_units_data.items():
+                if not records:
+                    continue
+                run_id = history.latest_run_before(unit, baseline_end)
+                if run_id is None:
+                    continue
+                movements[unit] = diff_snapshots(history.unit_snapshot(run_id, unit), build_snapshot(records))
+                logger.info(f"Movimentações em {unit}: {len(movements[unit]['entradas'])} entradas, "
+                            f"{len(movements[unit]['saidas'])} saídas, {len(movements[unit]['mudancas'])} mudanças.")
+    except sqlite3.Error as e:
+        logger.error(f"Erro ao ler o histórico para as movimentações: {e}")
+    return movements
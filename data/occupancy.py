@@ -0,0 +1,132 @@
+"""
+Contagem da ocupação (presos por cela, ala e bloco) sem pandas.
+
+As combinações (bloco, ala, cela) da configuração da unidade são numeradas em índices densos; os registros
+são contados em uma única passagem e as somas por ala e por bloco saem dos vetores de contagem.
+"""
+import json
+from collections import Counter
+from operator import itemgetter
+
+from utils.logger import Logger
+from utils.resource_manager import resource_path
+
+logger = Logger.get_logger()
+
+location_key = itemgetter("Bloco", "Ala", "Cela")
+
+
+def load_units_config():
+    """
+    Carrega a configuração das unidades (config/units_config.json).
+
+    Returns
+    -------
+    dict
+        Configuração das unidades, ou um dicionário vazio em caso de falha.
+    """
+    units_config_path = resource_path('config/units_config.json')
+    try:
+        with open(units_config_path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.error(f"Erro ao carregar a configuração das unidades de {units_config_path}: {str(e)}")
+        return {}
+
+
+class OccupancyIndex:
+    """
+    Numeração densa dos blocos, alas e celas de uma unidade, na ordem da configuração.
+
+    Celas fora da configuração (alas sem lista de celas, como TRIAGEM e HGR) recebem um índice novo
+    na primeira vez em que aparecem.
+    """
+
+    def __init__(self, unit_config=None):
+        self.blocks = {}  # bloco -> índice
+        self.alas = {}  # (bloco, ala) -> índice
+        self.cells = {}  # (bloco, ala, cela) -> índice
+        self.ala_block = []  # índice da ala -> índice do bloco
+        self.cell_ala = []  # índice da cela -> índice da ala
+
+        for block_key, block_data in (unit_config or {}).get("blocks", {}).items():
+            self.block_slot(block_key)
+            for wing, wing_data in block_data["alas"].items():
+                self.ala_slot(block_key, wing)
+                for cell in wing_data.get("celas") or ():
+                    self.cell_slot((block_key, wing, cell))
+
+    def block_slot(self, block_key):
+        slot = self.blocks.get(block_key)
+        if slot is None:
+            slot = self.blocks[block_key] = len(self.blocks)
+        return slot
+
+    def ala_slot(self, block_key, wing):
+        slot = self.alas.get((block_key, wing))
+        if slot is None:
+            slot = self.alas[(block_key, wing)] = len(self.alas)
+            self.ala_block.append(self.block_slot(block_key))
+        return slot
+
+    def cell_slot(self, key):
+        slot = self.cells.get(key)
+        if slot is None:
+            slot = self.cells[key] = len(self.cells)
+            self.cell_ala.append(self.ala_slot(key[0], key[1]))
+        return slot
+
+
+def count_occupancy(records, unit_config=None):
+    """
+    Conta os presos por cela, ala e bloco.
+
+    Parameters
+    ----------
+    records : iterable
+        Registros mapeados da unidade (dicionários com "Bloco", "Ala" e "Cela").
+    unit_config : dict, optional
+        Configuração da unidade, que define a ordem e inclui nos totais as alas e blocos vazios.
+
+    Returns
+    -------
+    dict
+        Dicionário com as chaves:
+        - "celas": {bloco: {ala: {cela: quantidade}}}, apenas com as celas ocupadas;
+        - "alas": {bloco: {ala: quantidade}};
+        - "blocos": {bloco: quantidade};
+        - "total": quantidade de presos.
+    """
+    index = OccupancyIndex(unit_config)
+
+    # Uma única passagem pelos registros; o restante percorre apenas as celas distintas
+    location_counts = Counter(map(location_key, records))
+    slots = [(index.cell_slot(key), count) for key, count in location_counts.items()]
+
+    cell_counts = [0] * len(index.cells)
+    for slot, count in slots:
+        cell_counts[slot] = count
+
+    ala_counts = [0] * len(index.alas)
+    for slot, count in enumerate(cell_counts):
+        ala_counts[index.cell_ala[slot]] += count
+
+    block_counts = [0] * len(index.blocks)
+    for slot, count in enumerate(ala_counts):
+        block_counts[index.ala_block[slot]] += count
+
+    cells = {}
+    for (block_key, wing, cell), slot in index.cells.items():
+        if cell_counts[slot]:
+            cells.setdefault(block_key, {}).setdefault(wing, {})[cell] = cell_counts[slot]
+
+    alas = {}
+    for (block_key, wing), slot in index.alas.items():
+        alas.setdefault(block_key, {})[wing] = ala_counts[slot]
+
+    return {
+        "celas": cells,
+        "alas": alas,
+        "blocos": {block_key: block_counts[slot] for block_key, slot in index.blocks.items()},
+        "total": sum(block_counts),
+    }
@@ -0,0 +1,270 @@
+import codecs
+import re
+from html.parser import HTMLParser
+
+# Classes dos elementos da página de chamada com fotos
+ENTRY_CLASS = 'titulobkSingCAPS'
+NAME_CLASS = 'titulo12bk'
+
+# Codificação declarada em `<meta charset>` ou `<meta http-equiv="Content-Type" content="...; charset=...">`,
+# procurada nos primeiros bytes do documento, como faz o navegador
+META_CHARSET_PATTERN = re.compile(rb'<meta[^>]*?charset\s*=\s*["\']?\s*([a-z0-9_.:-]+)', re.IGNORECASE)
+META_SNIFF_BYTES = 1024
+
+
+def parse_entry(entry_text, inmate_text):
+    """
+    Converte o texto de uma entrada da página de chamada nos campos do preso.
+
+    Parameters
+    ----------
+    entry_text : str
+        Conteúdo textual completo do elemento `.titulobkSingCAPS`.
+    inmate_text : str
+        Conteúdo textual do elemento `.titulo12bk` (nome do preso).
+
+    Returns
+    -------
+    tuple
+        Tupla (código, ala, cela, preso).
+    """
+    processed_entry = entry_text.replace(" ", "").strip()
+    [code, _, _, _, wing_cell] = processed_entry.split('\n')
+    inmate = inmate_text.strip()
+    wing_cell = wing_cell.replace("ALA:", "")
+    split_index = wing_cell.rfind('/')
+    wing = wing_cell[:split_index].strip()
+    cell = wing_cell[split_index + 1:].strip()
+    return code[2:], wing, cell, inmate  # Remove os dois primeiros caracteres do código
+
+
+def has_class(attrs, class_name):
+    """Verifica se a lista de atributos de uma tag contém a classe informada."""
+    for attr_name, attr_value in attrs:
+        if attr_name == 'class' and attr_value and class_name in attr_value.split():
+            return True
+    return False
+
+
+class RollCallParser(HTMLParser):
+    """
+    Extrai as entradas da página de chamada (UND_ChamadaFOTOS_todos2.php) sem navegador.
+
+    Cada entrada é um par (texto da entrada, nome do preso) equivalente ao `text_content()`
+    dos elementos `.titulobkSingCAPS` e `.titulobkSingCAPS .titulo12bk` lidos pelo Playwright.
+
+    O documento pode ser entregue aos poucos com `feed()`; as entradas concluídas se acumulam em
+    `entries` e podem ser retiradas com `pop_entries()` a cada pedaço processado.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.entries = []
+        self.login_form_found = False  # A página devolvida é o formulário de login (sessão recusada)
+
+        # Estado da entrada em andamento
+        self._entry_tag = None
+        self._entry_depth = 0
+        self._entry_text = []
+
+        # Estado do nome do preso dentro da entrada
+        self._name_tag = None
+        self._name_depth = 0
+        self._name_text = []
+        self._name = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'input' and ('name', 'senha') in attrs:
+            self.login_form_found = True
+
+        if has_class(attrs, ENTRY_CLASS):
+            # Uma nova entrada encerra a anterior, caso a tag não tenha sido fechada no HTML
+            if self._entry_tag is not None:
+                self._finish_entry()
+            self._entry_tag = tag
+            self._entry_depth = 1
+            return
+
+        if self._entry_tag is None:
+            return
+
+        if tag == self._entry_tag:
+            self._entry_depth += 1
+
+        if self._name_tag is None:
+            if self._name is None and has_class(attrs, NAME_CLASS):
+                self._name_tag = tag
+                self._name_depth = 1
+        elif tag == self._name_tag:
+            self._name_depth += 1
+
+    def handle_endtag(self, tag):
+        if self._entry_tag is None:
+            return
+
+        if self._name_tag is not None and tag == self._name_tag:
+            self._name_depth -= 1
+            if self._name_depth == 0:
+                self._name = ''.join(self._name_text)
+                self._name_tag = None
+
+        if tag == self._entry_tag:
+            self._entry_depth -= 1
+            if self._entry_depth == 0:
+                self._finish_entry()
+
+    def handle_data(self, data):
+        if self._entry_tag is None:
+            return
+        self._entry_text.append(data)
+        if self._name_tag is not None:
+            self._name_text.append(data)
+
+    def pop_entries(self):
+        """Retorna as entradas concluídas até o momento e as remove do parser."""
+        entries = self.entries
+        self.entries = []
+        return entries
+
+    def close(self):
+        super().close()
+        if self._entry_tag is not None:
+            self._finish_entry()
+
+    def _finish_entry(self):
+        if self._name is None:
+            self._name = ''.join(self._name_text)
+        self.entries.append((''.join(self._entry_text), self._name))
+
+        self._entry_tag = None
+        self._entry_depth = 0
+        self._entry_text = []
+        self._name_tag = None
+        self._name_depth = 0
+        self._name_text = []
+        self._name = None
+
+
+def parse_roll_call(html):
+    """
+    Extrai todas as entradas de um documento HTML da página de chamada.
+
+    Parameters
+    ----------
+    html : str
+        Documento HTML completo.
+
+    Returns
+    -------
+    list
+        Lista de pares (texto da entrada, nome do preso).
+    """
+    parser = RollCallParser()
+    parser.feed(html)
+    parser.close()
+    return parser.entries
+
+
+def iter_roll_call_entries(chunks, encoding='utf-8', parser=None):
+    """
+    Lê a página de chamada de forma incremental, gerando cada entrada assim que ela termina.
+
+    Apenas o pedaço atual e a entrada em andamento ficam em memória, independentemente do
+    tamanho da unidade.
+
+    Parameters
+    ----------
+    chunks : iterable
+        Pedaços do documento, em `bytes` (decodificados com `encoding`) ou `str`.
+    encoding : str
+        Codificação usada para decodificar os pedaços em `bytes`.
+    parser : RollCallParser, optional
+        Parser a utilizar, para que quem chamou possa consultar seu estado ao final.
+
+    Yields
+    ------
+    tuple
+        Pares (texto da entrada, nome do preso).
+    """
+    parser = parser or RollCallParser()
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+
+    for chunk in chunks:
+        if isinstance(chunk, bytes):
+            chunk = decoder.decode(chunk)
+        parser.feed(chunk)
+        yield from parser.pop_entries()
+
+    parser.feed(decoder.decode(b'', final=True))
+    parser.close()
+    yield from parser.pop_entries()
+
+
+def iter_roll_call_records(chunks, encoding='utf-8', parser=None):
+    """
+    Gera os registros (código, ala, cela, preso) da página de chamada lida de forma incremental.
+
+    Parameters
+    ----------
+    chunks : iterable
+        Pedaços do documento, em `bytes` ou `str`.
+    encoding : str
+        Codificação usada para decodificar os pedaços em `bytes`.
+    parser : RollCallParser, optional
+        Parser a utilizar, para que quem chamou possa consultar seu estado ao final.
+
+    Yields
+    ------
+    tuple
+        Tuplas (código, ala, cela, preso).
+    """
+    for entry_text, inmate_text in iter_roll_call_entries(chunks, encoding=encoding, parser=parser):
+        yield parse_entry(entry_text, inmate_text)
+
+
+def detect_encoding(chunks, declared=None, default='utf-8'):
+    """
+    Determina a codificação de um documento lido em pedaços de `bytes`.
+
+    A codificação do cabeçalho HTTP (`declared`) tem precedência; sem ela, vale a declarada na tag `<meta>`
+    dos primeiros bytes. Como no navegador, "iso-8859-1" é lida como "windows-1252", de modo que os dois
+    motores de coleta decodificam a página da mesma forma.
+
+    Parameters
+    ----------
+    chunks : iterable
+        Pedaços do documento, em `bytes`.
+    declared : str, optional
+        Codificação informada no cabeçalho `Content-Type` da resposta.
+    default : str
+        Codificação usada quando nenhuma é declarada (ou a declarada é desconhecida).
+
+    Returns
+    -------
+    tuple
+        Tupla (codificação, pedaços); os pedaços lidos para a detecção continuam no início do iterador.
+    """
+    chunks = iter(chunks)
+    head = []
+    size = 0
+    if not declared:
+        for chunk in chunks:
+            head.append(chunk)
+            size += len(chunk)
+            if size >= META_SNIFF_BYTES:
+                break
+        match = META_CHARSET_PATTERN.search(b''.join(head)[:META_SNIFF_BYTES])
+        declared = match.group(1).decode('ascii') if match else None
+
+    try:
+        encoding = codecs.lookup(declared or default).name
+    except LookupError:
+        encoding = codecs.lookup(default).name
+    if encoding == 'iso8859-1':
+        encoding = 'cp1252'
+
+    def restored():
+        yield from head
+        yield from chunks
+
+    return encoding, restored()
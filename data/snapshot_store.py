@@ -0,0 +1,208 @@
+"""
+Histórico local (SQLite) de todas as coletas, para consultas por unidade, ala, cela, código e período
+sem precisar coletar novamente.
+"""
+import argparse
+import os
+import sqlite3
+from datetime import datetime, time
+
+from utils.logger import Logger
+from utils.resource_manager import get_data_dir
+
+logger = Logger.get_logger()
+
+DB_PATH = get_data_dir('snapshots.db')
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    collected_at TEXT NOT NULL,
+    shift TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_collected_at ON runs (collected_at);
+
+CREATE TABLE IF NOT EXISTS records (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    unit TEXT NOT NULL,
+    bloco TEXT NOT NULL,
+    ala TEXT NOT NULL,
+    cela TEXT NOT NULL,
+    codigo TEXT NOT NULL,
+    preso TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS records_location ON records (unit, ala, cela, run_id);
+CREATE INDEX IF NOT EXISTS records_cell ON records (unit, cela, run_id);
+CREATE INDEX IF NOT EXISTS records_code ON records (codigo, run_id);
+CREATE INDEX IF NOT EXISTS records_run ON records (run_id, unit);
+"""
+
+
+class SnapshotStore:
+    """
+    Armazena cada resultado {unidade: [registros]} com a data/hora da coleta e o plantão.
+    """
+
+    def __init__(self, path=DB_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def save_run(self, all_units_data, collected_at=None):
+        """
+        Grava uma coleta completa em uma única transação, com inserções em lote.
+
+        Parameters
+        ----------
+        all_units_data : dict
+            Dicionário {unidade: [registros]}.
+        collected_at : datetime, optional
+            Momento da coleta. Usa o momento atual se não informado.
+
+        Returns
+        -------
+        int
+            Identificador da coleta gravada.
+        """
+        # Importado aqui: a consulta pela linha de comando não precisa carregar o openpyxl
+        from config.excel_config_control import calculate_shift
+
+        collected_at = collected_at or datetime.now()
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO runs (collected_at, shift) VALUES (?, ?)",
+                (collected_at.strftime(TIME_FORMAT), calculate_shift(collected_at)))
+            run_id = cursor.lastrowid
+            for unit, records in all_units_data.items():
+                self.connection.executemany(
+                    "INSERT INTO records (run_id, unit, bloco, ala, cela, codigo, preso) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    ((run_id, unit, record["Bloco"], record["Ala"], record["Cela"], record["Código"], record["Preso"])
+                     for record in records))
+        return run_id
+
+    def latest_run_before(self, unit, before):
+        """
+        Identificador da coleta mais recente anterior a `before` que tenha registros da unidade.
+
+        Returns
+        -------
+        int or None
+            Identificador da coleta, ou None se não houver.
+        """
+        row = self.connection.execute(
+            "SELECT id FROM runs WHERE collected_at < ? "
+            "AND EXISTS (SELECT 1 FROM records WHERE records.run_id = runs.id AND records.unit = ?) "
+            "ORDER BY collected_at DESC LIMIT 1",
+            (before.strftime(TIME_FORMAT), unit)).fetchone()
+        return row["id"] if row else None
+
+    def unit_snapshot(self, run_id, unit):
+        """
+        Registros da unidade na coleta `run_id`, indexados pelo código do preso.
+
+        Returns
+        -------
+        dict
+            Dicionário {código: [bloco, ala, cela, preso]}, no formato de `movement_tracker.build_snapshot`.
+        """
+        rows = self.connection.execute(
+            "SELECT codigo, bloco, ala, cela, preso FROM records WHERE run_id = ? AND unit = ?", (run_id, unit))
+        return {row["codigo"]: [row["bloco"], row["ala"], row["cela"], row["preso"]] for row in rows}
+
+    def find(self, unit=None, ala=None, cela=None, code=None, start=None, end=None, limit=None):
+        """
+        Consulta os registros gravados.
+
+        Parameters
+        ----------
+        unit, ala, cela, code : str, optional
+            Filtros por unidade, ala, cela e código do preso.
+        start, end : datetime, optional
+            Intervalo de data/hora da coleta (inclusivo, com precisão de segundos).
+        limit : int, optional
+            Número máximo de registros retornados.
+
+        Returns
+        -------
+        list
+            Lista de dicionários com collected_at, shift, unit, bloco, ala, cela, codigo e preso,
+            do mais recente para o mais antigo.
+        """
+        conditions = []
+        params = []
+        for column, value in (("r.unit", unit), ("r.ala", ala), ("r.cela", cela), ("r.codigo", code)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        # O período seleciona as coletas pelo índice de runs; os registros são buscados pelos índices que
+        # terminam em run_id (unidade/ala/cela, unidade/cela, código)
+        period = []
+        if start is not None:
+            period.append("collected_at >= ?")
+            params.append(start.strftime(TIME_FORMAT))
+        if end is not None:
+            period.append("collected_at <= ?")
+            params.append(end.strftime(TIME_FORMAT))
+        if period:
+            conditions.append(f"r.run_id IN (SELECT id FROM runs WHERE {' AND '.join(period)})")
+
+        query = ("SELECT runs.collected_at, runs.shift, r.unit, r.bloco, r.ala, r.cela, r.codigo, r.preso "
+                 "FROM records AS r JOIN runs ON runs.id = r.run_id")
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY runs.collected_at DESC, r.unit, r.ala, r.cela, r.preso"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        return [dict(row) for row in self.connection.execute(query, params)]
+
+
+def store_run(all_units_data):
+    """Grava a coleta no histórico sem interromper o fluxo em caso de erro."""
+    try:
+        with SnapshotStore() as store:
+            run_id = store.save_run(all_units_data)
+        logger.info(f"Coleta {run_id} gravada no histórico.")
+    except Exception as e:
+        logger.error(f"Erro ao gravar a coleta no histórico: {str(e)}")
+        Logger.capture_error(e)
+
+
+def parse_end(value):
+    """Converte o fim do período; uma data sem hora inclui o dia inteiro."""
+    end = datetime.fromisoformat(value)
+    if len(value) <= len('AAAA-MM-DD'):
+        end = datetime.combine(end.date(), time.max)
+    return end
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Consulta o histórico de coletas.")
+    parser.add_argument('--unidade')
+    parser.add_argument('--ala')
+    parser.add_argument('--cela')
+    parser.add_argument('--codigo')
+    parser.add_argument('--inicio', type=datetime.fromisoformat, help="Ex.: 2024-10-15 ou 2024-10-15T07:00")
+    parser.add_argument('--fim', type=parse_end, help="Ex.: 2024-10-15 (o dia inteiro) ou 2024-10-15T19:00")
+    parser.add_argument('--limite', type=int, default=100)
+    args = parser.parse_args()
+
+    with SnapshotStore() as store:
+        for row in store.find(unit=args.unidade, ala=args.ala, cela=args.cela, code=args.codigo,
+                              start=args.inicio, end=args.fim, limit=args.limite):
+            print(f"{row['collected_at']} {row['shift']:<8} {row['unit']} {row['ala']}/{row['cela']} "
+                  f"{row['codigo']} {row['preso']}")
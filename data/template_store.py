@@ -0,0 +1,226 @@
+"""
+Cache dos modelos das abas CONTROLE e SEI de cada unidade.
+
+O layout dessas abas (células fixas, mesclagens, bordas, cores e larguras) depende apenas de
+`config/units_config.json`. Ele é gerado uma única vez por versão da configuração, guardado em memória e em
+`data/processed/templates/` (ao lado do executável, quando congelado), e copiado para cada novo workbook; a
+execução só escreve as contagens e fórmulas.
+
+A chave do cache é o hash de `units_config.json` junto com `TEMPLATE_VERSION` e a versão do openpyxl: alterar a
+configuração ou atualizar o openpyxl gera novos modelos automaticamente, e alterações no código dos geradores devem
+incrementar `TEMPLATE_VERSION`. Um modelo em disco que não possa ser lido, por qualquer motivo, é gerado de novo.
+"""
+import hashlib
+import os
+import pickle
+from copy import copy
+
+import openpyxl
+from openpyxl import Workbook
+from openpyxl.cell.cell import MergedCell
+
+from config import excel_config_control
+from config.excel_config_control import fill_control_header, generate_unit_control_sheet
+from config.excel_config_sei import generate_unit_sei_sheet
+from config.excel_styles import build_named_style, registry_for
+from utils.logger import Logger
+from utils.resource_manager import get_data_dir
+
+logger = Logger.get_logger()
+
+TEMPLATE_DIR = get_data_dir('templates')
+TEMPLATE_VERSION = 3  # Incrementar ao alterar o layout gerado por excel_config_control ou excel_config_sei
+
+# Tipo de aba -> gerador do layout; a aba se chama "<unidade> <tipo>"
+TEMPLATE_BUILDERS = {
+    "CONTROLE": generate_unit_control_sheet,
+    "SEI": generate_unit_sei_sheet,
+}
+
+# Cabeçalho com data e plantão, reescrito a cada execução
+TEMPLATE_FINALIZERS = {
+    "CONTROLE": fill_control_header,
+}
+
+TEMPLATE_KEYS = {"styles", "cells", "merged", "widths", "freeze_panes"}  # Chaves de `snapshot_sheet`
+
+_memory_cache = {}  # (unidade, tipo, hash da configuração) -> modelo
+
+
+def config_hash():
+    """Hash da configuração das unidades, da versão dos modelos e da versão do openpyxl."""
+    digest = hashlib.sha256(f"{TEMPLATE_VERSION}\n{openpyxl.__version__}\n".encode('utf-8'))
+    with open(os.path.join(excel_config_control.BASE_DIR, 'units_config.json'), 'rb') as file:
+        digest.update(file.read())
+    return digest.hexdigest()[:16]
+
+
+def template_path(unit_name, kind, version_hash):
+    safe_unit = ''.join(char if char.isalnum() else '_' for char in unit_name)
+    return os.path.join(TEMPLATE_DIR, f"{safe_unit}-{kind}-{version_hash}.pickle")
+
+
+def style_components(style):
+    """Componentes de formatação de uma célula ou estilo nomeado, na ordem em que o modelo os guarda."""
+    return (copy(style.font), copy(style.fill), copy(style.border), copy(style.alignment), style.number_format,
+            copy(style.protection))
+
+
+def snapshot_style(name, components):
+    """
+    Estilo de uma célula no modelo: (nome do estilo nomeado, componentes).
+
+    Os componentes ficam como None quando o estilo nomeado de `config/excel_styles.py` já os aplica por si só,
+    como nas células formatadas por `SheetStyles`; a cópia atribui então apenas o estilo nomeado.
+    """
+    try:
+        if name != 'Normal' and style_components(build_named_style(name)) == components:
+            return name, None
+    except KeyError:
+        pass  # Estilo nomeado que não é de config/excel_styles.py
+    return name, components
+
+
+def snapshot_sheet(sheet):
+    """
+    Converte uma aba em um modelo independente do workbook.
+
+    Returns
+    -------
+    dict
+        Dicionário com os estilos distintos (`styles`, como em `snapshot_style`), as células (`cells`, como
+        (linha, coluna, valor, índice do estilo)), as mesclagens (`merged`), as larguras de coluna (`widths`)
+        e o painel congelado (`freeze_panes`).
+    """
+    styles = []
+    style_slots = {}
+    cells = []
+    for cell in (cell for row in sheet.iter_rows() for cell in row):
+        slot = None
+        if cell.has_style:
+            key = (cell.style, style_components(cell))
+            slot = style_slots.get(key)
+            if slot is None:
+                slot = style_slots[key] = len(styles)
+                styles.append(snapshot_style(*key))
+        value = None if isinstance(cell, MergedCell) else cell.value
+        if value is not None or slot is not None:
+            cells.append((cell.row, cell.column, value, slot))
+
+    return {
+        "styles": styles,
+        "cells": cells,
+        "merged": [str(merged_range) for merged_range in sheet.merged_cells.ranges],
+        "widths": {letter: dimension.width for letter, dimension in sheet.column_dimensions.items()
+                   if dimension.customWidth},
+        "freeze_panes": sheet.freeze_panes,
+    }
+
+
+def build_template(unit_name, kind):
+    """Gera a aba `kind` da unidade em um workbook temporário e retorna o seu modelo."""
+    workbook = Workbook()
+    return snapshot_sheet(TEMPLATE_BUILDERS[kind](workbook, unit_name))
+
+
+def load_template(unit_name, kind):
+    """
+    Obtém o modelo da aba, da memória, do disco ou gerando-o (nessa ordem).
+
+    Ao gerar um modelo novo, os modelos da mesma aba feitos com configurações anteriores são removidos.
+    """
+    version_hash = config_hash()
+    key = (unit_name, kind, version_hash)
+    template = _memory_cache.get(key)
+    if template is not None:
+        return template
+
+    path = template_path(unit_name, kind, version_hash)
+    try:
+        with open(path, 'rb') as file:
+            template = pickle.load(file)
+        if not isinstance(template, dict) or set(template) != TEMPLATE_KEYS:
+            raise ValueError("conteúdo inesperado")
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        # Qualquer falha ao ler o modelo (arquivo corrompido ou gravado por outra versão) apenas o gera de novo
+        logger.warning(f"Modelo {path} ilegível; gerando novamente: {str(e)}")
+        template = None
+
+    if template is None:
+        template = build_template(unit_name, kind)
+        save_template(path, template)
+        logger.info(f"Modelo da aba {unit_name} {kind} gerado para a configuração {version_hash}.")
+
+    _memory_cache[key] = template
+    return template
+
+
+def save_template(path, template):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        stale_prefix = os.path.basename(path).rsplit('-', 1)[0] + '-'
+        for name in os.listdir(os.path.dirname(path)):
+            if name.startswith(stale_prefix) and name.endswith('.pickle') and name != os.path.basename(path):
+                os.remove(os.path.join(os.path.dirname(path), name))
+
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'wb') as file:
+            pickle.dump(template, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+    except OSError as e:
+        logger.warning(f"Falha ao gravar o modelo {path}: {str(e)}")
+
+
+def create_unit_sheet(workbook, unit_name, kind, date=None):
+    """
+    Cria a aba `kind` ("CONTROLE" ou "SEI") da unidade a partir do modelo em cache.
+
+    Produz a mesma aba que `generate_unit_control_sheet` / `generate_unit_sei_sheet`. Os estilos nomeados de
+    `config/excel_styles.py` são registrados uma vez no workbook, e os componentes de cada célula são atribuídos
+    pela API pública do openpyxl, que também reaproveita os estilos já registrados.
+
+    Parameters
+    ----------
+    workbook : Workbook
+        Workbook onde a aba será criada.
+    unit_name : str
+        Nome da unidade (chave de `units_config.json`).
+    kind : str
+        Tipo da aba: uma das chaves de `TEMPLATE_BUILDERS`.
+    date : datetime, optional
+        Data do relatório, escrita no cabeçalho com o plantão correspondente. Usa a data atual se não informada.
+
+    Returns
+    -------
+    Worksheet
+        A aba criada.
+    """
+    template = load_template(unit_name, kind)
+    sheet = workbook.create_sheet(title=f"{unit_name} {kind}")
+
+    for merged_range in template["merged"]:
+        sheet.merge_cells(merged_range)
+
+    registry = registry_for(workbook)
+    for row, column, value, slot in template["cells"]:
+        cell = sheet.cell(row=row, column=column)
+        if value is not None:
+            cell.value = value
+        if slot is None:
+            continue
+        name, components = template["styles"][slot]
+        if name != 'Normal':
+            cell.style = registry.register(name)
+        if components is not None:
+            cell.font, cell.fill, cell.border, cell.alignment, cell.number_format, cell.protection = components
+
+    for letter, width in template["widths"].items():
+        sheet.column_dimensions[letter].width = width
+    sheet.freeze_panes = template["freeze_panes"]
+
+    finalizer = TEMPLATE_FINALIZERS.get(kind)
+    if finalizer:
+        finalizer(sheet, date)
+    return sheet
@@ -1,28 +1,47 @@
 import tkinter as tk
 from threading import Thread
-from playwright.sync_api import sync_playwright
+from tkinter import messagebox
+from config.app_settings import LOGIN_PATH, canaime_url
+from services.browser_server import launch_browser
 import itertools
 import time
 
 
-# URL de login do sistema Canaimé
-URL_LOGIN_CANAIME = 'https://canaime.com.br/sgp2rr/login/login_principal.php'
-
-
 class LoginApp:
-    def __init__(self, root):
+    def __init__(self, root, prewarmer=None, update_checker=None):
         self.root = root
+        self.prewarmer = prewarmer  # Navegador já aberto na página de login (SessionPrewarmer)
+        self.update_checker = update_checker  # Verificação de atualizações em segundo plano (UpdateChecker)
         self.configurar_janela()
         self.criar_widgets()
 
         # Variáveis para armazenar credenciais
         self.usuario = None
         self.senha = None
+        self.estado_sessao = None  # Cookies da sessão autenticada, reaproveitados na coleta
 
         # Animação e status
         self.animacao = None
         self.rodando = False
 
+        # No modo "background" a atualização é baixada sem perguntar e aplicada na próxima abertura
+        if self.update_checker and self.update_checker.mode == 'prompt':
+            self.root.after(500, self.verificar_atualizacao)
+
+    def verificar_atualizacao(self):
+        """Pergunta sobre a atualização assim que a verificação em segundo plano confirmar uma versão nova."""
+        if not self.update_checker.done():
+            self.root.after(500, self.verificar_atualizacao)
+            return
+        if not self.update_checker.latest_version or self.usuario:
+            return
+
+        if messagebox.askyesno("Atualização disponível",
+                               f"A versão {self.update_checker.latest_version} está disponível. Deseja atualizar agora?",
+                               parent=self.root):
+            self.update_checker.accepted = True
+            self.root.destroy()
+
     def configurar_janela(self):
         """Configura a janela principal da aplicação."""
         self.root.title("Login Canaimé")
@@ -94,19 +113,41 @@ class LoginApp:
             self.mostrar_erro("Usuário e senha são obrigatórios.")
             return
 
+        if self.prewarmer:
+            try:
+                if self.prewarmer.login(usuario, senha):
+                    self.login_sucesso(usuario, senha, self.prewarmer.session_state)
+                else:
+                    self.mostrar_erro("Usuário ou senha inválidos.")
+                return
+            except Exception:
+                # Sem o navegador pré-aquecido, segue com o login em um navegador próprio; encerrá-lo
+                # libera quem aguarda a pré-coleta (StatusApp), que não acontecerá
+                self.prewarmer.close()
+                self.prewarmer = None
+
         try:
+            # Carregado só quando não há navegador pré-aquecido, para a janela abrir sem esperar o Playwright
+            from playwright.sync_api import sync_playwright
+
+            from services.network_monitor import NetworkMonitor
+
+            network = NetworkMonitor()
             with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                page = browser.new_page()
+                browser = launch_browser(p, headless=True)
+                context = browser.new_context()
+                network.attach(context)
+                page = context.new_page()
                 self.realizar_login(page, usuario, senha)
                 browser.close()
+            network.log_summary(label='tela de login')
 
         except Exception:
             self.mostrar_erro("Erro de conexão, tente mais tarde...")
 
     def realizar_login(self, page, usuario, senha):
         """Realiza o processo de login utilizando Playwright."""
-        page.goto(URL_LOGIN_CANAIME)
+        page.goto(canaime_url(LOGIN_PATH))
         page.fill("input[name='usuario']", usuario)
         page.fill("input[name='senha']", senha)
         page.press("input[name='senha']", "Enter")
@@ -115,12 +156,13 @@ class LoginApp:
         if page.locator('img').count() < 4:
             self.mostrar_erro("Usuário ou senha inválidos.")
         else:
-            self.login_sucesso(usuario, senha)
+            self.login_sucesso(usuario, senha, page.context.storage_state())
 
-    def login_sucesso(self, usuario, senha):
+    def login_sucesso(self, usuario, senha, estado_sessao=None):
         """Atualiza a interface para mostrar sucesso no login."""
         self.usuario = usuario
         self.senha = senha
+        self.estado_sessao = estado_sessao
         self.rodando = False
         self.atualizar_interface(lambda: (
             self.label_status.config(text="Login efetuado com sucesso!"),
@@ -143,15 +185,20 @@ class LoginApp:
         """Retorna as credenciais de login (usuário e senha)."""
         return self.usuario, self.senha
 
+    def get_session_state(self):
+        """Retorna o estado da sessão autenticada (cookies), no formato `storage_state` do Playwright."""
+        return self.estado_sessao
+
 
-# Função para executar a aplicação de login e retornar as credenciais
-def executar_login():
+# Função para executar a aplicação de login e retornar as credenciais e o estado da sessão
+def executar_login(prewarmer=None, update_checker=None):
     root = tk.Tk()
-    app = LoginApp(root)
+    app = LoginApp(root, prewarmer, update_checker)
     root.mainloop()
-    return app.get_credentials()
+    usuario, senha = app.get_credentials()
+    return usuario, senha, app.get_session_state()
 
 
 if __name__ == "__main__":
-    usuario, senha = executar_login()
+    usuario, senha, _ = executar_login()
     print(f"Usuário: {usuario}, Senha: {senha}")
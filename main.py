@@ -4,31 +4,65 @@ import tkinter as tk
 from multiprocessing import Process, Queue, Event
 from queue import Empty
 
-from gui.login.login_canaime import executar_login
-from gui.selectors.unit_selector import select_units
-from services.playwright_service import execute_playwright_task
-from services.report_service import create_excel_report
-from utils import updater
+# Apenas módulos leves no carregamento: Playwright, openpyxl e requests são importados quando usados, no
+# processo que precisa deles (o processo de trabalho reimporta este módulo ao ser criado no Windows)
+from config.app_settings import load_app_settings
 from utils.logger import Logger
 
 current_version = 'v0.1.0'  # Versão atual do aplicativo
+PREWARMER_CLOSE_TIMEOUT = 10  # Segundos de espera pelo fechamento do navegador pré-aquecido antes de atualizar
 
 logger = Logger.get_logger()  # Obter o logger configurado
 
 
-def process_task(headless, queue, stop_event, login, password, selected_units):
+def argument_value(flag):
+    """Retorna o valor que segue `flag` na linha de comando, ou None se a opção não foi informada."""
+    if flag in sys.argv[:-1]:
+        return sys.argv[sys.argv.index(flag) + 1]
+    return None
+
+
+def process_task(headless, queue, stop_event, login, password, selected_units, session_state=None,
+                 prefetched_data=None, capture_dir=None):
     """
     Função para ser executada no processo separado, executa as tarefas necessárias usando Playwright.
     """
+    from data.movement_tracker import track_movements
+    from data.snapshot_store import store_run
+    from services.playwright_service import execute_playwright_task
+    from services.report_service import create_excel_report
+    from utils.metrics import RunMetrics, save_metrics
+    from utils.profiler import start_profiler
+
+    # Com --profile, o perfil é feito aqui, no processo de trabalho, e não apenas na interface
+    metrics = RunMetrics('process_task', profiler=start_profiler('process_task'))
     try:
+        settings = load_app_settings()
+
+        # Unidades já coletadas durante a seleção não são coletadas de novo
+        all_units_data = dict(prefetched_data or {})
+        for unit, unit_data in all_units_data.items():
+            metrics.set_records(unit, len(unit_data))
+        remaining_units = [unit for unit in selected_units if unit not in all_units_data]
+
         # Execute Playwright tasks e obtenha os dados
-        all_units_data = execute_playwright_task(headless, login, password, selected_units)
+        if remaining_units:
+            with metrics.phase('collect'):
+                all_units_data.update(execute_playwright_task(headless, login, password, remaining_units,
+                                                              engine=settings["engine"], workers=settings["workers"],
+                                                              session_state=session_state,
+                                                              capture_dir=capture_dir, metrics=metrics))
         queue.put("Processo Completo.")
 
         if all_units_data:
+            with metrics.phase('store_run'):
+                store_run(all_units_data)
+
             # Verificar se há dados para cada unidade
             if any(len(unit_data) > 0 for unit_data in all_units_data.values()):
-                create_excel_report(all_units_data)
+                with metrics.phase('track_movements'):
+                    movements = track_movements(all_units_data)
+                create_excel_report(all_units_data, movements=movements, metrics=metrics)
                 queue.put("Arquivo salvo com sucesso.")
             else:
                 queue.put("Nenhum dado válido encontrado para gerar o relatório.")
@@ -37,16 +71,21 @@ def process_task(headless, queue, stop_event, login, password, selected_units):
     except Exception as e:
         queue.put(f"Erro: {str(e)}")
     finally:
+        save_metrics(metrics)
         stop_event.set()  # Sinaliza que o processo terminou
 
 
 class StatusApp:
-    def __init__(self, root, headless, login, password, selected_units):
+    def __init__(self, root, headless, login, password, selected_units, session_state=None, prewarmer=None,
+                 capture_dir=None):
         self.root = root
         self.headless = headless
         self.login = login
         self.password = password
         self.selected_units = selected_units
+        self.session_state = session_state
+        self.prewarmer = prewarmer
+        self.capture_dir = capture_dir
         self.frames = itertools.cycle(["◐", "◓", "◑", "◒"])
         self.queue = Queue()  # Fila para comunicação entre processos
         self.stop_event = Event()  # Evento para sinalizar a parada do processo
@@ -81,8 +120,19 @@ class StatusApp:
         self.root.after(200, self.animar_bolinha)
 
     def executar_tarefas(self):
+        prefetched_data = None
+        if self.prewarmer:
+            # Aguarda a pré-coleta em andamento sem travar a janela
+            if not self.prewarmer.wait_prefetch(0):
+                self.prewarmer.select(self.selected_units)
+                self.root.after(100, self.executar_tarefas)
+                return
+            prefetched_data = self.prewarmer.take(self.selected_units)
+            logger.info(f"Unidades pré-coletadas: {list(prefetched_data)}")
+
         p = Process(target=process_task,
-                    args=(self.headless, self.queue, self.stop_event, self.login, self.password, self.selected_units))
+                    args=(self.headless, self.queue, self.stop_event, self.login, self.password, self.selected_units,
+                          self.session_state, prefetched_data, self.capture_dir))
         p.start()
         self.root.after(100, self.verificar_fila)
 
@@ -110,27 +160,63 @@ class StatusApp:
         self.root.quit()
 
 
-def main(headless: bool = True) -> None:
+def main(headless: bool = True, update_checker=None) -> None:
+    from gui.login.login_canaime import executar_login
+    from gui.selectors.unit_selector import active_units, select_units
+    from services.prefetch_service import SessionPrewarmer
+
     logger.info("Aplicação iniciada.")
-    login, password = executar_login()
-    if not login or not password:
-        logger.warning("Login não efetuado. Encerrando.")
-        return
+    settings = load_app_settings()
 
-    selected_units = select_units()
-    logger.debug(f"Unidades selecionadas: {selected_units}")
+    # Pasta desta execução para as cópias do HTML coletado (reprocessadas com --replay)
+    capture_dir = None
+    if settings["capture"]["enabled"]:
+        from data.capture_store import new_capture_dir
 
-    if not selected_units:
-        logger.warning("Nenhuma unidade selecionada. Encerrando.")
-        return
+        capture_dir = new_capture_dir(settings["capture"]["dir"])
+        logger.info(f"Capturando as páginas coletadas em {capture_dir}.")
+
+    # Abre o navegador e a página de login enquanto o usuário digita as credenciais
+    prewarmer = None
+    if settings["prefetch"] and settings["engine"] == 'playwright':
+        prewarmer = SessionPrewarmer(headless=headless, units=active_units, capture_dir=capture_dir).start()
 
     try:
+        login, password, session_state = executar_login(prewarmer, update_checker)
+        if prewarmer and not prewarmer.available:
+            # O login foi feito em um navegador próprio: não há pré-coleta a aguardar
+            prewarmer = None
+        if update_checker and update_checker.accepted:
+            from utils import updater
+
+            logger.info("Usuário aceitou a atualização. Baixando...")
+            if prewarmer:
+                # A instalação substitui o processo (o `finally` abaixo não chega a rodar): fecha o navegador antes
+                prewarmer.close(timeout=PREWARMER_CLOSE_TIMEOUT)
+            updater.install_update(update_checker.latest_version)
+            return
+
+        if not login or not password:
+            logger.warning("Login não efetuado. Encerrando.")
+            return
+
+        selected_units = select_units()
+        logger.debug(f"Unidades selecionadas: {selected_units}")
+
+        if not selected_units:
+            logger.warning("Nenhuma unidade selecionada. Encerrando.")
+            return
+
         root = tk.Tk()
-        StatusApp(root, headless, login, password, selected_units)
+        StatusApp(root, headless, login, password, selected_units, session_state, prewarmer, capture_dir)
         root.mainloop()
     except Exception as e:
         logger.error(f"Erro durante o main loop: {str(e)}", exc_info=True)
     finally:
+        if prewarmer:
+            prewarmer.close()
+        if update_checker and update_checker.staged_version:
+            logger.info(f"A versão {update_checker.staged_version} será aplicada na próxima abertura.")
         logger.info("Aplicação finalizada.")
 
 
@@ -139,12 +225,50 @@ if __name__ == '__main__':
 
     multiprocessing.freeze_support()
 
+    if '--profile' in sys.argv:
+        # Perfil de CPU e memória por etapa (herdado pelo processo de trabalho pela variável de ambiente)
+        from utils.profiler import enable_profiling
+
+        enable_profiling()
+
+    if '--browser-server' in sys.argv:
+        # Processo vigia do navegador aquecido (usado pelo executável congelado)
+        from services.browser_server import run_server
+
+        run_server()
+        sys.exit(0)
+
+    if '--daemon' in sys.argv:
+        # Coleta automática a cada troca de plantão, sem interface gráfica
+        from services.daemon_service import run_daemon
+
+        run_daemon()
+        sys.exit(0)
+
+    replay_dir = argument_value('--replay')
+    if replay_dir:
+        # Relatório gerado a partir de páginas capturadas, sem rede e sem navegador
+        from services.replay_service import replay_capture
+
+        replay_capture(replay_dir, output_dir=argument_value('--output'))
+        sys.exit(0)
+
     try:
+        # Versão baixada em segundo plano numa execução anterior: apenas arquivos locais são consultados
+        from utils.updater import apply_staged_update
+
+        apply_staged_update(current_version)
+    except Exception as e:
+        logger.error(f"Erro ao aplicar a atualização preparada: {str(e)}")
+
+    # A verificação de atualizações corre em segundo plano enquanto a janela de login já está aberta
+    update_checker = None
+    try:
+        from utils.updater import UpdateChecker
+
         logger.info("Verificando atualizações.")
-        if updater.update_application(current_version):
-            logger.info("Aplicação atualizada. Reiniciando.")
-            sys.exit(0)
-    except:
-        pass
+        update_checker = UpdateChecker(current_version).start()
+    except Exception as e:
+        logger.error(f"Erro ao iniciar a verificação de atualizações: {str(e)}")
 
-    main(headless=True)
+    main(headless=True, update_checker=update_checker)
@@ -0,0 +1,271 @@
+"""
+Navegador Chromium mantido aberto entre execuções, para evitar a partida a frio a cada login e coleta.
+
+Um processo vigia (`run_server`) inicia o Chromium com a porta de depuração (CDP) aberta apenas em
+127.0.0.1, relança o navegador se ele morrer e o encerra após um tempo sem uso. A aplicação conecta-se
+a ele com `launch_browser`, que recorre ao lançamento normal se o servidor não estiver disponível.
+
+A CDP não tem autenticação: quem alcança a porta controla o navegador e a sessão logada. Por isso a porta
+não é fixa nem escolhida pela aplicação: o Chromium escolhe uma porta livre a cada partida (porta 0) e a
+informa em `DevToolsActivePort`, dentro de um perfil temporário acessível só ao usuário. A porta e o caminho
+do endpoint do navegador (`/devtools/browser/<id>`) ficam apenas no arquivo de estado, gravado com
+permissão só para o usuário.
+"""
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.error import URLError
+from urllib.request import urlopen
+
+from config.app_settings import load_app_settings
+from utils.logger import Logger
+from utils.resource_manager import get_app_dir, get_data_dir
+
+logger = Logger.get_logger()
+
+STATE_FILE = get_data_dir('browser_server.json')
+DEVTOOLS_PORT_FILE = 'DevToolsActivePort'  # Gravado pelo Chromium no perfil: porta e caminho do endpoint
+
+HEALTH_TIMEOUT = 0.5  # Segundos de espera na verificação de saúde
+STARTUP_TIMEOUT = 15  # Segundos de espera para o servidor ficar pronto
+WATCH_INTERVAL = 5  # Intervalo, em segundos, entre as verificações do processo vigia
+
+
+def read_state():
+    """Lê o estado do servidor (porta, endpoint, PIDs e último uso), ou None se não houver servidor."""
+    try:
+        with open(STATE_FILE, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def write_state(state):
+    """Grava o estado com leitura e escrita apenas para o usuário: o endpoint dá acesso ao navegador."""
+    os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
+    temp_file = f"{STATE_FILE}.tmp"
+    with open(os.open(temp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w', encoding='utf-8') as file:
+        json.dump(state, file)
+    os.chmod(temp_file, 0o600)  # Caso o arquivo temporário já existisse com outra permissão
+    os.replace(temp_file, STATE_FILE)
+
+
+def touch_state():
+    """Registra o uso do servidor, adiando o desligamento por inatividade."""
+    state = read_state()
+    if state:
+        state["last_used"] = time.time()
+        write_state(state)
+
+
+def cdp_endpoint(port):
+    return f"http://127.0.0.1:{port}"
+
+
+def browser_endpoint(state):
+    """Endpoint WebSocket do navegador, usado na conexão em vez da descoberta pela porta HTTP."""
+    return f"ws://127.0.0.1:{state['port']}{state['ws_path']}"
+
+
+def is_healthy(port):
+    """Verifica se o navegador responde na porta CDP."""
+    try:
+        with urlopen(f"{cdp_endpoint(port)}/json/version", timeout=HEALTH_TIMEOUT) as response:
+            return response.status == 200
+    except (URLError, OSError, ValueError):
+        return False
+
+
+def is_ready(state):
+    """Verifica se o estado aponta para um navegador no ar, com o endpoint conhecido e sem pedido de encerramento."""
+    return bool(state and state.get("port") and state.get("ws_path") and not state.get("stop")
+                and is_healthy(state["port"]))
+
+
+def has_open_pages(port):
+    """Indica se algum cliente está com páginas abertas (coleta em andamento)."""
+    try:
+        with urlopen(f"{cdp_endpoint(port)}/json/list", timeout=HEALTH_TIMEOUT) as response:
+            targets = json.load(response)
+    except (URLError, OSError, ValueError):
+        return False
+    return any(target.get("type") == "page" and target.get("url") != "about:blank" for target in targets)
+
+
+def server_command():
+    """Linha de comando que inicia o processo vigia, no executável congelado ou em desenvolvimento."""
+    if getattr(sys, 'frozen', False):
+        return [sys.executable, '--browser-server']
+    return [sys.executable, '-m', 'services.browser_server']
+
+
+def start_server():
+    """
+    Inicia o processo vigia em segundo plano, desvinculado do processo atual, e aguarda o navegador.
+
+    Returns
+    -------
+    dict or None
+        Estado do servidor pronto, ou None se ele não respondeu a tempo.
+    """
+    kwargs = {"cwd": get_app_dir(), "stdin": subprocess.DEVNULL, "stdout": subprocess.DEVNULL,
+              "stderr": subprocess.DEVNULL}
+    if os.name == 'nt':
+        kwargs["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs["start_new_session"] = True
+    subprocess.Popen(server_command(), **kwargs)
+
+    deadline = time.time() + STARTUP_TIMEOUT
+    while time.time() < deadline:
+        state = read_state()
+        if is_ready(state):
+            return state
+        time.sleep(0.2)
+    return None
+
+
+def launch_browser(p, headless=True):
+    """
+    Obtém um navegador Chromium: conecta-se ao servidor aquecido, se habilitado, ou lança um novo.
+
+    Os contextos criados sobre o navegador recebido são configurados por quem chamou (JavaScript,
+    cabeçalhos e bloqueio de imagens), da mesma forma nos dois casos. Fechar o navegador conectado
+    apenas desconecta e descarta os contextos criados, mantendo o servidor no ar.
+
+    Parameters
+    ----------
+    p : Playwright
+        Instância do Playwright (`sync_playwright`).
+    headless : bool
+        Executa o navegador sem interface gráfica. O servidor é sempre headless.
+
+    Returns
+    -------
+    Browser
+        Navegador pronto para uso.
+    """
+    settings = load_app_settings()["browser_server"]
+    if settings["enabled"] and headless:
+        try:
+            state = read_state()
+            if not is_ready(state):
+                logger.info("Iniciando o servidor de navegador.")
+                state = start_server()
+            if state:
+                touch_state()
+                return p.chromium.connect_over_cdp(browser_endpoint(state))
+            logger.warning("Servidor de navegador indisponível. Lançando um navegador local.")
+        except Exception as e:
+            logger.error(f"Erro ao conectar ao servidor de navegador: {str(e)}")
+    return p.chromium.launch(headless=headless)
+
+
+def launch_chromium(executable_path, user_data_dir):
+    """
+    Inicia o Chromium com a CDP em uma porta livre escolhida por ele e aguarda o endpoint.
+
+    Returns
+    -------
+    tuple
+        (processo, porta, caminho do endpoint do navegador); porta e caminho são None se o navegador não
+        informou o endpoint a tempo.
+    """
+    port_file = os.path.join(user_data_dir, DEVTOOLS_PORT_FILE)
+    if os.path.exists(port_file):
+        os.remove(port_file)  # Deixado pelo navegador anterior, relançado
+    browser = subprocess.Popen(
+        [executable_path, '--remote-debugging-port=0', '--remote-debugging-address=127.0.0.1',
+         f'--user-data-dir={user_data_dir}', '--headless', '--no-first-run', '--no-default-browser-check',
+         '--disable-extensions', '--blink-settings=imagesEnabled=false', 'about:blank'],
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+    deadline = time.time() + STARTUP_TIMEOUT
+    while time.time() < deadline and browser.poll() is None:
+        try:
+            with open(port_file, 'r', encoding='utf-8') as file:
+                lines = file.read().split()
+            if len(lines) >= 2:
+                return browser, int(lines[0]), lines[1]
+        except (OSError, ValueError):
+            pass
+        time.sleep(0.1)
+    return browser, None, None
+
+
+def stop_server():
+    """Pede ao processo vigia que encerre o navegador (atendido na próxima verificação)."""
+    state = read_state()
+    if state:
+        state["stop"] = True
+        write_state(state)
+
+
+def run_server(idle_timeout=None):
+    """
+    Processo vigia: mantém o Chromium no ar, relança-o se morrer e o encerra após `idle_timeout`
+    segundos sem uso.
+    """
+    from playwright.sync_api import sync_playwright
+
+    if idle_timeout is None:
+        idle_timeout = load_app_settings()["browser_server"]["idle_timeout"]
+
+    if is_ready(read_state()):
+        return  # Já existe um servidor ativo
+
+    with sync_playwright() as p:
+        executable_path = p.chromium.executable_path
+
+    user_data_dir = tempfile.mkdtemp(prefix='canaime-browser-')  # Criado com acesso só para o usuário
+    browser, port, ws_path = launch_chromium(executable_path, user_data_dir)
+    write_state({"pid": os.getpid(), "browser_pid": browser.pid, "port": port, "ws_path": ws_path,
+                 "last_used": time.time()})
+    logger.info("Servidor de navegador iniciado." if port else "Servidor de navegador não informou a porta.")
+
+    try:
+        while True:
+            time.sleep(WATCH_INTERVAL)
+            state = read_state() or {}
+            if state.get("pid") != os.getpid():
+                break  # Outro processo vigia assumiu
+            if state.get("stop"):
+                logger.info("Servidor de navegador encerrado a pedido.")
+                break
+
+            if browser.poll() is not None or not port or not is_healthy(port):
+                logger.warning("Navegador do servidor não responde. Relançando.")
+                if browser.poll() is None:
+                    browser.kill()
+                    browser.wait()
+                browser, port, ws_path = launch_chromium(executable_path, user_data_dir)
+                state.update({"browser_pid": browser.pid, "port": port, "ws_path": ws_path})
+                write_state(state)
+                continue
+
+            if has_open_pages(port):
+                state["last_used"] = time.time()
+                write_state(state)
+            elif time.time() - state.get("last_used", 0) > idle_timeout:
+                logger.info("Servidor de navegador ocioso. Encerrando.")
+                break
+    finally:
+        if browser.poll() is None:
+            browser.terminate()
+            try:
+                browser.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                browser.kill()
+        state = read_state()
+        if state and state.get("pid") == os.getpid():
+            os.remove(STATE_FILE)
+        shutil.rmtree(user_data_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    run_server()
@@ -1,35 +1,74 @@
-from playwright.sync_api import Page
+from typing import TYPE_CHECKING
+
+from config.app_settings import LOGIN_PATH, canaime_url
+from services.browser_server import launch_browser
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page as AsyncPage
+    from playwright.sync_api import Page
 
 
 class CanaimeLogin:
-    def __init__(self, p, headless=True, login='', password=''):
+    def __init__(self, p, headless=True, login='', password='', storage_state=None, network=None):
         self.p = p
         self.headless = headless
         self.login = login
         self.password = password
+        self.storage_state = storage_state  # Sessão já autenticada (por exemplo, pela tela de login)
+        self.network = network  # NetworkMonitor que registra as requisições do contexto
+        self.restored_session = False
         self.browser = None
         self.page = None
 
-    def perform_login(self) -> (Page, object):
+    def perform_login(self) -> ('Page', object):
+        """
+        Abre o navegador e autentica no Canaimé.
+
+        Se houver um `storage_state`, os cookies da sessão são carregados no contexto e o login não é
+        refeito; caso o sistema recuse a sessão, use `login_with_credentials` para entrar novamente.
+        """
         try:
-            self.browser = self.p.chromium.launch(headless=self.headless)
-            context = self.browser.new_context(java_script_enabled=False)
+            self.browser = launch_browser(self.p, headless=self.headless)
+            context = self.browser.new_context(java_script_enabled=False, storage_state=self.storage_state)
             context.set_extra_http_headers(
                 {"Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8"})
-            context.route("**/*",
-                          lambda route: route.abort() if route.request.resource_type == "image" else route.continue_())
+            if self.network:
+                self.network.attach(context)
+            context.route("**/*", self.handle_route)
 
             self.page = context.new_page()
-            self.page.goto('https://canaime.com.br/sgp2rr/login/login_principal.php', timeout=0)
-            self.page.locator("input[name=\"usuario\"]").click()
-            self.page.locator("input[name=\"usuario\"]").fill(self.login)
-            self.page.locator("input[name=\"senha\"]").fill(self.password)
-            self.page.locator("input[name=\"senha\"]").press("Enter")
+            if self.storage_state:
+                self.restored_session = True
+            else:
+                self.login_with_credentials()
             return self.page, self.browser  # Retorna a página e o navegador
 
         except Exception as e:
             raise e
 
+    def handle_route(self, route):
+        """Bloqueia as imagens, que não são usadas na coleta, e deixa passar as demais requisições."""
+        if route.request.resource_type == "image":
+            if self.network:
+                self.network.abort(route)
+            else:
+                route.abort()
+        else:
+            route.continue_()
+
+    def login_with_credentials(self):
+        """
+        Realiza o login preenchendo o formulário com usuário e senha na página atual.
+        """
+        self.restored_session = False
+        self.page.goto(canaime_url(LOGIN_PATH), timeout=0)
+        self.page.locator("input[name=\"usuario\"]").click()
+        self.page.locator("input[name=\"usuario\"]").fill(self.login)
+        self.page.locator("input[name=\"senha\"]").fill(self.password)
+        # Aguarda a resposta do login para que os cookies da sessão já estejam no contexto
+        with self.page.expect_navigation(wait_until='commit', timeout=0):
+            self.page.locator("input[name=\"senha\"]").press("Enter")
+
     def close_browser(self):
         """
         Fecha o navegador explicitamente quando não for mais necessário.
@@ -37,3 +76,72 @@ class CanaimeLogin:
         if self.browser:
             self.browser.close()
             self.browser = None
+
+
+class AsyncCanaimeLogin:
+    """
+    Versão assíncrona de `CanaimeLogin`, para uso com `playwright.async_api`.
+    """
+
+    def __init__(self, p, headless=True, login='', password='', storage_state=None, network=None):
+        self.p = p
+        self.headless = headless
+        self.login = login
+        self.password = password
+        self.storage_state = storage_state  # Sessão já autenticada (por exemplo, pela tela de login)
+        self.network = network  # AsyncNetworkMonitor que registra as requisições do contexto
+        self.restored_session = False
+        self.browser = None
+        self.page = None
+
+    async def perform_login(self) -> ('AsyncPage', object):
+        """
+        Abre o navegador e autentica no Canaimé.
+
+        Se houver um `storage_state`, os cookies da sessão são carregados no contexto e o login não é
+        refeito; caso o sistema recuse a sessão, use `login_with_credentials` para entrar novamente.
+        """
+        self.browser = await self.p.chromium.launch(headless=self.headless)
+        context = await self.browser.new_context(java_script_enabled=False, storage_state=self.storage_state)
+        await context.set_extra_http_headers(
+            {"Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8"})
+        if self.network:
+            self.network.attach(context)
+        await context.route("**/*", self.handle_route)
+
+        self.page = await context.new_page()
+        if self.storage_state:
+            self.restored_session = True
+        else:
+            await self.login_with_credentials()
+        return self.page, self.browser  # Retorna a página e o navegador
+
+    async def login_with_credentials(self):
+        """
+        Realiza o login preenchendo o formulário com usuário e senha na página atual.
+        """
+        self.restored_session = False
+        await self.page.goto(canaime_url(LOGIN_PATH), timeout=0)
+        await self.page.locator("input[name=\"usuario\"]").fill(self.login)
+        await self.page.locator("input[name=\"senha\"]").fill(self.password)
+        # Aguarda a resposta do login para que os cookies da sessão já estejam no contexto
+        async with self.page.expect_navigation(wait_until='commit', timeout=0):
+            await self.page.locator("input[name=\"senha\"]").press("Enter")
+
+    async def handle_route(self, route):
+        """Bloqueia as imagens, que não são usadas na coleta, e deixa passar as demais requisições."""
+        if route.request.resource_type == "image":
+            if self.network:
+                await self.network.abort(route)
+            else:
+                await route.abort()
+        else:
+            await route.continue_()
+
+    async def close_browser(self):
+        """
+        Fecha o navegador explicitamente quando não for mais necessário.
+        """
+        if self.browser:
+            await self.browser.close()
+            self.browser = None
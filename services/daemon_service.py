@@ -0,0 +1,114 @@
+"""
+Modo daemon: gera a contagem automaticamente a cada troca de plantão, sem interface gráfica.
+
+O processo permanece em execução entre as coletas, mantendo configuração e módulos já carregados.
+"""
+import os
+import time
+from datetime import datetime
+
+from config.app_settings import load_app_settings, next_shift_change
+from config.excel_config_control import calculate_shift
+from data.capture_store import new_capture_dir
+from data.movement_tracker import track_movements
+from data.snapshot_store import store_run
+from services.playwright_service import execute_playwright_task
+from services.report_service import create_excel_report
+from utils.logger import Logger
+from utils.metrics import RunMetrics, save_metrics
+from utils.profiler import start_profiler
+from utils.resource_manager import get_app_dir
+
+logger = Logger.get_logger()
+
+MAX_SLEEP = 60  # Segundos máximos de cada espera, para acompanhar ajustes no relógio
+
+
+def get_daemon_credentials(daemon_settings):
+    """Credenciais do daemon: variáveis de ambiente têm prioridade sobre o arquivo de configuração."""
+    login = os.environ.get('CANAIME_LOGIN') or daemon_settings["login"]
+    password = os.environ.get('CANAIME_PASSWORD') or daemon_settings["password"]
+    return login, password
+
+
+def run_collection(settings):
+    """
+    Executa uma coleta completa e salva o relatório na pasta configurada.
+
+    Parameters
+    ----------
+    settings : dict
+        Configurações da aplicação (`load_app_settings`).
+
+    Returns
+    -------
+    str or None
+        Caminho do relatório salvo, ou None se nada foi gerado.
+    """
+    daemon_settings = settings["daemon"]
+    login, password = get_daemon_credentials(daemon_settings)
+    if not login or not password:
+        logger.error("Credenciais do daemon não configuradas.")
+        return None
+
+    shift_name = calculate_shift(datetime.today())
+    logger.info(f"Coleta agendada do plantão {shift_name} iniciada.")
+
+    metrics = RunMetrics('daemon', profiler=start_profiler('daemon'))
+    try:
+        capture_dir = new_capture_dir(settings["capture"]["dir"]) if settings["capture"]["enabled"] else None
+        with metrics.phase('collect'):
+            all_units_data = execute_playwright_task(True, login, password, daemon_settings["units"],
+                                                     engine=settings["engine"], workers=settings["workers"],
+                                                     capture_dir=capture_dir, metrics=metrics)
+        if not any(len(unit_data) > 0 for unit_data in all_units_data.values()):
+            logger.warning("Nenhum dado válido encontrado para gerar o relatório.")
+            return None
+
+        with metrics.phase('store_run'):
+            store_run(all_units_data)
+
+        output_dir = daemon_settings["output_dir"]
+        if not os.path.isabs(output_dir):
+            # Relativa à raiz do projeto ou, no executável, à pasta dele (e não à pasta temporária de extração)
+            output_dir = os.path.join(get_app_dir(), output_dir)
+        with metrics.phase('track_movements'):
+            movements = track_movements(all_units_data)
+        return create_excel_report(all_units_data, output_dir=output_dir, movements=movements, metrics=metrics)
+    finally:
+        save_metrics(metrics)
+
+
+def run_collection_logged(settings):
+    """Executa `run_collection` registrando qualquer erro, para que uma falha não encerre o daemon."""
+    try:
+        return run_collection(settings)
+    except Exception as e:
+        logger.error(f"Erro na coleta agendada: {str(e)}")
+        Logger.capture_error(e)
+        return None
+
+
+def run_daemon():
+    """
+    Laço principal do daemon: aguarda cada troca de plantão e gera o relatório.
+    """
+    settings = load_app_settings()
+    logger.info("Daemon de contagem iniciado.")
+
+    if settings["daemon"]["run_on_start"]:
+        run_collection_logged(settings)
+
+    while True:
+        settings = load_app_settings()  # Recarrega a configuração para aplicar alterações sem reiniciar
+        next_run = next_shift_change(datetime.now(), settings["daemon"]["shift_change_time"])
+        logger.info(f"Próxima coleta agendada para {next_run:%d/%m/%Y %H:%M}.")
+
+        while datetime.now() < next_run:
+            time.sleep(min(MAX_SLEEP, max(0.0, (next_run - datetime.now()).total_seconds())))
+
+        run_collection_logged(settings)
+
+
+if __name__ == '__main__':
+    run_daemon()
@@ -0,0 +1,257 @@
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config.app_settings import LOGIN_PATH, canaime_url
+from data.capture_store import tee_capture
+from data.data_processor import SessionExpiredError, UnitProcessor
+from data.roll_call_parser import RollCallParser, detect_encoding, iter_roll_call_records
+from utils.logger import Logger
+from utils.metrics import RunMetrics
+
+logger = Logger.get_logger()
+
+# Mesmos cabeçalhos usados pelo contexto do Playwright, mais compressão da resposta
+DEFAULT_HEADERS = {
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive",
+}
+REQUEST_TIMEOUT = (10, 300)  # (conexão, leitura) em segundos
+CHUNK_SIZE = 64 * 1024  # Tamanho dos pedaços lidos da página de chamada
+
+
+class LoginFormParser(HTMLParser):
+    """Localiza o formulário de login (o que contém o campo `senha`) e seus campos."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.forms = []
+        self._current = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'form':
+            self._current = {"action": attrs.get('action') or '', "method": (attrs.get('method') or 'get').lower(),
+                             "fields": {}, "has_submit": False}
+            self.forms.append(self._current)
+        elif tag == 'input' and self._current is not None:
+            name = attrs.get('name')
+            input_type = (attrs.get('type') or 'text').lower()
+            if not name or input_type in ('checkbox', 'radio', 'image', 'file', 'reset', 'button'):
+                return
+            if input_type == 'submit':
+                # Apenas o primeiro botão de envio participa, como no envio com Enter
+                if self._current["has_submit"]:
+                    return
+                self._current["has_submit"] = True
+            self._current["fields"].setdefault(name, attrs.get('value') or '')
+
+    def handle_endtag(self, tag):
+        if tag == 'form':
+            self._current = None
+
+    def login_form(self):
+        for form in self.forms:
+            if 'senha' in form["fields"]:
+                return form
+        return None
+
+
+class CanaimeHttpSession:
+    """
+    Sessão HTTP autenticada no Canaimé, com conexões reaproveitadas (keep-alive) e respostas comprimidas.
+    """
+
+    def __init__(self, login='', password='', storage_state=None):
+        self.login = login
+        self.password = password
+        self.storage_state = storage_state  # Sessão já autenticada (formato `storage_state` do Playwright)
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=8)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def restore_session(self):
+        """
+        Carrega os cookies de uma sessão já autenticada, dispensando um novo login.
+
+        Returns
+        -------
+        bool
+            True se havia cookies para restaurar.
+        """
+        cookies = (self.storage_state or {}).get("cookies", [])
+        for cookie in cookies:
+            self.session.cookies.set(cookie["name"], cookie["value"],
+                                     domain=cookie.get("domain", ""), path=cookie.get("path", "/"))
+        return bool(cookies)
+
+    def perform_login(self):
+        """
+        Realiza o login enviando o formulário da página de login.
+
+        Raises
+        ------
+        PermissionError
+            Se o sistema devolver novamente o formulário de login (credenciais recusadas).
+        """
+        response = self.session.get(canaime_url(LOGIN_PATH), timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+
+        parser = LoginFormParser()
+        parser.feed(response.text)
+        form = parser.login_form()
+        if form is None:
+            raise ValueError("Formulário de login não encontrado na página do Canaimé.")
+
+        fields = dict(form["fields"])
+        fields['usuario'] = self.login
+        fields['senha'] = self.password
+        action_url = urljoin(response.url, form["action"])
+
+        if form["method"] == 'post':
+            response = self.session.post(action_url, data=fields, timeout=REQUEST_TIMEOUT)
+        else:
+            response = self.session.get(action_url, params=fields, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+
+        if self.is_login_page(response.text):
+            raise PermissionError("Usuário ou senha inválidos.")
+        logger.info("Login HTTP efetuado com sucesso.")
+
+    @staticmethod
+    def is_login_page(html):
+        parser = LoginFormParser()
+        parser.feed(html)
+        return parser.login_form() is not None
+
+    def iter_roll_call_records(self, unit, capture_dir=None):
+        """
+        Baixa a página de chamada com fotos da unidade e gera os registros à medida que chegam.
+
+        O corpo da resposta é lido em pedaços e processado de forma incremental, sem manter o
+        documento inteiro em memória.
+
+        Parameters
+        ----------
+        unit : str
+            Código da unidade prisional.
+        capture_dir : str, optional
+            Pasta onde gravar, durante a leitura, uma cópia da página (modo replay).
+
+        Yields
+        ------
+        tuple
+            Tuplas (código, ala, cela, preso).
+
+        Raises
+        ------
+        SessionExpiredError
+            Se o sistema devolver o formulário de login no lugar da página de chamada.
+        """
+        parser = RollCallParser()
+        with self.session.get(UnitProcessor.unit_url(unit), timeout=REQUEST_TIMEOUT, stream=True) as response:
+            response.raise_for_status()
+            # Sem charset no Content-Type, o `requests` assumiria ISO-8859-1: vale então o da tag <meta>
+            declared = response.encoding if 'charset' in response.headers.get('Content-Type', '').lower() else None
+            encoding, chunks = detect_encoding(response.iter_content(chunk_size=CHUNK_SIZE), declared)
+            if capture_dir:
+                chunks = tee_capture(capture_dir, unit, chunks, encoding=encoding, engine='http')
+            yield from iter_roll_call_records(chunks, encoding=encoding, parser=parser)
+        if parser.login_form_found:
+            raise SessionExpiredError("A sessão do Canaimé foi recusada ou expirou.")
+
+    def close(self):
+        self.session.close()
+
+
+def execute_http_task(login, password, selected_units, workers=1, session_state=None, capture_dir=None,
+                      metrics=None):
+    """
+    Coleta os dados das unidades selecionadas via HTTP, sem abrir o navegador.
+
+    Parameters
+    ----------
+    login : str
+        Usuário do Canaimé.
+    password : str
+        Senha do Canaimé.
+    selected_units : list
+        Códigos das unidades a coletar.
+    workers : int
+        Número de unidades baixadas simultaneamente pela mesma sessão. Com o perfil ativo (`--profile`), as
+        unidades são baixadas uma por vez, na thread do perfilador.
+    session_state : dict, optional
+        Sessão já autenticada (cookies) obtida na tela de login; o login só é refeito se ela for recusada.
+    capture_dir : str, optional
+        Pasta onde guardar o HTML bruto de cada unidade (modo replay).
+    metrics : RunMetrics, optional
+        Onde registrar os tempos de cada etapa.
+
+    Returns
+    -------
+    dict
+        Dicionário {unidade: [registros]} no mesmo formato de `execute_playwright_task`.
+    """
+    logger.info("Executando coleta via HTTP.")
+    all_units_data = {}
+    metrics = metrics or RunMetrics()
+    http_session = CanaimeHttpSession(login=login, password=password, storage_state=session_state)
+    try:
+        restored = http_session.restore_session()
+        if not restored:
+            with metrics.phase('login'):
+                http_session.perform_login()
+        unit_processor = UnitProcessor(None, metrics=metrics)
+
+        def collect_unit(unit):
+            logger.debug(f"Processando unidade: {unit}")
+            try:
+                if unit not in unit_processor.units_config:
+                    logger.warning(f"Configuração para a unidade {unit} não encontrada.")
+                    return {}
+                # Download, leitura e mapeamento acontecem juntos, à medida que a página chega
+                with metrics.phase('download_parse_map', unit):
+                    records = http_session.iter_roll_call_records(unit, capture_dir=capture_dir)
+                    unit_list = list(unit_processor.iter_mapped_records(unit, records))
+                metrics.set_records(unit, len(unit_list))
+                logger.info(f"Total de registros mapeados em {unit}: {len(unit_list)}")
+                return {unit: unit_list}
+            except SessionExpiredError:
+                raise
+            except Exception as e:
+                logger.error(f"Erro ao processar unidade {unit}: {str(e)}")
+                Logger.capture_error(e)
+                return {}
+
+        def collect_all():
+            if metrics.profiler:
+                # O perfilador mede apenas a sua thread: com o perfil ativo, as unidades são coletadas nela
+                for unit in selected_units:
+                    all_units_data.update(collect_unit(unit))
+                return
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+                for unit_data in executor.map(collect_unit, selected_units):
+                    all_units_data.update(unit_data)
+
+        try:
+            collect_all()
+        except SessionExpiredError:
+            if not restored:
+                raise
+            logger.info("Sessão da tela de login recusada. Refazendo o login.")
+            with metrics.phase('relogin'):
+                http_session.perform_login()
+            collect_all()
+    except Exception as e:
+        logger.error(f"Erro na coleta HTTP: {str(e)}")
+        Logger.capture_error(e)
+    finally:
+        http_session.close()
+
+    return all_units_data
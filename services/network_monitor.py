@@ -0,0 +1,168 @@
+"""
+Contabilidade das requisições feitas pelo navegador durante a coleta.
+
+Assina os eventos de requisição do contexto do Playwright e registra, para cada requisição, o tipo de
+recurso, o tempo, o tamanho transferido e se foi bloqueada, redirecionada ou falhou. O resumo por tipo de
+recurso e por unidade mostra o que ainda vale bloquear e quanto cada execução consome da rede.
+
+Contextos acompanhados: a coleta síncrona (`execute_playwright_task`) e a assíncrona
+(`execute_playwright_task_async`), cujos resumos entram nas métricas da execução, e os navegadores abertos
+durante a tela de login (pré-aquecimento e login em navegador próprio), cujos resumos vão para o log.
+"""
+import time
+from urllib.parse import parse_qs, urlsplit
+
+from utils.logger import Logger
+
+logger = Logger.get_logger()
+
+UNIT_PARAMETER = 'id_und_prisional'
+LOGIN_UNIT = 'login'  # Requisições feitas antes de qualquer página de unidade (login, tela inicial)
+
+
+def empty_totals():
+    return {"requests": 0, "aborted": 0, "failed": 0, "redirects": 0, "bytes": 0, "seconds": 0.0}
+
+
+class NetworkMonitor:
+    """
+    Registra as requisições de um contexto do Playwright (API síncrona).
+
+    Uso:
+        monitor = NetworkMonitor()
+        monitor.attach(context)
+        context.route("**/*", lambda route: monitor.abort(route) if ... else route.continue_())
+        ...
+        summary = monitor.summary()
+    """
+
+    def __init__(self):
+        self.entries = []  # Um dicionário por requisição concluída, bloqueada ou com falha
+        self._started = {}  # Requisição -> instante em que foi enviada
+        self._aborted = set()  # Requisições bloqueadas pela rota do contexto
+        self._page_units = {}  # Página -> unidade cuja página de chamada ela carregou por último
+
+    def attach(self, context):
+        """Passa a acompanhar as requisições de todas as páginas do contexto."""
+        context.on("request", self._on_request)
+        context.on("requestfinished", self._on_finished)
+        context.on("requestfailed", self._on_failed)
+
+    def abort(self, route):
+        """Bloqueia a requisição da rota, registrando-a como bloqueada."""
+        self._aborted.add(route.request)
+        route.abort()
+
+    def _unit_for(self, request):
+        try:
+            page = request.frame.page
+        except Exception:
+            return LOGIN_UNIT
+
+        if request.is_navigation_request():
+            unit = parse_qs(urlsplit(request.url).query).get(UNIT_PARAMETER, [None])[0]
+            self._page_units[page] = unit or LOGIN_UNIT
+        return self._page_units.get(page, LOGIN_UNIT)
+
+    def _on_request(self, request):
+        self._started[request] = (time.perf_counter(), self._unit_for(request))
+
+    def _record(self, request, **values):
+        started, unit = self._started.pop(request, (time.perf_counter(), LOGIN_UNIT))
+        entry = {
+            "url": request.url,
+            "resource_type": request.resource_type,
+            "unit": unit,
+            "seconds": time.perf_counter() - started,
+            "bytes": 0,
+            "status": None,
+            "aborted": False,
+            "failed": False,
+            "redirect": False,
+        }
+        entry.update(values)
+        self.entries.append(entry)
+
+    def _on_finished(self, request):
+        sizes = response = None
+        try:
+            sizes = request.sizes()
+            response = request.response()
+        except Exception as e:
+            logger.debug(f"Tamanho indisponível para {request.url}: {str(e)}")
+        self._record_finished(request, sizes, response)
+
+    def _record_finished(self, request, sizes, response):
+        size = sizes["responseHeadersSize"] + max(0, sizes["responseBodySize"]) if sizes else 0
+        status = response.status if response else None
+        self._record(request, bytes=size, status=status, redirect=status is not None and 300 <= status < 400)
+
+    def _on_failed(self, request):
+        if request in self._aborted:
+            self._aborted.discard(request)
+            self._record(request, aborted=True)
+        else:
+            self._record(request, failed=True)
+
+    def summary(self):
+        """
+        Resume as requisições por tipo de recurso e por unidade.
+
+        Returns
+        -------
+        dict
+            Dicionário com os totais gerais (`total`), por tipo de recurso (`by_resource_type`), por
+            unidade (`by_unit`) e o tempo e o tamanho das páginas de chamada de cada unidade (`documents`).
+        """
+        total = empty_totals()
+        by_type = {}
+        by_unit = {}
+        documents = {}
+        for entry in self.entries:
+            for totals in (total, by_type.setdefault(entry["resource_type"], empty_totals()),
+                           by_unit.setdefault(entry["unit"], empty_totals())):
+                totals["requests"] += 1
+                totals["aborted"] += entry["aborted"]
+                totals["failed"] += entry["failed"]
+                totals["redirects"] += entry["redirect"]
+                totals["bytes"] += entry["bytes"]
+                totals["seconds"] += entry["seconds"]
+            if entry["resource_type"] == "document" and entry["unit"] != LOGIN_UNIT and not entry["redirect"]:
+                documents[entry["unit"]] = {"bytes": entry["bytes"], "seconds": round(entry["seconds"], 6),
+                                            "status": entry["status"]}
+
+        for totals in [total, *by_type.values(), *by_unit.values()]:
+            totals["seconds"] = round(totals["seconds"], 6)
+        return {"total": total, "by_resource_type": by_type, "by_unit": by_unit, "documents": documents}
+
+    def log_summary(self, summary=None, label=None):
+        summary = summary or self.summary()
+        total = summary["total"]
+        source = f" ({label})" if label else ''  # Navegador de origem, quando não é o da coleta
+        types = ', '.join(f"{resource_type}={totals['requests']} ({totals['bytes'] / 1024:.0f} KiB, "
+                          f"{totals['aborted']} bloqueadas)"
+                          for resource_type, totals in sorted(summary["by_resource_type"].items(),
+                                                              key=lambda item: item[1]["bytes"], reverse=True))
+        logger.info(f"Rede{source}: {total['requests']} requisições, {total['bytes'] / 1024:.0f} KiB, "
+                    f"{total['aborted']} bloqueadas, {total['failed']} com falha, "
+                    f"{total['redirects']} redirecionamentos. Por tipo: {types}")
+
+
+class AsyncNetworkMonitor(NetworkMonitor):
+    """
+    Versão de `NetworkMonitor` para contextos de `playwright.async_api`, em que o bloqueio da rota e a
+    leitura do tamanho e da resposta de cada requisição são aguardados.
+    """
+
+    async def abort(self, route):
+        self._aborted.add(route.request)
+        await route.abort()
+
+    async def _on_finished(self, request):
+        sizes = response = None
+        try:
+            sizes = await request.sizes()
+            response = await request.response()
+        except Exception as e:
+            logger.debug(f"Tamanho indisponível para {request.url}: {str(e)}")
+        self._record_finished(request, sizes, response)
@@ -1,40 +1,148 @@
+from playwright.async_api import async_playwright
 from playwright.sync_api import sync_playwright
-from data.data_processor import UnitProcessor
-from services.canaime_service import CanaimeLogin
+from data.data_processor import AsyncUnitProcessor, SessionExpiredError, UnitProcessor
+from services.canaime_service import AsyncCanaimeLogin, CanaimeLogin
+from services.network_monitor import AsyncNetworkMonitor, NetworkMonitor
 from utils.logger import Logger
+from utils.metrics import RunMetrics
 
 logger = Logger.get_logger()
 
 
-def execute_playwright_task(headless, login, password, selected_units):
+def collect_units(unit_processor, selected_units, workers=1):
+    """
+    Coleta as unidades selecionadas com a página logada do `unit_processor`.
+
+    Erros de uma unidade são registrados e não interrompem as demais; a sessão recusada
+    (`SessionExpiredError`) é repassada para que o login possa ser refeito.
+    """
+    all_units_data = {}
+    if workers > 1 and len(selected_units) > 1:
+        # Modo concorrente: várias páginas do mesmo contexto autenticado
+        logger.info(f"Coletando {len(selected_units)} unidades com {workers} páginas simultâneas.")
+        return unit_processor.collect_units(selected_units, workers=workers)
+
+    for unit in selected_units:
+        logger.debug(f"Processando unidade: {unit}")
+        try:
+            unit_data = unit_processor.create_unit_list(unit)
+            all_units_data.update(unit_data)
+            logger.debug(f"Dados da unidade {unit}: {unit_data}")
+        except SessionExpiredError:
+            raise
+        except Exception as e:
+            logger.error(f"Erro ao processar unidade {unit}: {str(e)}")
+            Logger.capture_error(e)
+    return all_units_data
+
+
+def execute_playwright_task(headless, login, password, selected_units, engine='playwright', workers=1,
+                            session_state=None, capture_dir=None, metrics=None):
+    metrics = metrics or RunMetrics()
+    if engine == 'http':
+        # Coleta sem navegador: sessão HTTP e leitura direta do HTML da página de chamada
+        from services.http_service import execute_http_task
+
+        return execute_http_task(login, password, selected_units, workers=workers, session_state=session_state,
+                                 capture_dir=capture_dir, metrics=metrics)
+
     logger.info("Executando tarefa do Playwright.")
+
+    # Inicializar dicionário para armazenar dados de todas as unidades
+    all_units_data = {}
+    network = NetworkMonitor()  # Requisições feitas pelo navegador, por tipo de recurso e por unidade
     try:
         with sync_playwright() as p:
-            # Inicializar a classe de login e realizar o login
-            login_handler = CanaimeLogin(p, headless=headless, login=login, password=password)
-            page, browser = login_handler.perform_login()  # Obtém a página e o navegador
+            # Inicializar a classe de login e realizar o login (ou reaproveitar a sessão da tela de login)
+            login_handler = CanaimeLogin(p, headless=headless, login=login, password=password,
+                                         storage_state=session_state, network=network)
+            with metrics.phase('login'):
+                page, browser = login_handler.perform_login()  # Obtém a página e o navegador
 
             # Instanciar o UnitProcessor com a página logada
-            unit_processor = UnitProcessor(page)
-
-            # Inicializar dicionário para armazenar dados de todas as unidades
-            all_units_data = {}
+            unit_processor = UnitProcessor(page, capture_dir=capture_dir, metrics=metrics)
 
             # Iterar sobre as unidades selecionadas e coletar dados
             try:
-                for unit in selected_units:
-                    logger.debug(f"Processando unidade: {unit}")
-                    try:
-                        unit_data = unit_processor.create_unit_list(unit)
-                        all_units_data.update(unit_data)
-                        logger.debug(f"Dados da unidade {unit}: {unit_data}")
-                    except Exception as e:
-                        logger.error(f"Erro ao processar unidade {unit}: {str(e)}")
-                        Logger.capture_error(e)
+                try:
+                    all_units_data.update(collect_units(unit_processor, selected_units, workers))
+                except SessionExpiredError:
+                    if not login_handler.restored_session:
+                        raise
+                    logger.info("Sessão da tela de login recusada. Refazendo o login.")
+                    with metrics.phase('relogin'):
+                        login_handler.login_with_credentials()
+                    all_units_data.update(collect_units(unit_processor, selected_units, workers))
             finally:
                 browser.close()  # Garante que o navegador será fechado
     except Exception as e:
         logger.error(f"Erro no Playwright: {str(e)}")
         Logger.capture_error(e)
 
+    network_summary = network.summary()
+    metrics.add_section('network', network_summary)
+    network.log_summary(network_summary)
+    return all_units_data
+
+
+async def execute_playwright_task_async(headless, login, password, selected_units, workers=1, session_state=None,
+                                        capture_dir=None, metrics=None):
+    """
+    Versão assíncrona de `execute_playwright_task`, para ser aguardada por serviços assíncronos
+    sem a necessidade de um processo separado.
+
+    Parameters
+    ----------
+    headless : bool
+        Executa o navegador sem interface gráfica.
+    login : str
+        Usuário do Canaimé.
+    password : str
+        Senha do Canaimé.
+    selected_units : list
+        Códigos das unidades a coletar.
+    workers : int
+        Número máximo de unidades coletadas simultaneamente.
+    session_state : dict, optional
+        Sessão já autenticada (`storage_state`) obtida na tela de login; o login só é refeito se ela for recusada.
+    capture_dir : str, optional
+        Pasta onde guardar o HTML bruto de cada unidade (modo replay).
+    metrics : RunMetrics, optional
+        Onde registrar os tempos de cada etapa.
+
+    Returns
+    -------
+    dict
+        Dicionário {unidade: [registros]}.
+    """
+    logger.info("Executando tarefa assíncrona do Playwright.")
+    all_units_data = {}
+    metrics = metrics or RunMetrics()
+    network = AsyncNetworkMonitor()  # Requisições feitas pelo navegador, por tipo de recurso e por unidade
+    try:
+        async with async_playwright() as p:
+            login_handler = AsyncCanaimeLogin(p, headless=headless, login=login, password=password,
+                                              storage_state=session_state, network=network)
+            with metrics.phase('login'):
+                page, browser = await login_handler.perform_login()
+            try:
+                unit_processor = AsyncUnitProcessor(page, capture_dir=capture_dir, metrics=metrics)
+                try:
+                    all_units_data = await unit_processor.collect_units(selected_units, workers=workers)
+                except SessionExpiredError:
+                    if not login_handler.restored_session:
+                        raise
+                    logger.info("Sessão da tela de login recusada. Refazendo o login.")
+                    with metrics.phase('relogin'):
+                        await login_handler.login_with_credentials()
+                    all_units_data = await unit_processor.collect_units(selected_units, workers=workers)
+            finally:
+                await browser.close()  # Garante que o navegador será fechado
+    except Exception as e:
+        logger.error(f"Erro no Playwright: {str(e)}")
+        Logger.capture_error(e)
+
+    network_summary = network.summary()
+    metrics.add_section('network', network_summary)
+    network.log_summary(network_summary)
     return all_units_data
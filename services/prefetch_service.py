@@ -0,0 +1,200 @@
+from queue import Empty, Queue
+from threading import Event, Thread
+
+from config.app_settings import LOGIN_PATH, canaime_url
+from services.browser_server import launch_browser
+from services.network_monitor import NetworkMonitor
+from utils.logger import Logger
+
+logger = Logger.get_logger()
+
+
+class SessionPrewarmer:
+    """
+    Aproveita o tempo em que o usuário digita as credenciais e escolhe as unidades.
+
+    Uma thread dedicada (dona do Playwright) abre o navegador e a página de login assim que a janela
+    de login aparece. Após o login, a mesma thread já coleta as unidades ativas em segundo plano;
+    quando a seleção é confirmada, `take` devolve apenas as unidades escolhidas e descarta as demais.
+    """
+
+    def __init__(self, headless=True, units=(), capture_dir=None):
+        self.headless = headless
+        self.units = list(units)
+        self.capture_dir = capture_dir  # Pasta onde guardar o HTML das unidades pré-coletadas
+        self.session_state = None  # Cookies da sessão autenticada
+        self.prefetched = {}  # Dados já coletados, no formato {unidade: [registros]}
+        self.network = NetworkMonitor()  # Requisições do login e da pré-coleta, resumidas no log ao final
+
+        self._jobs = Queue()
+        self._wanted = None  # Unidades confirmadas pelo usuário (None enquanto a seleção não termina)
+        self._cancel = Event()
+        self._prefetch_done = Event()
+        self._thread = Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def login(self, usuario, senha):
+        """
+        Realiza o login na página já aberta. Bloqueia a thread que chamou até o resultado.
+
+        Returns
+        -------
+        bool
+            True se o login foi aceito, False se as credenciais foram recusadas.
+
+        Raises
+        ------
+        Exception
+            Erro de conexão ou do navegador durante o login.
+        """
+        result = Queue(maxsize=1)
+        self._jobs.put((usuario, senha, result))
+        while True:
+            try:
+                outcome = result.get(timeout=0.5)
+                break
+            except Empty:
+                if not self._thread.is_alive() and result.empty():
+                    raise RuntimeError("O navegador pré-aquecido não está disponível.")
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    def wait_prefetch(self, timeout=None):
+        """Aguarda o fim da pré-coleta; retorna True se ela já terminou."""
+        return self._prefetch_done.wait(timeout)
+
+    def select(self, units):
+        """Informa as unidades confirmadas; a pré-coleta ignora as demais a partir deste ponto."""
+        self._wanted = set(units)
+
+    def take(self, units, timeout=None):
+        """
+        Devolve os dados pré-coletados das unidades confirmadas e encerra o navegador.
+
+        Parameters
+        ----------
+        units : list
+            Unidades confirmadas pelo usuário.
+        timeout : float, optional
+            Tempo máximo de espera pela pré-coleta em andamento.
+
+        Returns
+        -------
+        dict
+            Dicionário {unidade: [registros]} apenas com as unidades confirmadas já coletadas.
+        """
+        self.select(units)
+        self.wait_prefetch(timeout)
+        self.close()
+        return {unit: data for unit, data in self.prefetched.items() if unit in self._wanted}
+
+    @property
+    def available(self):
+        """False depois de `close`: o navegador foi (ou está sendo) encerrado e a pré-coleta não continua."""
+        return not self._cancel.is_set()
+
+    def close(self, timeout=None):
+        """
+        Encerra o navegador; `wait_prefetch` retorna assim que a thread termina.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Se informado, aguarda até esse tempo a thread fechar o navegador (por exemplo, antes de o processo
+            ser substituído por uma atualização).
+        """
+        self._cancel.set()
+        self._jobs.put(None)
+        if timeout and self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def _run(self):
+        try:
+            from playwright.sync_api import sync_playwright
+
+            with sync_playwright() as p:
+                browser = launch_browser(p, headless=self.headless)
+                try:
+                    self._serve(browser)
+                finally:
+                    browser.close()
+        except Exception as e:
+            logger.error(f"Erro no pré-aquecimento do navegador: {str(e)}")
+            self._fail_pending(e)
+        finally:
+            if self.network.entries:
+                self.network.log_summary(label='pré-aquecimento')
+            self._prefetch_done.set()
+
+    def _serve(self, browser):
+        context = browser.new_context(java_script_enabled=False)
+        context.set_extra_http_headers(
+            {"Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8"})
+        self.network.attach(context)
+        context.route("**/*",
+                      lambda route: self.network.abort(route) if route.request.resource_type == "image"
+                      else route.continue_())
+        page = context.new_page()
+
+        # Abre a página de login enquanto o usuário ainda digita
+        login_page_ready = False
+        try:
+            page.goto(canaime_url(LOGIN_PATH), timeout=0)
+            login_page_ready = True
+        except Exception as e:
+            logger.warning(f"Falha ao pré-carregar a página de login: {str(e)}")
+
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+
+            usuario, senha, result = job
+            try:
+                if not login_page_ready:
+                    page.goto(canaime_url(LOGIN_PATH), timeout=0)
+                page.fill("input[name='usuario']", usuario)
+                page.fill("input[name='senha']", senha)
+                with page.expect_navigation(timeout=0):
+                    page.press("input[name='senha']", "Enter")
+
+                if page.locator('img').count() < 4:
+                    login_page_ready = False
+                    result.put(False)
+                    continue
+
+                self.session_state = context.storage_state()
+                result.put(True)
+            except Exception as e:
+                login_page_ready = False
+                result.put(e)
+                continue
+
+            self._prefetch(page)
+            return
+
+    def _prefetch(self, page):
+        from data.data_processor import UnitProcessor
+
+        unit_processor = UnitProcessor(page, capture_dir=self.capture_dir)
+        for unit in self.units:
+            if self._cancel.is_set():
+                break
+            if self._wanted is not None and unit not in self._wanted:
+                continue
+            try:
+                logger.info(f"Pré-coletando a unidade {unit}.")
+                self.prefetched.update(unit_processor.create_unit_list(unit))
+            except Exception as e:
+                logger.warning(f"Falha na pré-coleta da unidade {unit}: {str(e)}")
+        self._prefetch_done.set()
+
+    def _fail_pending(self, error):
+        while not self._jobs.empty():
+            job = self._jobs.get_nowait()
+            if job is not None:
+                job[2].put(error)
@@ -0,0 +1,91 @@
+"""
+Modo replay: gera o relatório a partir de páginas capturadas, sem rede.
+
+Todas as capturas, tanto as respostas do motor HTTP quanto o HTML serializado pelo Playwright (ver
+`data/capture_store.py`), são lidas pelo parser incremental da coleta HTTP, sem navegador: o parser produz as
+mesmas entradas que `extract_entries` obtém da página carregada.
+"""
+from data.capture_store import capture_time, iter_capture_chunks, list_captures, load_capture_meta
+from data.data_processor import UnitProcessor
+from data.roll_call_parser import iter_roll_call_records
+from services.report_service import create_excel_report
+from utils.logger import Logger
+from utils.metrics import RunMetrics, save_metrics
+from utils.profiler import start_profiler
+
+logger = Logger.get_logger()
+
+
+def replay_unit(unit_processor, unit, path):
+    """Reprocessa a página capturada de uma unidade com o parser incremental."""
+    with unit_processor.metrics.phase('parse_map', unit):
+        records = iter_roll_call_records(iter_capture_chunks(path))
+        unit_list = list(unit_processor.iter_mapped_records(unit, records))
+    unit_processor.metrics.set_records(unit, len(unit_list))
+    return {unit: unit_list}
+
+
+def replay_units(capture_dir, metrics=None):
+    """
+    Reprocessa as capturas de uma execução pela mesma extração e mapeamento da coleta.
+
+    Parameters
+    ----------
+    capture_dir : str
+        Pasta de capturas da execução.
+    metrics : RunMetrics, optional
+        Onde registrar os tempos de cada etapa.
+
+    Returns
+    -------
+    dict
+        Dicionário {unidade: [registros]}.
+    """
+    unit_processor = UnitProcessor(None, metrics=metrics)
+    all_units_data = {}
+    for unit, path in list_captures(capture_dir):
+        if unit not in unit_processor.units_config:
+            logger.warning(f"Configuração para a unidade {unit} não encontrada.")
+            continue
+        engine = load_capture_meta(capture_dir, unit).get("engine", 'http')
+        logger.debug(f"Captura de {unit} produzida pelo motor {engine}.")
+        all_units_data.update(replay_unit(unit_processor, unit, path))
+
+    for unit, unit_list in sorted(all_units_data.items()):
+        logger.info(f"Replay de {unit}: {len(unit_list)} registros.")
+    return dict(sorted(all_units_data.items()))
+
+
+def replay_capture(capture_dir, output_dir=None):
+    """
+    Gera o relatório Excel a partir das capturas de uma execução.
+
+    O histórico e as movimentações não são alterados, já que os dados não são de uma coleta nova. A data
+    e o plantão do relatório (nome do arquivo e cabeçalho) são os da coleta capturada, e um relatório já
+    existente com o mesmo nome, como o relatório original, não é substituído.
+
+    Parameters
+    ----------
+    capture_dir : str
+        Pasta de capturas da execução.
+    output_dir : str, optional
+        Pasta onde salvar o relatório. Se não informada, abre a caixa de diálogo.
+
+    Returns
+    -------
+    str or None
+        Caminho do relatório salvo.
+    """
+    logger.info(f"Replay das capturas em {capture_dir}.")
+    metrics = RunMetrics('replay', profiler=start_profiler('replay'))
+    try:
+        all_units_data = replay_units(capture_dir, metrics)
+        if not any(all_units_data.values()):
+            logger.warning("Nenhum dado válido encontrado nas capturas.")
+            return None
+        collected_at = capture_time(capture_dir)
+        logger.info(f"Coleta capturada em {collected_at:%d/%m/%Y %H:%M:%S}.")
+        return create_excel_report(all_units_data, output_dir=output_dir, metrics=metrics, report_date=collected_at,
+                                   overwrite=False)
+    finally:
+        save_metrics(metrics)
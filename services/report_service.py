@@ -1,70 +1,54 @@
 from datetime import datetime
-import pandas as pd
+import os
 from openpyxl import Workbook
-from openpyxl.styles import Alignment
 from openpyxl.utils import column_index_from_string, get_column_letter
-from config.excel_config_control import generate_unit_control_sheet
-from config.excel_config_sei import generate_unit_sei_sheet
-from tkinter import filedialog
+from config.excel_config_movement import generate_unit_movement_sheet
+from data.occupancy import count_occupancy, load_units_config
+from data.template_store import create_unit_sheet
 
 from utils.logger import Logger
+from utils.metrics import RunMetrics
 
 logger = Logger.get_logger()
 
 
-def get_shift_name():
+def get_shift_name(date=None):
     """
-    Retorna o nome do plantão com base na data atual.
+    Retorna o nome do plantão com base na data informada (por padrão, a data atual).
     Ciclo de plantões: ALFA, BRAVO, CHARLIE, DELTA.
     """
     base_date = datetime(2024, 1, 1)  # Data de referência (1º de janeiro foi CHARLIE)
     shifts = ['CHARLIE', 'DELTA', 'ALFA', 'BRAVO']  # Começando por CHARLIE
-    current_date = datetime.now()
+    current_date = date or datetime.now()
     delta_days = (current_date - base_date).days
     shift_name = shifts[delta_days % len(shifts)]
     return shift_name
 
 
-def calculate_data(df):
+def calculate_data(records, unit_config=None):
     """
     Realiza cálculos nos dados da unidade, contando o número de presos por cela em cada ala e bloco.
 
     Parameters
     ----------
-    df : DataFrame
-        DataFrame contendo dados da unidade.
+    records : list
+        Registros mapeados da unidade (dicionários com "Bloco", "Ala", "Cela", ...).
+    unit_config : dict, optional
+        Configuração da unidade, usada para numerar as celas na ordem da configuração.
 
     Returns
     -------
     dict
-        Dicionário com o número de presos por cela, ala e bloco.
+        Dicionário com o número de presos por cela, aninhado por Bloco -> Ala -> Cela.
     """
-    # Agrupar pelos campos Bloco, Ala e Cela e contar quantos presos estão em cada combinação
-    grouped_data = df.groupby(['Bloco', 'Ala', 'Cela']).size().reset_index(name='Quantidade')
-
-    # Converter para um dicionário de fácil manipulação
-    calculated_data = {}
-    for _, row in grouped_data.iterrows():
-        bloco = row['Bloco']
-        ala = row['Ala']
-        cela = row['Cela']
-        quantidade = row['Quantidade']
-
-        # Estrutura o dicionário conforme a hierarquia Bloco -> Ala -> Cela
-        if bloco not in calculated_data:
-            calculated_data[bloco] = {}
-        if ala not in calculated_data[bloco]:
-            calculated_data[bloco][ala] = {}
-
-        calculated_data[bloco][ala][cela] = quantidade
-
-    return calculated_data
+    return count_occupancy(records, unit_config)["celas"]
 
 
 def fill_control_sheet(ws, data):
     """
     Preenche a aba "Controle" com os dados calculados para cada cela e faz o somatório na linha 33.
-    Alinha as células no centro e calcula o somatório das celas de "REMIÇÃO 01" e "REMIÇÃO 02".
+    Calcula o somatório das celas de "REMIÇÃO 01" e "REMIÇÃO 02". A formatação (inclusive o alinhamento
+    centralizado dos valores) já vem da aba gerada por `generate_unit_control_sheet`.
 
     Parameters
     ----------
@@ -74,7 +58,6 @@ def fill_control_sheet(ws, data):
         Dicionário com os dados calculados, contendo a quantidade de presos por cela
         (aninhado por Bloco -> Ala -> Cela).
     """
-    center_alignment = Alignment(horizontal='center', vertical='center')  # Alinhamento centralizado
     # Mapeamento das colunas por bloco e alas
     bloco_a_cols = ['D', 'F', 'H', 'J', 'L']  # Alas 12, 13, 14, 15, 16
     bloco_b_cols = ['O', 'Q', 'S', 'U', 'W', 'Y', 'AA']  # Alas 01, 02, 03, 04, 05, 06, 07
@@ -94,14 +77,11 @@ def fill_control_sheet(ws, data):
             if 'A' in data and ala in data['A'] and cela in data['A'][ala]:
                 quantidade_presos = data['A'][ala][cela]
                 ws[f'{col}{row}'] = quantidade_presos
-                ws[f'{col}{row}'].alignment = center_alignment  # Centraliza o valor
             else:
                 ws[f'{col}{row}'] = 0
-                ws[f'{col}{row}'].alignment = center_alignment  # Centraliza o valor
 
         # Somatório da coluna na linha 33
         ws[f'{col}{total_row}'] = f'=SUM({col}{row_start}:{col}{row_end})'
-        ws[f'{col}{total_row}'].alignment = center_alignment  # Centraliza o somatório
 
     # Preencher Bloco B
     bloco_b_alas = ['01', '02', '03', '04', '05', '06', '07']
@@ -115,14 +95,11 @@ def fill_control_sheet(ws, data):
             if 'B' in data and ala in data['B'] and cela in data['B'][ala]:
                 quantidade_presos = data['B'][ala][cela]
                 ws[f'{col}{row}'] = quantidade_presos
-                ws[f'{col}{row}'].alignment = center_alignment  # Centraliza o valor
             else:
                 ws[f'{col}{row}'] = 0
-                ws[f'{col}{row}'].alignment = center_alignment  # Centraliza o valor
 
         # Somatório da coluna na linha 33
         ws[f'{col}{total_row}'] = f'=SUM({col}{row_start}:{col}{row_end})'
-        ws[f'{col}{total_row}'].alignment = center_alignment  # Centraliza o somatório
 
     # Somatório de todas as celas de REMIÇÃO 01 e REMIÇÃO 02
     rem_01_total = 0
@@ -139,12 +116,9 @@ def fill_control_sheet(ws, data):
 
     # Preencher o somatório total em O13 para REMIÇÃO 01 e O14 para REMIÇÃO 02
     ws['O13'] = rem_01_total
-    ws['O13'].alignment = center_alignment  # Centraliza o valor
-
     ws['O14'] = rem_02_total
-    ws['O14'].alignment = center_alignment  # Centraliza o valor
 
-    # Preenchendo fórmulas e instruções nas células de B3 até B36 com alinhamento centralizado
+    # Preenchendo fórmulas e instruções nas células de B3 até B36
     ws['B3'] = '=D33'
     ws['B4'] = '=F33'
     ws['B5'] = '=H33'
@@ -174,7 +148,6 @@ def fill_control_sheet(ws, data):
 
     # Preencher o somatório total em B19 para TRIAGEM
     ws['B19'] = triagem_total
-    ws['B19'].alignment = Alignment(horizontal='center', vertical='center')  # Centraliza o valor
 
     # Somatório de todas as celas de Externo (HGR, TRATOX, PRIS/DOM)
     externo_hgr_total = 0
@@ -200,14 +173,11 @@ def fill_control_sheet(ws, data):
                 externo_prisdom_total += qtd
             ws['B27'] = externo_prisdom_total
 
-    # Alinhamento centralizado das células de B3 até B36
-    for row in range(3, 37):
-        ws[f'B{row}'].alignment = center_alignment
-
 
 def fill_sei_sheet(ws_sei, ws_control):
     """
-    Preenche a aba "SEI" com os dados da aba "Controle".
+    Preenche a aba "SEI" com os dados da aba "Controle". A formatação já vem da aba gerada por
+    `generate_unit_sei_sheet`.
 
     Parameters
     ----------
@@ -266,11 +236,6 @@ def fill_sei_sheet(ws_sei, ws_control):
 
     ws_sei['B35'] = '=SUM(B34:J34)'  # Total A
 
-    # Centralizando o conteúdo das células da aba SEI
-    for row in ws_sei.iter_rows(min_row=6, max_row=34, min_col=2, max_col=10):
-        for cell in row:
-            cell.alignment = Alignment(horizontal='center', vertical='center')
-
     # Mapeamento de células para a segunda parte (B42 até N66)
     cell_mapping_part_2 = [
         ('B42', 'O5'), ('D42', 'Q5'), ('F42', 'S5'), ('H42', 'U5'), ('J42', 'W5'), ('L42', 'Y5'), ('N42', 'AA5'),
@@ -319,13 +284,42 @@ def fill_sei_sheet(ws_sei, ws_control):
     ws_sei['B68'] = triagem  # Triagem
     ws_sei['B69'] = '=SUM(B67:B68)'  # total geral
 
-    # Centralizando o conteúdo das células da aba SEI
-    for row in ws_sei.iter_rows(min_row=42, max_row=69, min_col=2, max_col=14):
-        for cell in row:
-            cell.alignment = Alignment(horizontal='center', vertical='center')
 
+def fill_movement_rows(ws, movements):
+    """
+    Preenche as linhas ENTRADAS (B32) e SAÍDAS (B33) da aba "Controle".
 
-def create_excel_report(data):
+    Parameters
+    ----------
+    ws : Worksheet
+        A aba "Controle" da unidade.
+    movements : dict
+        Movimentações da unidade, como retornadas por `diff_snapshots`.
+    """
+    ws['B32'] = len(movements["entradas"])
+    ws['B33'] = len(movements["saidas"])
+
+
+def fill_movement_sheet(ws, movements):
+    """
+    Lista, na aba de movimentações, as entradas, saídas e mudanças de ala/cela desde o plantão anterior.
+
+    Parameters
+    ----------
+    ws : Worksheet
+        A aba de movimentações da unidade.
+    movements : dict
+        Movimentações da unidade, como retornadas por `diff_snapshots`.
+    """
+    for code, _, wing, cell, inmate in movements["entradas"]:
+        ws.append(["ENTRADA", code, inmate, None, None, wing, cell])
+    for code, _, wing, cell, inmate in movements["saidas"]:
+        ws.append(["SAÍDA", code, inmate, wing, cell, None, None])
+    for code, inmate, old_wing, old_cell, new_wing, new_cell in movements["mudancas"]:
+        ws.append(["MUDANÇA", code, inmate, old_wing, old_cell, new_wing, new_cell])
+
+
+def create_excel_report(data, output_dir=None, movements=None, metrics=None, report_date=None, overwrite=True):
     """
     Cria um relatório Excel para os dados fornecidos e salva no caminho especificado.
 
@@ -333,50 +327,93 @@ def create_excel_report(data):
     ----------
     data : dict
         Dicionário contendo os dados das unidades.
+    output_dir : str, optional
+        Pasta onde o relatório é salvo sem perguntar ao usuário. Se não informada, abre a caixa de
+        diálogo para escolher o arquivo.
+    movements : dict, optional
+        Movimentações por unidade desde o plantão anterior (`track_movements`), usadas para
+        preencher ENTRADAS, SAÍDAS e a aba de movimentações.
+    metrics : RunMetrics, optional
+        Onde registrar os tempos de cada etapa.
+    report_date : datetime, optional
+        Data da coleta, usada no nome do arquivo e no cabeçalho (data e plantão). Usa o momento atual se
+        não informada.
+    overwrite : bool
+        Se False, um arquivo já existente em `output_dir` com o mesmo nome não é substituído e o relatório
+        não é salvo.
 
+    Returns
+    -------
+    str or None
+        Caminho do arquivo salvo, ou None se o relatório não foi salvo.
     """
+    file_path = None
+    report_date = report_date or datetime.now()
+    metrics = metrics or RunMetrics()
     logger.info("Iniciando criação do relatório Excel.")
 
     # Criar um novo workbook
     wb = Workbook()
+    units_config = load_units_config()
 
     try:
-        for unit_name, df_list in data.items():
+        for unit_name, unit_records in data.items():
             logger.debug(f"Processando unidade: {unit_name}")
-            # Converter os dados da unidade em um DataFrame
-            if df_list:
-                df = pd.DataFrame(df_list)
-
-                # Gerar as abas de controle e SEI
-                control_ws = generate_unit_control_sheet(wb, unit_name)
-                sei_ws = generate_unit_sei_sheet(wb, unit_name)
+            if unit_records:
+                # Gerar as abas de controle e SEI a partir dos modelos em cache (ver data/template_store.py)
+                with metrics.phase('generate_sheets', unit_name):
+                    control_ws = create_unit_sheet(wb, unit_name, "CONTROLE", report_date)
+                    sei_ws = create_unit_sheet(wb, unit_name, "SEI", report_date)
 
                 # Realizar cálculos nos dados
-                calculated_data = calculate_data(df)
+                with metrics.phase('calculate_data', unit_name):
+                    occupancy = count_occupancy(unit_records, units_config.get(unit_name))
+                calculated_data = occupancy["celas"]
                 logger.debug(f"Dados calculados: {calculated_data}")
+                logger.info(f"Ocupação de {unit_name}: {occupancy['total']} presos; por bloco: {occupancy['blocos']}")
 
                 # Preencher as abas de controle e SEI
-                fill_control_sheet(control_ws, calculated_data)
-                fill_sei_sheet(sei_ws, control_ws)
+                with metrics.phase('fill_sheets', unit_name):
+                    fill_control_sheet(control_ws, calculated_data)
+                    fill_sei_sheet(sei_ws, control_ws)
+
+                # Entradas e saídas desde o plantão anterior
+                if movements and unit_name in movements:
+                    with metrics.phase('fill_movements', unit_name):
+                        fill_movement_rows(control_ws, movements[unit_name])
+                        fill_movement_sheet(generate_unit_movement_sheet(wb, unit_name), movements[unit_name])
 
         # Remover a aba padrão "Sheet"
         if "Sheet" in wb.sheetnames:
             wb.remove(wb["Sheet"])
 
             # Gerar nome do arquivo baseado no plantão e data
-            shift_name = get_shift_name()
-            current_date = datetime.now().strftime('%d-%m-%Y')
+            shift_name = get_shift_name(report_date)
+            current_date = report_date.strftime('%d-%m-%Y')
             default_filename = f"Contagem-{shift_name}-{current_date}.xlsx"
 
-            # Abrir a caixa de diálogo para o usuário escolher onde salvar o arquivo
-            file_path = filedialog.asksaveasfilename(defaultextension=".xlsx", initialfile=default_filename,
-                                                     filetypes=[("Excel files", "*.xlsx")])
+            if output_dir:
+                os.makedirs(output_dir, exist_ok=True)
+                file_path = os.path.join(output_dir, default_filename)
+                if not overwrite and os.path.exists(file_path):
+                    logger.error(f"O relatório {file_path} já existe e não será substituído.")
+                    return None
+            else:
+                from tkinter import filedialog
+
+                # Abrir a caixa de diálogo para o usuário escolher onde salvar o arquivo
+                file_path = filedialog.asksaveasfilename(defaultextension=".xlsx", initialfile=default_filename,
+                                                         filetypes=[("Excel files", "*.xlsx")])
 
             if file_path:
-                wb.save(file_path)
+                with metrics.phase('save'):
+                    wb.save(file_path)
                 logger.info(f"Relatório salvo com sucesso em: {file_path}")
             else:
                 logger.warning("Salvamento cancelado pelo usuário.")
     except Exception as e:
         Logger.capture_error(e)
         logger.error(f"Erro ao criar o relatório Excel: {str(e)}")
+        file_path = None
+
+    return file_path or None
@@ -0,0 +1,182 @@
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from benchmarks.mock_canaime import SESSION_COOKIE, MockOptions, start_mock_server
+from benchmarks.synthetic import generate_inmates, load_units_config
+from data.capture_store import capture_path, iter_capture_chunks, list_captures, load_capture_meta
+from data.data_processor import UnitProcessor
+from data.roll_call_parser import iter_roll_call_records
+from services.http_service import CanaimeHttpSession, execute_http_task
+from tests.test_roll_call_parser import EXPECTED_RECORDS, read_fixture_bytes
+from utils.metrics import RunMetrics
+from utils.profiler import PipelineProfiler
+
+UNIT = "PAMC"
+INMATES = 300
+LOGIN = "usuario"
+PASSWORD = "senha"
+
+
+@pytest.fixture
+def mock_server(monkeypatch):
+    """Inicia o servidor simulado com as opções informadas e aponta a aplicação para ele."""
+    servers = []
+
+    def start(**options):
+        server = start_mock_server(MockOptions(inmates=INMATES, login=LOGIN, password=PASSWORD, **options))
+        servers.append(server)
+        monkeypatch.setenv('CANAIME_BASE_URL', server.base_url)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def expected_records():
+    """Registros que a coleta deve produzir para a unidade, gerados pela mesma semente do servidor."""
+    inmates = generate_inmates(INMATES, load_units_config()[UNIT])
+    return list(UnitProcessor(None).iter_mapped_records(UNIT, inmates))
+
+
+def session_state(server):
+    """Sessão autenticada no servidor, no formato `storage_state` recebido da tela de login."""
+    http_session = CanaimeHttpSession(login=LOGIN, password=PASSWORD)
+    try:
+        http_session.perform_login()
+        token = http_session.session.cookies[SESSION_COOKIE]
+    finally:
+        http_session.close()
+    return {"cookies": [{"name": SESSION_COOKIE, "value": token, "domain": "127.0.0.1", "path": "/"}]}
+
+
+def kinds(server):
+    return [kind for kind, *_ in server.stats]
+
+
+def test_coleta_completa(mock_server):
+    server = mock_server()
+
+    data = execute_http_task(LOGIN, PASSWORD, [UNIT])
+
+    assert data == {UNIT: expected_records()}
+    assert kinds(server).count('login_post') == 1
+    assert kinds(server).count('roll_call') == 1
+
+
+def test_coleta_reaproveita_sessao_da_tela_de_login(mock_server):
+    server = mock_server()
+    state = session_state(server)
+
+    data = execute_http_task(LOGIN, PASSWORD, [UNIT], session_state=state)
+
+    assert data == {UNIT: expected_records()}
+    assert kinds(server).count('login_post') == 1  # Apenas o login da tela de login
+
+
+def test_sessao_expirada_por_tempo_refaz_o_login(mock_server):
+    server = mock_server(session_ttl=0.2)
+    state = session_state(server)
+    time.sleep(0.3)
+
+    data = execute_http_task(LOGIN, PASSWORD, [UNIT], session_state=state)
+
+    assert data == {UNIT: expected_records()}
+    assert kinds(server).count('expired') == 1
+    assert kinds(server).count('login_post') == 2
+
+
+def test_sessao_expirada_por_requisicoes_refaz_o_login(mock_server):
+    server = mock_server(session_requests=1)
+    state = session_state(server)
+    assert execute_http_task(LOGIN, PASSWORD, [UNIT], session_state=state) == {UNIT: expected_records()}
+
+    # A mesma sessão já serviu a sua única página de chamada
+    data = execute_http_task(LOGIN, PASSWORD, [UNIT], session_state=state)
+
+    assert data == {UNIT: expected_records()}
+    assert kinds(server).count('expired') == 1
+    assert kinds(server).count('login_post') == 2
+
+
+def test_credenciais_recusadas(mock_server):
+    server = mock_server()
+
+    assert execute_http_task(LOGIN, 'errada', [UNIT]) == {}
+    assert 'roll_call' not in kinds(server)
+
+
+def test_pagina_truncada_descarta_a_unidade(mock_server, tmp_path):
+    server = mock_server(truncate_rate=1.0)
+
+    data = execute_http_task(LOGIN, PASSWORD, [UNIT], capture_dir=str(tmp_path))
+
+    assert data == {}
+    assert kinds(server).count('truncated') == 1
+    # Nenhuma captura parcial é publicada para o replay
+    assert list_captures(str(tmp_path)) == []
+    assert not os.path.exists(capture_path(str(tmp_path), UNIT))
+
+
+def test_captura_da_coleta_completa(mock_server, tmp_path):
+    mock_server()
+
+    data = execute_http_task(LOGIN, PASSWORD, [UNIT], capture_dir=str(tmp_path))
+
+    assert data == {UNIT: expected_records()}
+    assert [unit for unit, _ in list_captures(str(tmp_path))] == [UNIT]
+    assert load_capture_meta(str(tmp_path), UNIT)["engine"] == 'http'
+
+
+def test_perfil_cobre_a_coleta_das_unidades(mock_server, tmp_path):
+    mock_server()
+    profiler = PipelineProfiler('http', output_dir=str(tmp_path)).start()
+    try:
+        data = execute_http_task(LOGIN, PASSWORD, [UNIT], workers=4, metrics=RunMetrics('http', profiler=profiler))
+    finally:
+        profiler.stop()
+
+    assert data == {UNIT: expected_records()}
+    assert (tmp_path / 'download_parse_map.prof').exists()
+    assert profiler.unprofiled == {}
+
+
+class MetaCharsetHandler(BaseHTTPRequestHandler):
+    """Serve a página `server.fixture` com `Content-Type: text/html`, sem charset no cabeçalho."""
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        body = read_fixture_bytes(self.server.fixture)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.mark.parametrize('fixture', ['roll_call.html', 'roll_call_latin1.html'])
+def test_codificacao_declarada_apenas_no_meta(monkeypatch, tmp_path, fixture):
+    # Sem charset no cabeçalho, o `requests` decodificaria a página UTF-8 como ISO-8859-1
+    server = ThreadingHTTPServer(('127.0.0.1', 0), MetaCharsetHandler)
+    server.fixture = fixture
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv('CANAIME_BASE_URL', f"http://127.0.0.1:{server.server_address[1]}")
+    http_session = CanaimeHttpSession()
+    try:
+        records = list(http_session.iter_roll_call_records(UNIT, capture_dir=str(tmp_path)))
+    finally:
+        http_session.close()
+        server.shutdown()
+        server.server_close()
+
+    assert records == EXPECTED_RECORDS
+    # A captura guarda o texto já decodificado corretamente
+    assert list(iter_roll_call_records(iter_capture_chunks(capture_path(str(tmp_path), UNIT)))) == EXPECTED_RECORDS
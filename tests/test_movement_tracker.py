@@ -0,0 +1,106 @@
+from datetime import datetime
+
+import pytest
+
+from data.movement_tracker import build_snapshot, diff_snapshots, shift_start, track_movements
+from data.snapshot_store import SnapshotStore
+
+
+def record(code, wing, cell, name=None, block="BLOCO 1"):
+    return {"Código": code, "Bloco": block, "Ala": wing, "Cela": cell, "Preso": name or f"PRESO {code}"}
+
+
+@pytest.fixture
+def store(tmp_path):
+    with SnapshotStore(str(tmp_path / 'snapshots.db')) as snapshot_store:
+        yield snapshot_store
+
+
+def test_diff_snapshots_entradas_saidas_mudancas():
+    previous = build_snapshot([record("1", "A", "101"), record("2", "A", "102"), record("3", "B", "201")])
+    current = build_snapshot([record("1", "A", "101"), record("3", "C", "301"), record("4", "A", "102")])
+
+    movements = diff_snapshots(previous, current)
+
+    assert movements["entradas"] == [("4", "BLOCO 1", "A", "102", "PRESO 4")]
+    assert movements["saidas"] == [("2", "BLOCO 1", "A", "102", "PRESO 2")]
+    assert movements["mudancas"] == [("3", "PRESO 3", "B", "201", "C", "301")]
+
+
+def test_diff_snapshots_sem_alteracoes():
+    snapshot = build_snapshot([record("1", "A", "101"), record("2", "B", "201")])
+
+    assert diff_snapshots(snapshot, dict(snapshot)) == {"entradas": [], "saidas": [], "mudancas": []}
+
+
+def test_diff_snapshots_mudanca_de_cela_na_mesma_ala():
+    movements = diff_snapshots(build_snapshot([record("1", "A", "101")]), build_snapshot([record("1", "A", "102")]))
+
+    assert movements["mudancas"] == [("1", "PRESO 1", "A", "101", "A", "102")]
+    assert movements["entradas"] == movements["saidas"] == []
+
+
+def test_shift_start():
+    assert shift_start(datetime(2024, 10, 15, 19, 30), "07:00") == datetime(2024, 10, 15, 7)
+    assert shift_start(datetime(2024, 10, 15, 7), "07:00") == datetime(2024, 10, 15, 7)
+
+
+def test_shift_start_antes_da_troca_de_plantao():
+    # Às 3h o plantão ainda é o que começou às 7h do dia anterior
+    assert shift_start(datetime(2024, 10, 15, 3), "07:00") == datetime(2024, 10, 14, 7)
+
+
+def test_track_movements_sem_plantao_anterior(store):
+    store.save_run({"PAMC": [record("1", "A", "101")]}, datetime(2024, 10, 15, 7))
+
+    assert track_movements({"PAMC": [record("1", "A", "101")]}, datetime(2024, 10, 15, 8), store) == {}
+
+
+def test_track_movements_mesmo_plantao_usa_a_mesma_referencia(store):
+    store.save_run({"PAMC": [record("1", "A", "101"), record("2", "A", "101")]}, datetime(2024, 10, 14, 7))
+
+    first = [record("1", "A", "101"), record("3", "A", "102")]
+    store.save_run({"PAMC": first}, datetime(2024, 10, 15, 7))
+    first_movements = track_movements({"PAMC": first}, datetime(2024, 10, 15, 7), store)
+
+    # Segunda coleta no mesmo plantão: continua comparando com o plantão anterior, e não com a coleta das 7h
+    second = [record("1", "A", "101"), record("3", "A", "102"), record("4", "B", "201")]
+    store.save_run({"PAMC": second}, datetime(2024, 10, 15, 19))
+    second_movements = track_movements({"PAMC": second}, datetime(2024, 10, 15, 19), store)
+
+    assert [entry[0] for entry in first_movements["PAMC"]["entradas"]] == ["3"]
+    assert [entry[0] for entry in second_movements["PAMC"]["entradas"]] == ["3", "4"]
+    assert [entry[0] for entry in second_movements["PAMC"]["saidas"]] == ["2"]
+
+
+def test_track_movements_ignora_unidade_vazia_e_coleta_sem_a_unidade(store):
+    store.save_run({"PAMC": [record("1", "A", "101")]}, datetime(2024, 10, 13, 7))
+    store.save_run({"PAMC": []}, datetime(2024, 10, 14, 7))  # Coleta que falhou: sem registros da unidade
+
+    movements = track_movements({"PAMC": [record("2", "A", "101")], "CPBV": []}, datetime(2024, 10, 15, 7), store)
+
+    assert list(movements) == ["PAMC"]
+    assert [entry[0] for entry in movements["PAMC"]["saidas"]] == ["1"]
+
+
+def test_track_movements_antes_da_troca_de_plantao(store):
+    store.save_run({"PAMC": [record("1", "A", "101")]}, datetime(2024, 10, 14, 6))  # Plantão anterior
+    store.save_run({"PAMC": [record("1", "A", "101"), record("2", "A", "101")]}, datetime(2024, 10, 14, 20))
+
+    # Às 3h, ainda no plantão iniciado às 7h de 14/10: a referência é a coleta das 6h, e não a das 20h
+    movements = track_movements({"PAMC": [record("2", "A", "101"), record("3", "B", "201")]},
+                                datetime(2024, 10, 15, 3), store, shift_change_time="07:00")
+
+    assert [entry[0] for entry in movements["PAMC"]["entradas"]] == ["2", "3"]
+    assert [entry[0] for entry in movements["PAMC"]["saidas"]] == ["1"]
+
+
+def test_track_movements_depois_da_troca_de_plantao(store):
+    store.save_run({"PAMC": [record("1", "A", "101")]}, datetime(2024, 10, 14, 8))  # Plantão anterior
+    store.save_run({"PAMC": [record("1", "A", "101"), record("2", "A", "101")]}, datetime(2024, 10, 15, 6))
+
+    # Às 9h o plantão começou às 7h: a referência é a coleta das 6h, a última do plantão anterior
+    movements = track_movements({"PAMC": [record("1", "A", "101"), record("2", "A", "101")]},
+                                datetime(2024, 10, 15, 9), store, shift_change_time="07:00")
+
+    assert movements["PAMC"] == {"entradas": [], "saidas": [], "mudancas": []}
@@ -0,0 +1,119 @@
+import asyncio
+
+import pytest
+
+from data.data_processor import AsyncUnitProcessor, SessionExpiredError
+from services import playwright_service
+
+UNIT = "PAMC"
+
+
+class FakePage:
+    """Página assíncrona mínima: o suficiente para abrir e fechar uma página por unidade."""
+
+    def __init__(self):
+        self.context = self
+
+    async def new_page(self):
+        return FakePage()
+
+    async def close(self):
+        pass
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeLogin:
+    """Substitui `AsyncCanaimeLogin`: registra os logins sem abrir o navegador."""
+    instances = []
+
+    def __init__(self, p, headless=True, login='', password='', storage_state=None, network=None):
+        self.storage_state = storage_state
+        self.restored_session = False
+        self.logins = 0
+        self.browser = FakeBrowser()
+        FakeLogin.instances.append(self)
+
+    async def perform_login(self):
+        if self.storage_state:
+            self.restored_session = True
+        else:
+            await self.login_with_credentials()
+        return FakePage(), self.browser
+
+    async def login_with_credentials(self):
+        self.restored_session = False
+        self.logins += 1
+
+
+class FakePlaywright:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+@pytest.fixture
+def fake_browser(monkeypatch):
+    FakeLogin.instances = []
+    monkeypatch.setattr(playwright_service, 'async_playwright', FakePlaywright)
+    monkeypatch.setattr(playwright_service, 'AsyncCanaimeLogin', FakeLogin)
+    return FakeLogin.instances
+
+
+def patch_units(monkeypatch, valid_session):
+    """Faz `create_unit_list` recusar a sessão enquanto `valid_session()` for falso."""
+
+    async def create_unit_list(self, unit, page=None):
+        if not valid_session():
+            raise SessionExpiredError("A sessão do Canaimé foi recusada ou expirou.")
+        return {unit: [{"Código": "1"}]}
+
+    monkeypatch.setattr(AsyncUnitProcessor, 'create_unit_list', create_unit_list)
+
+
+def test_collect_units_repassa_sessao_expirada(monkeypatch):
+    patch_units(monkeypatch, lambda: False)
+    unit_processor = AsyncUnitProcessor(FakePage())
+
+    with pytest.raises(SessionExpiredError):
+        asyncio.run(unit_processor.collect_units([UNIT, UNIT], workers=2))
+
+
+def test_collect_units_registra_outros_erros_e_continua(monkeypatch):
+    async def create_unit_list(self, unit, page=None):
+        if unit == "FALHA":
+            raise RuntimeError("página inválida")
+        return {unit: []}
+
+    monkeypatch.setattr(AsyncUnitProcessor, 'create_unit_list', create_unit_list)
+
+    assert asyncio.run(AsyncUnitProcessor(FakePage()).collect_units(["FALHA", UNIT])) == {UNIT: []}
+
+
+def test_sessao_da_tela_de_login_recusada_refaz_o_login(monkeypatch, fake_browser):
+    patch_units(monkeypatch, lambda: fake_browser[0].logins > 0)
+
+    data = asyncio.run(playwright_service.execute_playwright_task_async(
+        True, 'usuario', 'senha', [UNIT], session_state={"cookies": [{"name": "PHPSESSID", "value": "x"}]}))
+
+    assert data == {UNIT: [{"Código": "1"}]}
+    assert fake_browser[0].logins == 1
+    assert fake_browser[0].browser.closed
+
+
+def test_sessao_recusada_apos_login_novo_nao_repete_o_login(monkeypatch, fake_browser):
+    patch_units(monkeypatch, lambda: False)
+
+    data = asyncio.run(playwright_service.execute_playwright_task_async(True, 'usuario', 'senha', [UNIT]))
+
+    assert data == {}
+    assert fake_browser[0].logins == 1
+    assert fake_browser[0].browser.closed
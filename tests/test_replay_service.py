@@ -0,0 +1,44 @@
+import sys
+
+import pytest
+
+from benchmarks.synthetic import generate_inmates, generate_roll_call_html, load_units_config
+from data.capture_store import load_capture_meta, save_capture, tee_capture
+from data.data_processor import UnitProcessor
+from services.replay_service import replay_units
+
+UNIT = "PAMC"
+
+
+@pytest.fixture(scope='module')
+def inmates():
+    return generate_inmates(200, load_units_config()[UNIT])
+
+
+def expected_records(inmates):
+    return list(UnitProcessor(None).iter_mapped_records(UNIT, inmates))
+
+
+def test_replay_de_captura_do_playwright(tmp_path, inmates, monkeypatch):
+    # Sem navegador: qualquer importação do Playwright durante o replay falha
+    for module in ('playwright', 'playwright.sync_api', 'playwright.async_api'):
+        monkeypatch.setitem(sys.modules, module, None)
+    save_capture(str(tmp_path), UNIT, generate_roll_call_html(inmates), engine='playwright')
+    assert load_capture_meta(str(tmp_path), UNIT)["engine"] == 'playwright'
+
+    assert replay_units(str(tmp_path)) == {UNIT: expected_records(inmates)}
+
+
+def test_replay_de_captura_http(tmp_path, inmates):
+    data = generate_roll_call_html(inmates).encode('utf-8')
+    chunks = [data[start:start + 1000] for start in range(0, len(data), 1000)]
+    for _ in tee_capture(str(tmp_path), UNIT, chunks, engine='http'):
+        pass
+
+    assert replay_units(str(tmp_path)) == {UNIT: expected_records(inmates)}
+
+
+def test_replay_ignora_unidade_fora_da_configuracao(tmp_path, inmates):
+    save_capture(str(tmp_path), "INEXISTENTE", generate_roll_call_html(inmates), engine='playwright')
+
+    assert replay_units(str(tmp_path)) == {}
@@ -0,0 +1,122 @@
+import os
+
+import pytest
+
+from data.roll_call_parser import (RollCallParser, detect_encoding, iter_roll_call_records, parse_entry,
+                                   parse_roll_call)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+EXPECTED_RECORDS = [
+    ("123456", "A", "101", "JOSÉ DA SILVA & SOUZA"),
+    ("234567", "TRIAGEM", "1", "JOÃO PEREIRA"),
+    ("345678", "B/2", "203", "ANTÔNIO <ZÉ> LIMA"),
+]
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), 'r', encoding='utf-8') as file:
+        return file.read()
+
+
+@pytest.fixture(scope='module')
+def roll_call_html():
+    return read_fixture('roll_call.html')
+
+
+def test_parse_roll_call(roll_call_html):
+    records = [parse_entry(entry_text, inmate_text) for entry_text, inmate_text in parse_roll_call(roll_call_html)]
+
+    assert records == EXPECTED_RECORDS
+
+
+def test_parse_roll_call_texto_da_entrada(roll_call_html):
+    entry_text, inmate_text = parse_roll_call(roll_call_html)[0]
+
+    # Mesmo texto que o text_content() do Playwright: entidades convertidas e o nome incluído na entrada
+    assert inmate_text == "JOSÉ DA SILVA & SOUZA"
+    assert entry_text.split('\n')[2] == "MÃE: MARIA DA CONCEIÇÃO"
+
+
+def test_iter_roll_call_records_documento_inteiro(roll_call_html):
+    assert list(iter_roll_call_records([roll_call_html])) == EXPECTED_RECORDS
+
+
+def test_iter_roll_call_records_divisao_em_qualquer_byte(roll_call_html):
+    # Cobre divisões dentro de entidades (&Eacute;, &#xC7;), de tags, de atributos de classe e de caracteres
+    # UTF-8 de vários bytes
+    data = roll_call_html.encode('utf-8')
+    for split in range(1, len(data)):
+        records = list(iter_roll_call_records([data[:split], data[split:]]))
+        assert records == EXPECTED_RECORDS, f"divisão no byte {split}: {data[split - 5:split + 5]!r}"
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 7, 64])
+def test_iter_roll_call_records_pedacos_pequenos(roll_call_html, chunk_size):
+    chunks = [roll_call_html[start:start + chunk_size] for start in range(0, len(roll_call_html), chunk_size)]
+
+    assert list(iter_roll_call_records(chunks)) == EXPECTED_RECORDS
+
+
+def test_iter_roll_call_records_latin1():
+    html = read_fixture('roll_call.html').replace('charset="utf-8"', 'charset="iso-8859-1"')
+    data = html.encode('latin-1')
+    chunks = [data[start:start + 5] for start in range(0, len(data), 5)]
+
+    assert list(iter_roll_call_records(chunks, encoding='latin-1')) == EXPECTED_RECORDS
+
+
+def read_fixture_bytes(name):
+    with open(os.path.join(FIXTURES_DIR, name), 'rb') as file:
+        return file.read()
+
+
+@pytest.mark.parametrize('chunk_size', [7, 64 * 1024])
+def test_detect_encoding_pelo_meta(chunk_size):
+    # A codificação só aparece na tag <meta http-equiv>, e não no cabeçalho da resposta
+    data = read_fixture_bytes('roll_call_latin1.html')
+    chunks = [data[start:start + chunk_size] for start in range(0, len(data), chunk_size)]
+
+    encoding, chunks = detect_encoding(chunks)
+
+    assert encoding == 'cp1252'
+    assert list(iter_roll_call_records(chunks, encoding=encoding)) == EXPECTED_RECORDS
+
+
+def test_detect_encoding_cabecalho_tem_precedencia():
+    encoding, chunks = detect_encoding([read_fixture_bytes('roll_call.html')], declared='UTF-8')
+
+    assert encoding == 'utf-8'
+    assert list(iter_roll_call_records(chunks, encoding=encoding)) == EXPECTED_RECORDS
+
+
+@pytest.mark.parametrize('data', [b'<html><body>sem meta</body></html>', b'<meta charset="inexistente">', b''])
+def test_detect_encoding_padrao(data):
+    encoding, chunks = detect_encoding([data])
+
+    assert encoding == 'utf-8'
+    assert b''.join(chunks) == data
+
+
+def test_entrada_sem_fechamento_e_encerrada_pela_seguinte():
+    html = ('<div class="titulobkSingCAPS">ID111111\n<span class="titulo12bk">PRIMEIRO</span>\nMÃE: A\n'
+            'REGIME: FECHADO\nALA: A / 101\n'
+            '<div class="titulobkSingCAPS">ID222222\n<span class="titulo12bk">SEGUNDO</span>\nMÃE: B\n'
+            'REGIME: FECHADO\nALA: B / 201</div>')
+
+    assert list(iter_roll_call_records([html])) == [("111111", "A", "101", "PRIMEIRO"),
+                                                    ("222222", "B", "201", "SEGUNDO")]
+
+
+def test_formulario_de_login():
+    parser = RollCallParser()
+
+    assert list(iter_roll_call_records([read_fixture('login.html')], parser=parser)) == []
+    assert parser.login_form_found
+
+
+def test_pagina_de_chamada_nao_e_formulario_de_login(roll_call_html):
+    parser = RollCallParser()
+    list(iter_roll_call_records([roll_call_html], parser=parser))
+
+    assert not parser.login_form_found
@@ -0,0 +1,56 @@
+import pickle
+from copy import copy
+
+import openpyxl
+import pytest
+from openpyxl import Workbook
+
+from data import template_store
+from data.template_store import TEMPLATE_BUILDERS, config_hash, create_unit_sheet, load_template, template_path
+
+UNIT = "PAMC"
+
+
+@pytest.fixture(autouse=True)
+def template_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(template_store, 'TEMPLATE_DIR', str(tmp_path))
+    monkeypatch.setattr(template_store, '_memory_cache', {})
+    return tmp_path
+
+
+def sheet_contents(sheet):
+    """Valores, estilo nomeado e componentes de formatação de cada célula, mesclagens e larguras."""
+    cells = {(cell.row, cell.column): (cell.value, cell.style, copy(cell.font), copy(cell.fill), copy(cell.border),
+                                       copy(cell.alignment), cell.number_format)
+             for row in sheet.iter_rows() for cell in row}
+    widths = {letter: dimension.width for letter, dimension in sheet.column_dimensions.items()}
+    return cells, sorted(str(merged) for merged in sheet.merged_cells.ranges), widths
+
+
+@pytest.mark.parametrize('kind', list(TEMPLATE_BUILDERS))
+def test_aba_do_modelo_igual_a_aba_gerada(kind):
+    generated = TEMPLATE_BUILDERS[kind](Workbook(), UNIT)
+    load_template(UNIT, kind)
+    template_store._memory_cache.clear()  # A aba é copiada do modelo lido do disco
+
+    assert sheet_contents(create_unit_sheet(Workbook(), UNIT, kind)) == sheet_contents(generated)
+
+
+def test_hash_inclui_a_versao_do_openpyxl(monkeypatch):
+    current = config_hash()
+    monkeypatch.setattr(openpyxl, '__version__', '0.0.0')
+
+    assert config_hash() != current
+
+
+@pytest.mark.parametrize('content', [b'lixo', b'', pickle.dumps(['formato', 'antigo']), pickle.dumps({"cells": []})])
+def test_modelo_ilegivel_e_gerado_novamente(content):
+    path = template_path(UNIT, "SEI", config_hash())
+    with open(path, 'wb') as file:
+        file.write(content)
+
+    template = load_template(UNIT, "SEI")
+
+    assert template == template_store.build_template(UNIT, "SEI")
+    with open(path, 'rb') as file:
+        assert pickle.load(file) == template  # O arquivo inválido foi substituído
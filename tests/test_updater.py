@@ -0,0 +1,182 @@
+import hashlib
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils import updater
+
+VERSION = "9.9.9"
+EXECUTABLE = f"canaime-preso-por-ala-{VERSION}.exe"
+PAYLOAD = os.urandom(3 * updater.DOWNLOAD_CHUNK_SIZE + 12345)
+
+
+class UpdateServer(ThreadingHTTPServer):
+    """Pasta de atualização simulada: executável com suporte a Range e o seu `.sha256`."""
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), UpdateHandler)
+        self.payload = PAYLOAD
+        self.digest_text = f"{hashlib.sha256(PAYLOAD).hexdigest()}  {EXECUTABLE}\n"
+        self.drops = 0  # Próximas respostas do executável interrompidas na metade
+        self.accept_ranges = True
+        self.requests = []  # (caminho, cabeçalho Range) de cada requisição
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/releases/"
+
+    def executable_requests(self):
+        return [range_header for path, range_header in self.requests if path.endswith('.exe')]
+
+
+class UpdateHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, status, body, headers=None, drop=False):
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if drop:
+            self.send_header('Connection', 'close')
+            self.close_connection = True
+        self.end_headers()
+        self.wfile.write(body[:len(body) // 2] if drop else body)
+
+    def do_GET(self):
+        server = self.server
+        range_header = self.headers.get('Range')
+        server.requests.append((self.path, range_header))
+
+        if self.path == f"/releases/{EXECUTABLE}{updater.DIGEST_SUFFIX}":
+            self.send_body(200, server.digest_text.encode('utf-8'))
+            return
+        if self.path != f"/releases/{EXECUTABLE}":
+            self.send_body(404, b'Not Found')
+            return
+
+        drop = server.drops > 0
+        server.drops -= drop
+        size = len(server.payload)
+        if range_header and server.accept_ranges:
+            start = int(range_header[len('bytes='):].split('-')[0])
+            if start >= size:
+                self.send_body(416, b'', {'Content-Range': f'bytes */{size}'})
+                return
+            self.send_body(206, server.payload[start:], {'Content-Range': f'bytes {start}-{size - 1}/{size}'},
+                           drop=drop)
+        else:
+            self.send_body(200, server.payload, drop=drop)
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(updater, 'DOWNLOAD_RETRY_DELAY', 0)
+    monkeypatch.setattr(updater, 'DOWNLOAD_ATTEMPTS', 3)
+    update_server = UpdateServer()
+    threading.Thread(target=update_server.serve_forever, daemon=True).start()
+    yield update_server
+    update_server.shutdown()
+    update_server.server_close()
+
+
+@pytest.fixture
+def target(tmp_path):
+    return str(tmp_path / EXECUTABLE)
+
+
+def read(path):
+    with open(path, 'rb') as file:
+        return file.read()
+
+
+def write(path, data):
+    with open(path, 'wb') as file:
+        file.write(data)
+
+
+def download(server, target):
+    return updater.download_update(VERSION, target, base_url=server.base_url, progress=lambda *_: None)
+
+
+def test_download_completo(server, target):
+    assert download(server, target)
+
+    assert read(target) == PAYLOAD
+    assert not os.path.exists(f"{target}.part")
+    assert server.executable_requests() == [None]
+
+
+def test_download_retomado_com_range_apos_queda(server, target):
+    server.drops = 1
+
+    assert download(server, target)
+
+    assert read(target) == PAYLOAD
+    first, second = server.executable_requests()
+    assert first is None
+    offset = int(second[len('bytes='):].rstrip('-'))
+    assert 0 < offset < len(PAYLOAD)
+
+
+def test_download_retomado_de_execucao_anterior(server, target):
+    write(f"{target}.part", PAYLOAD[:1000])
+
+    assert download(server, target)
+
+    assert read(target) == PAYLOAD
+    assert server.executable_requests() == ['bytes=1000-']
+
+
+def test_arquivo_parcial_completo_recebe_416(server, target):
+    write(f"{target}.part", PAYLOAD)
+
+    assert download(server, target)
+
+    assert read(target) == PAYLOAD
+    assert server.executable_requests() == [f'bytes={len(PAYLOAD)}-']
+
+
+def test_arquivo_parcial_maior_que_o_publicado_recomeca(server, target):
+    write(f"{target}.part", PAYLOAD + b'lixo')
+
+    assert download(server, target)
+
+    assert read(target) == PAYLOAD
+    assert server.executable_requests() == [f'bytes={len(PAYLOAD) + 4}-', None]
+
+
+def test_servidor_sem_range_recomeca_do_zero(server, target):
+    server.accept_ranges = False
+    write(f"{target}.part", b'conteudo antigo')
+
+    assert download(server, target)
+
+    assert read(target) == PAYLOAD
+
+
+def test_checksum_divergente_descarta_o_download(server, target):
+    server.digest_text = hashlib.sha256(b'outro executavel').hexdigest()
+
+    assert not download(server, target)
+
+    assert not os.path.exists(target)
+    assert not os.path.exists(f"{target}.part")
+    assert len(server.executable_requests()) == updater.DOWNLOAD_ATTEMPTS
+
+
+@pytest.mark.parametrize('digest_text', ['', 'nao-e-um-checksum'])
+def test_sem_checksum_valido_nao_baixa(server, target, digest_text):
+    server.digest_text = digest_text
+
+    assert not download(server, target)
+
+    assert not os.path.exists(target)
+    assert server.executable_requests() == []
@@ -0,0 +1,158 @@
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from utils.logger import Logger
+from utils.resource_manager import get_data_dir
+
+# Métricas gravadas em data/processed (ao lado do executável, quando congelado), uma execução por linha (JSON Lines)
+METRICS_FILE = get_data_dir('app_metrics.jsonl')
+
+
+def peak_rss():
+    """
+    Retorna o pico de memória residente do processo atual, em bytes (None se não for possível medir).
+    """
+    try:
+        if sys.platform == 'win32':
+            import ctypes
+            from ctypes import wintypes
+
+            class ProcessMemoryCounters(ctypes.Structure):
+                _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                            ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                            ("QuotaNonPagedPoolUsage", ctypes.c_size_t), ("PagefileUsage", ctypes.c_size_t),
+                            ("PeakPagefileUsage", ctypes.c_size_t)]
+
+            counters = ProcessMemoryCounters()
+            counters.cb = ctypes.sizeof(counters)
+            get_memory_info = ctypes.windll.psapi.GetProcessMemoryInfo
+            get_memory_info.argtypes = [wintypes.HANDLE, ctypes.POINTER(ProcessMemoryCounters), wintypes.DWORD]
+            if get_memory_info(ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+                return counters.PeakWorkingSetSize
+            return None
+
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux informa em KiB; macOS, em bytes
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except Exception:
+        return None
+
+
+class RunMetrics:
+    """
+    Tempos por etapa (e por unidade) de uma execução, com a quantidade de registros e o pico de memória.
+
+    Uso:
+        metrics = RunMetrics('coleta')
+        with metrics.phase('login'):
+            ...
+        with metrics.phase('extract', unit='PAMC'):
+            ...
+        metrics.set_records('PAMC', 1234)
+        metrics.save()
+    """
+
+    def __init__(self, name='run', profiler=None):
+        self.name = name
+        self.profiler = profiler  # PipelineProfiler opcional: cada etapa também ganha seu perfil de CPU e memória
+        self.started_at = datetime.now()
+        self._start = time.perf_counter()
+        self.phases = []  # Lista de dicionários {"phase", "unit", "seconds"}
+        self.records = {}  # Registros coletados por unidade
+        self.sections = {}  # Dados adicionais da execução (por exemplo, o resumo da rede)
+
+    @contextmanager
+    def phase(self, name, unit=None):
+        """Mede o tempo do bloco `with` como a etapa `name` (da unidade `unit`, se informada)."""
+        start = time.perf_counter()
+        try:
+            if self.profiler:
+                with self.profiler.phase(name):
+                    yield
+            else:
+                yield
+        finally:
+            self.add(name, time.perf_counter() - start, unit)
+
+    def add(self, name, seconds, unit=None):
+        """Registra o tempo de uma etapa medida externamente."""
+        self.phases.append({"phase": name, "unit": unit, "seconds": round(seconds, 6)})
+
+    def set_records(self, unit, count):
+        self.records[unit] = count
+
+    def add_section(self, name, data):
+        """Anexa às métricas um bloco de dados adicional, gravado com a chave `name`."""
+        self.sections[name] = data
+
+    def totals(self):
+        """Retorna o tempo total de cada etapa, somando todas as unidades."""
+        totals = {}
+        for entry in self.phases:
+            totals[entry["phase"]] = totals.get(entry["phase"], 0.0) + entry["seconds"]
+        return totals
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "started_at": self.started_at.isoformat(timespec='seconds'),
+            "elapsed_seconds": round(time.perf_counter() - self._start, 6),
+            "peak_rss_bytes": peak_rss(),
+            "records": dict(self.records),
+            "totals": {phase: round(seconds, 6) for phase, seconds in self.totals().items()},
+            "phases": list(self.phases),
+            **self.sections,
+        }
+
+    def summary(self):
+        """Resumo de uma linha para o log, com as etapas da mais lenta para a mais rápida."""
+        data = self.to_dict()
+        phases = ', '.join(f"{phase}={seconds:.2f}s" for phase, seconds in
+                           sorted(data["totals"].items(), key=lambda item: item[1], reverse=True))
+        peak = data["peak_rss_bytes"]
+        memory = f"{peak / (1024 * 1024):.0f} MiB" if peak else "n/d"
+        return (f"Métricas de {self.name}: {data['elapsed_seconds']:.2f}s no total, "
+                f"{sum(self.records.values())} registros, pico de memória {memory}. Etapas: {phases}")
+
+    def save(self, path=METRICS_FILE):
+        """
+        Acrescenta as métricas da execução ao arquivo de métricas.
+
+        Returns
+        -------
+        dict
+            Métricas gravadas.
+        """
+        data = self.to_dict()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as file:
+            file.write(json.dumps(data, ensure_ascii=False) + '\n')
+        return data
+
+
+def save_metrics(metrics):
+    """
+    Grava as métricas da execução e registra o resumo no log, sem interromper o encerramento.
+
+    Se a execução estava sendo perfilada, o perfil também é encerrado e gravado.
+    """
+    logger = Logger.get_logger()
+    try:
+        metrics.save()
+        logger.info(metrics.summary())
+    except Exception as e:
+        logger.error(f"Erro ao gravar as métricas: {str(e)}")
+
+    if metrics.profiler:
+        try:
+            logger.info(f"Perfil de {metrics.name} salvo em {metrics.profiler.stop()}")
+        except Exception as e:
+            logger.error(f"Erro ao gravar o perfil: {str(e)}")
@@ -0,0 +1,172 @@
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+from utils.resource_manager import get_data_dir
+
+# Ativado por `--profile` na linha de comando; a variável de ambiente é herdada pelo processo de trabalho
+PROFILE_ENV = 'CANAIME_PROFILE'
+PROFILE_DIR = get_data_dir('profiles')
+TOP_ALLOCATIONS = 30  # Linhas do relatório de alocações
+TOP_FUNCTIONS = 25  # Funções listadas por etapa no resumo
+TRACEMALLOC_FRAMES = 1  # O relatório agrupa por linha; mais quadros só deixariam a coleta mais lenta
+OTHER_PHASE = 'other'  # Tempo fora de qualquer etapa medida
+
+
+def enable_profiling():
+    os.environ[PROFILE_ENV] = '1'
+
+
+def profiling_enabled():
+    return os.environ.get(PROFILE_ENV) == '1'
+
+
+def start_profiler(name):
+    """Inicia o perfilador da execução `name` se o modo de perfil estiver ativo; senão, retorna None."""
+    return PipelineProfiler(name).start() if profiling_enabled() else None
+
+
+class PipelineProfiler:
+    """
+    Perfil de CPU (cProfile) e de memória (tracemalloc) de uma execução, separado por etapa.
+
+    Cada etapa tem seu próprio `cProfile.Profile`. Em etapas aninhadas, o perfil da etapa externa é
+    pausado enquanto a interna executa, de modo que cada função é contada em uma única etapa e a soma
+    dos arquivos corresponde à execução inteira. Apenas a thread que iniciou o perfilador é medida; por isso,
+    com o perfil ativo, os motores HTTP e assíncrono executam a leitura e o mapeamento nessa thread, em vez de
+    em um pool de threads. Uma etapa que ainda rode em outra thread aparece no início de `summary.txt` apenas
+    com a contagem e o tempo de relógio, sem perfil de CPU e memória.
+
+    Ao final são gravados, em `data/processed/profiles/<data>-<nome>-<pid>/`:
+    - `<etapa>.prof`: estatísticas da etapa (abrir com `python -m pstats` ou snakeviz);
+    - `total.prof`: todas as etapas somadas;
+    - `summary.txt`: funções mais custosas de cada etapa e pico de memória por etapa;
+    - `allocations.txt`: linhas com mais memória alocada ao final da execução.
+    """
+
+    def __init__(self, name, output_dir=None):
+        self.name = name
+        self.output_dir = output_dir or os.path.join(
+            PROFILE_DIR, f"{datetime.now():%Y%m%d-%H%M%S}-{name}-{os.getpid()}")
+        self.profiles = {}  # Etapa -> cProfile.Profile
+        self.memory_peaks = {}  # Etapa -> maior pico de memória rastreada, em bytes
+        self._stack = []  # Etapas ativas, da mais externa para a mais interna
+        self._thread = None
+        self.unprofiled = {}  # Etapa executada fora da thread do perfilador -> [vezes, segundos]
+        self._lock = threading.Lock()
+
+    def start(self):
+        self._thread = threading.get_ident()
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+        self._enter(OTHER_PHASE)
+        return self
+
+    def _profile(self, name):
+        if name not in self.profiles:
+            self.profiles[name] = cProfile.Profile()
+        return self.profiles[name]
+
+    def _record_peak(self, name):
+        peak = tracemalloc.get_traced_memory()[1]
+        self.memory_peaks[name] = max(self.memory_peaks.get(name, 0), peak)
+        tracemalloc.reset_peak()
+        return peak
+
+    def _enter(self, name):
+        if self._stack:
+            outer = self._stack[-1]
+            self.profiles[outer].disable()
+            self._record_peak(outer)
+        self._stack.append(name)
+        self._profile(name).enable()
+
+    def _exit(self):
+        name = self._stack.pop()
+        self.profiles[name].disable()
+        peak = self._record_peak(name)
+        if self._stack:
+            outer = self._stack[-1]
+            # O pico da etapa interna também é um pico da externa
+            self.memory_peaks[outer] = max(self.memory_peaks.get(outer, 0), peak)
+            self.profiles[outer].enable()
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Mede o bloco `with` como a etapa `name`.
+
+        Fora da thread do perfilador, registra apenas a contagem e o tempo da etapa, listados no resumo.
+        """
+        if not self._stack:
+            yield
+            return
+        if threading.get_ident() != self._thread:
+            start = time.perf_counter()
+            try:
+                yield
+            finally:
+                with self._lock:
+                    entry = self.unprofiled.setdefault(name, [0, 0.0])
+                    entry[0] += 1
+                    entry[1] += time.perf_counter() - start
+            return
+        self._enter(name)
+        try:
+            yield
+        finally:
+            self._exit()
+
+    def stop(self):
+        """
+        Encerra o perfil e grava os arquivos.
+
+        Returns
+        -------
+        str
+            Pasta com os arquivos gravados.
+        """
+        while self._stack:
+            self._exit()
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        stats_files = []
+        for name, profile in self.profiles.items():
+            path = os.path.join(self.output_dir, f"{name}.prof")
+            profile.dump_stats(path)
+            stats_files.append((name, path))
+
+        if stats_files:
+            pstats.Stats(*(path for _, path in stats_files)).dump_stats(os.path.join(self.output_dir, 'total.prof'))
+
+        with open(os.path.join(self.output_dir, 'summary.txt'), 'w', encoding='utf-8') as file:
+            if self.unprofiled:
+                file.write("===== Etapas sem perfil (executadas fora da thread do perfilador) =====\n")
+                for name, (count, seconds) in sorted(self.unprofiled.items()):
+                    file.write(f"{name}: {count} vez(es), {seconds:.3f} s\n")
+                file.write('\n')
+            for name, path in stats_files:
+                stream = io.StringIO()
+                stats = pstats.Stats(path, stream=stream)
+                stats.sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+                peak = self.memory_peaks.get(name, 0) / (1024 * 1024)
+                file.write(f"===== {name} (pico de memória rastreada: {peak:.1f} MiB) =====\n")
+                file.write(stream.getvalue())
+                file.write('\n')
+
+        with open(os.path.join(self.output_dir, 'allocations.txt'), 'w', encoding='utf-8') as file:
+            file.write(f"Maiores alocações ainda vivas ao final de {self.name}\n\n")
+            for stat in snapshot.statistics('lineno')[:TOP_ALLOCATIONS]:
+                file.write(f"{stat}\n")
+            file.write("\nPico de memória rastreada por etapa\n\n")
+            for name, peak in sorted(self.memory_peaks.items(), key=lambda item: item[1], reverse=True):
+                file.write(f"{name}: {peak / (1024 * 1024):.1f} MiB\n")
+
+        return self.output_dir
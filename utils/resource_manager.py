@@ -38,3 +38,38 @@ def get_executable_dir():
         return os.path.dirname(sys.executable)  # Diretório onde o executável está
     else:
         return os.path.dirname(os.path.abspath(__file__))  # Diretório do script Python
+
+
+def get_app_dir():
+    """
+    Obtém a pasta base dos arquivos gravados pela aplicação.
+
+    No executável do PyInstaller (onefile) os módulos são extraídos para uma pasta temporária (`_MEIPASS`),
+    apagada ao fechar; por isso, quando congelado, usa a pasta do executável. Em desenvolvimento, usa a raiz
+    do projeto.
+
+    Returns
+    -------
+    str
+        Caminho absoluto da pasta base.
+    """
+    if getattr(sys, 'frozen', False):
+        return get_executable_dir()
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def get_data_dir(*parts):
+    """
+    Obtém o caminho de um arquivo ou pasta de dados persistentes, dentro de `data/processed` da pasta base.
+
+    Parameters
+    ----------
+    parts : str
+        Partes do caminho relativo a `data/processed` (nenhuma para a própria pasta).
+
+    Returns
+    -------
+    str
+        Caminho absoluto.
+    """
+    return os.path.join(get_app_dir(), 'data', 'processed', *parts)
@@ -1,12 +1,14 @@
 import os
-import requests
+import sys
+import json
+import hashlib
+import time
 import logging
-from packaging import version
+from threading import Event, Thread
 from urllib.parse import urljoin
-import tkinter as tk
-from tkinter import messagebox
 
-from utils.resource_manager import get_executable_dir
+from config.app_settings import load_app_settings
+from utils.resource_manager import get_data_dir
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -14,30 +16,313 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 # Update these URLs as necessary
 UPDATE_URL = 'https://github.com/A-Assuncao/canaime-preso-por-ala/releases/latest/download/'
 VERSION_FILE = 'latest_version.txt'
+VERSION_CHECK_TIMEOUT = (5, 10)  # Conexão e leitura, em segundos
+UPDATE_CACHE_FILE = 'update_cache.json'
+STAGING_DIR = 'updates'
+STAGED_UPDATE_FILE = 'staged_update.json'  # Versão baixada e verificada, aplicada na próxima abertura
+DIGEST_SUFFIX = '.sha256'  # Checksum publicado junto de cada executável
+REPLACED_SUFFIX = '.old'  # Executável anterior, renomeado durante a troca e removido na abertura seguinte
+DOWNLOAD_TIMEOUT = (10, 30)  # Conexão e intervalo máximo entre pedaços, em segundos
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+DOWNLOAD_ATTEMPTS = 5
+DOWNLOAD_RETRY_DELAY = 2  # Segundos, multiplicados pelo número da tentativa
 
 
-def get_latest_version():
+def get_update_data_dir():
+    """
+    Returns the folder for update data: `data/processed` next to the executable when frozen, or in the repository.
+    """
+    return get_data_dir()
+
+
+def get_update_cache_path():
+    """
+    Returns the path of the file that caches the last known version.
+    """
+    return os.path.join(get_update_data_dir(), UPDATE_CACHE_FILE)
+
+
+def get_staging_dir():
+    """
+    Returns the folder where updates downloaded in the background wait for the next launch.
+    """
+    return os.path.join(get_update_data_dir(), STAGING_DIR)
+
+
+def load_update_cache():
+    try:
+        with open(get_update_cache_path(), 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_update_cache(cache):
+    path = get_update_cache_path()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(cache, file)
+        os.replace(temp_path, path)
+    except OSError as e:
+        logging.warning(f"Falha ao gravar o cache de versão: {e}")
+
+
+def get_latest_version(ttl=None, force=False):
     """
     Gets the latest version of the application from the update server.
 
+    The last known version is cached with its ETag / Last-Modified. Within `ttl` seconds the cache is
+    used without touching the network; after that the server is asked with a conditional request, so
+    an unchanged version costs a 304 with no body.
+
+    Parameters
+    ----------
+    ttl : int, optional
+        Seconds during which the cached version is trusted. Defaults to `updates.check_ttl` in the settings.
+    force : bool
+        Ignores the TTL and revalidates with the server.
+
     Returns
     -------
     str
         The latest version of the application as a string, or None in case of failure.
     """
+    import requests
+
+    if ttl is None:
+        ttl = load_app_settings()["updates"]["check_ttl"]
+    cache = load_update_cache()
+    now = time.time()
+    if not force and cache.get("version") and now - cache.get("checked_at", 0) < ttl:
+        return cache["version"]
+
+    headers = {}
+    if cache.get("version"):
+        if cache.get("etag"):
+            headers['If-None-Match'] = cache["etag"]
+        if cache.get("last_modified"):
+            headers['If-Modified-Since'] = cache["last_modified"]
+
     try:
         version_url = urljoin(UPDATE_URL, VERSION_FILE)
-        response = requests.get(version_url, timeout=10)  # Adicionar timeout para requests
+        response = requests.get(version_url, headers=headers, timeout=VERSION_CHECK_TIMEOUT)
+        if response.status_code == 304:
+            cache["checked_at"] = now
+            save_update_cache(cache)
+            return cache["version"]
+
         response.raise_for_status()
-        return response.text.strip()
+        latest_version = response.text.strip()
+        save_update_cache({
+            "version": latest_version,
+            "etag": response.headers.get('ETag'),
+            "last_modified": response.headers.get('Last-Modified'),
+            "checked_at": now,
+        })
+        return latest_version
     except requests.RequestException as e:
         logging.error(f"Falha ao obter a versão mais recente: {e}")
         return None
 
 
-def download_update(version, target_path):
+def is_newer_version(latest_version, current_version):
+    """Returns True if `latest_version` is newer than `current_version`."""
+    from packaging import version
+
+    try:
+        return version.parse(latest_version) > version.parse(current_version)
+    except version.InvalidVersion:
+        logging.error(f"Versão inválida recebida do servidor: {latest_version}")
+        return False
+
+
+class UpdateChecker:
+    """
+    Checks for updates in a background thread, so the login window does not wait for the network.
+
+    In `prompt` mode the thread only talks to the server; asking the user (Tk) is left to the main thread,
+    which polls `done()` and reads `latest_version` (None when there is nothing newer).
+
+    In `background` mode a newer version is also downloaded and verified by the same thread, at low
+    priority, into the staging folder; `apply_staged_update` installs it over the launched executable on
+    the next launch and the user is never asked.
+    """
+
+    def __init__(self, current_version, mode=None):
+        self.current_version = current_version
+        self.mode = mode or load_app_settings()["updates"]["mode"]
+        self.latest_version = None  # Newer version confirmed by the server
+        self.staged_version = None  # Version downloaded and waiting for the next launch (background mode)
+        self.accepted = False  # Set by the login window when the user accepts the update
+        self._done = Event()
+        self._thread = Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def done(self):
+        return self._done.is_set()
+
+    def _run(self):
+        try:
+            if self.mode == 'background':
+                lower_thread_priority()
+                discard_stale_update(self.current_version)
+
+            latest_version = get_latest_version()
+            if latest_version and is_newer_version(latest_version, self.current_version):
+                logging.info(f"Atualização para a versão {latest_version} disponível.")
+                self.latest_version = latest_version
+                if self.mode == 'background' and stage_update(latest_version):
+                    self.staged_version = latest_version
+            else:
+                logging.info("Nenhuma atualização disponível.")
+        except Exception as e:
+            logging.error(f"Falha ao verificar atualizações: {e}")
+        finally:
+            self._done.set()
+
+
+def lower_thread_priority():
+    """
+    Lowers the scheduling priority of the calling thread, so a background download does not compete with
+    the collection and the interface.
+    """
+    try:
+        if sys.platform == 'win32':
+            import ctypes
+
+            thread_priority_lowest = -2
+            kernel32 = ctypes.windll.kernel32
+            kernel32.SetThreadPriority(kernel32.GetCurrentThread(), thread_priority_lowest)
+        elif hasattr(os, 'setpriority') and sys.platform.startswith('linux'):
+            # No Linux cada thread tem sua própria prioridade (niceness), identificada pelo id nativo
+            from threading import get_native_id
+
+            os.setpriority(os.PRIO_PROCESS, get_native_id(), 10)
+    except (OSError, AttributeError) as e:
+        logging.debug(f"Não foi possível reduzir a prioridade da thread de atualização: {e}")
+
+
+def get_published_digest(executable_name, base_url=None):
+    """
+    Gets the SHA-256 digest published next to the executable (`<executable>.sha256`).
+
+    The file may hold only the hexadecimal digest or the `sha256sum` format (`<digest>  <file name>`).
+
+    Returns
+    -------
+    str
+        The lowercase hexadecimal digest, or None if it cannot be obtained.
+    """
+    import requests
+
+    try:
+        response = requests.get(urljoin(base_url or UPDATE_URL, executable_name + DIGEST_SUFFIX),
+                                timeout=VERSION_CHECK_TIMEOUT)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        logging.error(f"Falha ao obter o checksum da atualização: {e}")
+        return None
+
+    fields = response.text.split()
+    digest = fields[0].lower() if fields else ''
+    if len(digest) != 64 or any(char not in '0123456789abcdef' for char in digest):
+        logging.error(f"Checksum publicado inválido para {executable_name}: {response.text[:100]!r}")
+        return None
+    return digest
+
+
+class DownloadProgressLogger:
+    """Default progress callback: logs every 10% (or every 10 MiB when the size is unknown)."""
+
+    def __init__(self):
+        self.last_step = None
+
+    def __call__(self, downloaded, total):
+        step = downloaded * 10 // total if total else downloaded // (10 * 1024 * 1024)
+        if step == self.last_step:
+            return
+        self.last_step = step
+        if total:
+            logging.info(f"Baixando atualização: {downloaded * 100 // total}% "
+                         f"({downloaded / (1024 * 1024):.1f} de {total / (1024 * 1024):.1f} MiB)")
+        else:
+            logging.info(f"Baixando atualização: {downloaded / (1024 * 1024):.1f} MiB")
+
+
+def _hash_file(path, digest):
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(DOWNLOAD_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest
+
+
+def _download_attempt(session, download_url, part_path, progress):
+    """
+    Streams the remaining bytes of `download_url` into `part_path`, resuming from its current size.
+
+    Returns
+    -------
+    hashlib object
+        SHA-256 of the whole `.part` file once the server has sent everything.
+    """
+    import requests
+
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    headers = {'Range': f'bytes={offset}-'} if offset else {}
+
+    with session.get(download_url, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+        if response.status_code == 416:
+            # Nada além do que já foi baixado: o arquivo parcial está completo (ou é maior que o publicado,
+            # caso em que o checksum falha e o download recomeça)
+            return _hash_file(part_path, hashlib.sha256())
+        response.raise_for_status()
+
+        content_range = response.headers.get('Content-Range', '')
+        if response.status_code == 206 and not content_range.startswith(f'bytes {offset}-'):
+            os.remove(part_path)
+            raise requests.RequestException(f"Faixa inesperada na resposta ({content_range}); recomeçando.")
+
+        if response.status_code == 206:
+            mode = 'ab'
+            digest = _hash_file(part_path, hashlib.sha256())
+            total = content_range.rpartition('/')[2]
+            total = int(total) if total.isdigit() else None
+            logging.info(f"Retomando o download da atualização a partir de {offset / (1024 * 1024):.1f} MiB.")
+        else:
+            # Servidor sem suporte a Range: recomeça do zero
+            mode = 'wb'
+            offset = 0
+            digest = hashlib.sha256()
+            length = response.headers.get('Content-Length')
+            total = int(length) if length and length.isdigit() else None
+
+        downloaded = offset
+        with open(part_path, mode) as file:
+            for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                file.write(chunk)
+                digest.update(chunk)
+                downloaded += len(chunk)
+                progress(downloaded, total)
+
+        if total is not None and downloaded < total:
+            raise requests.exceptions.ChunkedEncodingError(
+                f"Download interrompido: {downloaded} de {total} bytes recebidos")
+    return digest
+
+
+def download_update(version, target_path, base_url=None, progress=None):
     """
-    Downloads the update file from the server.
+    Downloads the update file from the server, verifying it against the published SHA-256 digest.
+
+    The file is streamed in chunks to `<target_path>.part`. If the connection drops, the download is
+    resumed with an HTTP Range request (also across runs, since the `.part` file is kept). Only after the
+    digest matches is the file renamed to `target_path`, so `target_path` never holds a partial or
+    corrupted executable.
 
     Parameters
     ----------
@@ -45,85 +330,243 @@ def download_update(version, target_path):
         The version of the application to download.
     target_path : str
         The path where the update file will be saved.
+    base_url : str, optional
+        URL of the folder holding the executable and its `.sha256` file. Defaults to `UPDATE_URL`.
+    progress : callable, optional
+        Called as `progress(downloaded_bytes, total_bytes)` after each chunk; `total_bytes` is None when
+        the server does not send the size. Defaults to logging every 10%.
 
     Returns
     -------
     bool
-        True if the download is successful, False otherwise.
+        True if the download is successful and verified, False otherwise.
+    """
+    import requests
+
+    base_url = base_url or UPDATE_URL
+    executable_name = f"canaime-preso-por-ala-{version}.exe"
+    download_url = urljoin(base_url, executable_name)
+    part_path = f"{target_path}.part"
+    progress = progress or DownloadProgressLogger()
+
+    expected_digest = get_published_digest(executable_name, base_url)
+    if not expected_digest:
+        logging.error("Atualização não baixada: sem checksum publicado não é possível verificá-la.")
+        return False
+
+    with requests.Session() as session:
+        for attempt in range(1, DOWNLOAD_ATTEMPTS + 1):
+            try:
+                digest = _download_attempt(session, download_url, part_path, progress)
+            except (requests.RequestException, OSError) as e:
+                logging.warning(f"Falha ao baixar a atualização (tentativa {attempt} de {DOWNLOAD_ATTEMPTS}): {e}")
+                if attempt < DOWNLOAD_ATTEMPTS:
+                    time.sleep(DOWNLOAD_RETRY_DELAY * attempt)
+                continue
+
+            if digest.hexdigest() != expected_digest:
+                logging.error(f"Checksum da atualização não confere (esperado {expected_digest}, "
+                              f"obtido {digest.hexdigest()}). Descartando o arquivo baixado.")
+                os.remove(part_path)
+                continue
+
+            os.replace(part_path, target_path)
+            return True
+
+    logging.error("Falha ao baixar a atualização.")
+    return False
+
+
+def load_staged_update():
+    """
+    Reads the staged update marker.
+
+    Returns
+    -------
+    dict
+        `{"version", "path", "size", "sha256"}` of the staged executable, or an empty dict.
     """
     try:
-        executable_name = f"canaime-preso-por-ala-{version}.exe"
-        download_url = urljoin(UPDATE_URL, executable_name)  # Usar urljoin para URLs
-        response = requests.get(download_url, stream=True, timeout=20)  # Adicionar timeout para downloads
-        response.raise_for_status()
-        with open(target_path, 'wb') as out_file:
-            out_file.write(response.content)
+        with open(os.path.join(get_staging_dir(), STAGED_UPDATE_FILE), 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def stage_update(version):
+    """
+    Downloads and verifies `version` into the staging folder and records it for the next launch.
+
+    The marker is written only after the digest has been verified, so a staged update is always complete.
+
+    Returns
+    -------
+    bool
+        True if the version is staged (now or by an earlier run), False otherwise.
+    """
+    staged = load_staged_update()
+    if staged.get("version") == version and os.path.exists(staged.get("path", '')):
         return True
-    except requests.RequestException as e:
-        logging.error(f"Falha ao baixar a atualização: {e}")
+
+    staging_dir = get_staging_dir()
+    os.makedirs(staging_dir, exist_ok=True)
+    staged_path = os.path.join(staging_dir, f"canaime-preso-por-ala-{version}.exe")
+    if not download_update(version, staged_path):
         return False
 
+    digest = _hash_file(staged_path, hashlib.sha256()).hexdigest()
+    marker_path = os.path.join(staging_dir, STAGED_UPDATE_FILE)
+    temp_path = f"{marker_path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        json.dump({"version": version, "path": staged_path, "size": os.path.getsize(staged_path),
+                   "sha256": digest}, file)
+    os.replace(temp_path, marker_path)
+    logging.info(f"Atualização {version} baixada; será aplicada na próxima abertura.")
+    return True
+
+
+def discard_stale_update(current_version):
+    """
+    Removes staged files that are not newer than the running version (already applied or superseded).
 
-def prompt_user_for_update():
+    An applied update has replaced the launched executable (see `replace_executable`), so the old binary can
+    no longer be started and the marker is no longer needed.
     """
-    Pergunta ao usuário se deseja realizar a atualização.
+    staged = load_staged_update()
+    if not staged or is_newer_version(staged.get("version", ''), current_version):
+        return
+
+    for path in (staged.get("path"), os.path.join(get_staging_dir(), STAGED_UPDATE_FILE)):
+        if path and os.path.dirname(os.path.abspath(path)) == os.path.abspath(get_staging_dir()):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def get_replaced_executable_path(executable_path):
+    """
+    Returns the path the previous executable is renamed to while its replacement is moved in.
+    """
+    return f"{executable_path}{REPLACED_SUFFIX}"
+
+
+def remove_replaced_executable():
+    """
+    Removes the executable left aside by an earlier update, once the process that ran it has exited.
+    """
+    if not getattr(sys, 'frozen', False):
+        return
+    try:
+        os.remove(get_replaced_executable_path(sys.executable))
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logging.debug(f"Executável anterior ainda em uso: {e}")
+
+
+def stop_browser_server():
+    """
+    Asks the warm browser server, started from the executable being replaced, to shut down.
+
+    The new version starts its own server when needed; the old one would otherwise keep running the
+    previous executable.
+    """
+    try:
+        from services.browser_server import stop_server
+
+        stop_server()
+    except Exception as e:
+        logging.warning(f"Não foi possível encerrar o servidor de navegador: {e}")
+
+
+def replace_executable(new_path):
+    """
+    Moves `new_path` into the place of the launched executable and restarts the application from it.
+
+    The running executable is renamed aside first (Windows allows renaming, not overwriting, a running
+    file) and removed on a later launch by `remove_replaced_executable`. If the new file cannot be moved
+    in, the previous executable is restored, so the same name keeps launching a working version.
+
+    The process is replaced without running `finally` blocks or exit handlers: callers close their own
+    resources (such as the prewarmed browser) before calling this; the browser server is stopped here.
 
     Returns
     -------
     bool
-        True se o usuário aceitar a atualização, False se recusar.
+        False if the executable could not be replaced (on success the process is replaced and this does
+        not return).
     """
-    root = tk.Tk()
-    root.withdraw()  # Oculta a janela principal
-    result = messagebox.askyesno("Atualização disponível", "Há uma nova versão disponível. Deseja atualizar agora?")
-    root.destroy()
-    return result
+    if not getattr(sys, 'frozen', False):
+        logging.warning("Atualização ignorada: a aplicação não está rodando como executável.")
+        return False
+
+    executable_path = sys.executable
+    replaced_path = get_replaced_executable_path(executable_path)
+    try:
+        if os.path.exists(replaced_path):
+            os.remove(replaced_path)
+        os.replace(executable_path, replaced_path)
+    except OSError as e:
+        logging.warning(f"Não foi possível liberar {executable_path} para a atualização: {e}")
+        return False
+
+    try:
+        os.replace(new_path, executable_path)
+    except OSError as e:
+        logging.warning(f"Não foi possível instalar a atualização em {executable_path}: {e}")
+        os.replace(replaced_path, executable_path)
+        return False
+
+    stop_browser_server()
+    logging.info(f"Executável substituído; reiniciando a partir de {executable_path}.")
+    os.execl(executable_path, executable_path, *sys.argv[1:])
+    return False
 
 
-def update_application(current_version):
+def apply_staged_update(current_version):
     """
-    Checks if an update is available and, if so, downloads and applies the update,
-    restarting the application.
+    Installs a staged update at startup, if there is one newer than `current_version`.
 
-    Parameters
-    ----------
-    current_version : str
-        The current version of the application.
+    Only local files are checked (the marker and the size of the staged executable); the digest was
+    verified when the update was staged. The staged executable replaces the launched one (see
+    `replace_executable`) and the marker is kept until the new version runs, so a failed swap is retried
+    on the next launch instead of downloading again.
 
     Returns
     -------
     bool
-        False if there is no update or if the update fails.
+        False if there is no staged update to apply (on success the process is replaced and this does not
+        return).
     """
-    latest_version = get_latest_version()
-    if not latest_version:
-        logging.info("Não foi possível verificar atualizações.")
-        return False
+    remove_replaced_executable()
 
-    # Usar a biblioteca 'packaging' para comparar versões
-    if version.parse(latest_version) > version.parse(current_version):
-        logging.info(f"Atualização para a versão {latest_version} disponível.")
+    staged = load_staged_update()
+    staged_path = staged.get("path")
+    if not staged_path or not is_newer_version(staged.get("version", ''), current_version):
+        return False
+    if not os.path.exists(staged_path) or os.path.getsize(staged_path) != staged.get("size"):
+        logging.warning("Atualização preparada ausente ou incompleta; ignorando.")
+        return False
 
-        # Pergunta ao usuário se deseja atualizar
-        if prompt_user_for_update():
-            logging.info("Usuário aceitou a atualização. Baixando...")
-            # Usar o diretório onde o executável está rodando
-            exec_dir = get_executable_dir()
-            update_exe_path = os.path.join(exec_dir, f'canaime-preso-por-ala-{latest_version}.exe')
+    logging.info(f"Aplicando a atualização {staged['version']} preparada anteriormente.")
+    return replace_executable(staged_path)
 
-            if download_update(latest_version, update_exe_path):
-                logging.info(f"Atualização baixada com sucesso e salva em: {update_exe_path}")
 
-                # Verifique se o arquivo existe
-                if os.path.exists(update_exe_path):
-                    logging.info("Executando o instalador...")
-                    os.execl(update_exe_path, update_exe_path)
-                else:
-                    logging.error("Arquivo de atualização não encontrado após o download.")
+def install_update(latest_version):
+    """
+    Downloads and verifies the given version, replaces the launched executable with it and restarts.
 
-        else:
-            logging.info("Usuário recusou a atualização.")
-    else:
-        logging.info("Nenhuma atualização disponível.")
+    Returns
+    -------
+    bool
+        False if the download or the replacement fails (on success the process is replaced and this does
+        not return).
+    """
+    if not stage_update(latest_version):
+        logging.error("Falha ao baixar a atualização.")
+        return False
 
-    return False
+    staged = load_staged_update()
+    logging.info(f"Atualização baixada com sucesso e salva em: {staged['path']}")
+    return replace_executable(staged["path"])